@@ -1,36 +1,73 @@
 from flask import Flask, render_template, redirect, url_for, flash, request
 from flask_login import LoginManager, login_user, logout_user, current_user, login_required
-from flask_sqlalchemy import SQLAlchemy
 from config import Config
+from database import init_db
 from forms import LoginForm, SignupForm, PasswordResetRequestForm, PasswordResetForm, TwoFactorForm, RecoveryCodeForm
 from models.user import User
-from models.portfolio import Portfolio, PortfolioItem
+from models.portfolio import Portfolio, PortfolioItem, Position
 from models.watchlist import Watchlist, WatchlistSymbol
 from models.alert import Alert
 from services.api_service import CryptoAPIService
 from services.binance_service import BinanceService
-from services.websocket_service import WebSocketService
+from services.websocket_service import init_websocket
+from services.user_cache import load_user as load_cached_user
+from services.email_service import init_email
+from utils.circuit import init_circuits
+from utils.fragments import init_fragments, track_writes
 import os
+import click
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
 from routes.main import main as main_blueprint
 from routes.auth import auth as auth_blueprint
-from routes.api import api as api_blueprint
+from routes.api import api_bp as api_blueprint
 
 app.register_blueprint(main_blueprint)
 app.register_blueprint(auth_blueprint, url_prefix='/auth')
 app.register_blueprint(api_blueprint, url_prefix='/api')
 
-db = SQLAlchemy(app)
+# Shared with database.db so models and routes use the replica-aware session
+db = init_db(app)
 
 login_manager = LoginManager(app)
 login_manager.login_view = 'auth.login'
 
+# Mail goes out through the background notification queue
+init_email(app)
+
+# Responses built from last-known-good upstream data carry X-Data-Stale
+init_circuits(app)
+
+# Cached template fragments; per-user ones are invalidated by commits to these models
+init_fragments(app)
+track_writes(Portfolio, 'portfolio')
+track_writes(PortfolioItem, 'portfolio', owner=Portfolio)
+track_writes(Position, 'portfolio', owner=Portfolio)
+track_writes(Alert, 'alerts')
+track_writes(Watchlist, 'watchlist')
+track_writes(WatchlistSymbol, 'watchlist', owner=Watchlist)
+
+# Real-time updates; fanned out across workers through the message queue when configured
+socketio = init_websocket(app)
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(user_id)
+    return load_cached_user(user_id)
+
+@app.cli.command('rebuild-positions')
+@click.option('--portfolio-id', type=int, default=None, help='Only rebuild this portfolio')
+def rebuild_positions(portfolio_id):
+    """Reconcile position aggregates with portfolio lots"""
+    from services.position_service import position_service
+    query = Portfolio.query if portfolio_id is None else Portfolio.query.filter_by(id=portfolio_id)
+    for portfolio in query.all():
+        symbols = position_service.rebuild_portfolio(portfolio)
+        db.session.commit()
+        click.echo(f'Portfolio {portfolio.id}: rebuilt {len(symbols)} positions')
 
 if __name__ == '__main__':
-     app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
+     from services.notification_service import start_notification_dispatcher
+     start_notification_dispatcher(app)
+     socketio.run(app, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
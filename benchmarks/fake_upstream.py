@@ -0,0 +1,73 @@
+"""Local stand-in for the Binance REST API with a fixed response latency.
+
+    python -m benchmarks.fake_upstream --port 9100 --latency 0.1
+
+Point the app at it with BINANCE_API_BASE_URL=http://127.0.0.1:9100/api/v3.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+def _depth(query):
+    limit = int(query.get('limit', ['100'])[0])
+    return {
+        'lastUpdateId': 1,
+        'bids': [[f'{100 - i * 0.01:.2f}', '1.00000000'] for i in range(limit)],
+        'asks': [[f'{100 + i * 0.01:.2f}', '1.00000000'] for i in range(limit)],
+    }
+
+ROUTES = {
+    '/api/v3/ping': lambda query: {},
+    '/api/v3/time': lambda query: {'serverTime': int(time.time() * 1000)},
+    '/api/v3/depth': _depth,
+    '/api/v3/ticker/price': lambda query: {'symbol': query.get('symbol', ['BTCUSDT'])[0], 'price': '100.00000000'},
+    '/api/v3/avgPrice': lambda query: {'mins': 5, 'price': '100.00000000'},
+}
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real upstream
+    latency = 0.1
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        route = ROUTES.get(url.path)
+        time.sleep(self.latency)
+        status, payload = (200, route(parse_qs(url.query))) if route else (404, {'code': -1, 'msg': 'Not found'})
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeUpstream(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+def start(port=0, latency=0.1):
+    """Serve in a background thread; returns the server (``server.server_port`` is the bound port)"""
+    handler = type('Handler', (FakeUpstreamHandler,), {'latency': latency})
+    server = FakeUpstream(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--latency', type=float, default=0.1, help='seconds before every response')
+    args = parser.parse_args(argv)
+    server = start(args.port, args.latency)
+    print(f'Fake upstream on http://127.0.0.1:{server.server_port}/api/v3 ({args.latency * 1000:.0f} ms latency)')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Memory and update throughput of the market table vs. parsed upstream dicts.
+
+Run from the repository root:
+
+    python -m benchmarks.market_table [--symbols 2000] [--updates 200000]
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+from services.market_table import MarketTable
+
+def upstream_rows(count):
+    """Synthetic /ticker/24hr payload after response.json(): a dict of strings per symbol"""
+    rng = random.Random(1)
+    rows = []
+    for i in range(count):
+        price = rng.uniform(0.001, 60000)
+        rows.append({
+            'symbol': f'SYM{i}USDT',
+            'lastPrice': f'{price:.8f}',
+            'priceChangePercent': f'{rng.uniform(-20, 20):.3f}',
+            'quoteVolume': f'{rng.uniform(1e3, 1e9):.8f}',
+            'bidPrice': f'{price * 0.9999:.8f}',
+            'askPrice': f'{price * 1.0001:.8f}',
+        })
+    return rows
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    value = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return value, sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+def load_table(rows):
+    table = MarketTable(capacity=len(rows))
+    table.update_many([r['symbol'] for r in rows], {
+        'price': [r['lastPrice'] for r in rows],
+        'change': [r['priceChangePercent'] for r in rows],
+        'volume': [r['quoteVolume'] for r in rows],
+        'bid': [r['bidPrice'] for r in rows],
+        'ask': [r['askPrice'] for r in rows],
+    })
+    return table
+
+def rate(count, seconds):
+    return f'{count / seconds:>12,.0f}/s'
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=2000)
+    parser.add_argument('--updates', type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    source = upstream_rows(args.symbols)
+    symbols = [r['symbol'] for r in source]
+
+    # Memory: the parsed payload kept per worker vs. the table built from it
+    rows, dict_bytes = measure(lambda: upstream_rows(args.symbols))
+    floats, float_bytes = measure(lambda: {r['symbol']: {'symbol': r['symbol'], 'price': float(r['lastPrice']),
+                                                          'price_change_24h': float(r['priceChangePercent'])}
+                                           for r in rows})
+    table, table_bytes = measure(lambda: load_table(source))
+    print(f'{args.symbols} symbols')
+    print(f'  dicts of strings   {dict_bytes:>12,} B  {dict_bytes / args.symbols:>7.0f} B/symbol')
+    print(f'  dicts of floats    {float_bytes:>12,} B  {float_bytes / args.symbols:>7.0f} B/symbol (2 fields)')
+    print(f'  market table       {table_bytes:>12,} B  {table_bytes / args.symbols:>7.0f} B/symbol')
+
+    # Update throughput: single streamed ticks and a full REST refresh
+    rng = random.Random(2)
+    ticks = [(rng.choice(symbols), f'{rng.uniform(1, 100):.8f}', f'{rng.uniform(-5, 5):.3f}')
+             for _ in range(args.updates)]
+
+    started = time.perf_counter()
+    for symbol, price, change in ticks:
+        floats[symbol] = {'symbol': symbol, 'price': float(price), 'price_change_24h': float(change)}
+    dict_tick = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for symbol, price, change in ticks:
+        table.update(symbol, price=price, change=change)
+    table_tick = time.perf_counter() - started
+
+    refreshes = max(1, args.updates // args.symbols // 10)
+    started = time.perf_counter()
+    for _ in range(refreshes):
+        load_table(source)
+    table_refresh = time.perf_counter() - started
+
+    print(f'{args.updates:,} streamed ticks')
+    print(f'  dict replacement   {rate(args.updates, dict_tick)}')
+    print(f'  table in place     {rate(args.updates, table_tick)}')
+    print(f'{refreshes} full refreshes of {args.symbols} symbols')
+    print(f'  table vectorized   {rate(refreshes * args.symbols, table_refresh)} symbols')
+
+    # Reading a response: price listing for the 100 most traded symbols
+    top = symbols[:100]
+    started = time.perf_counter()
+    for _ in range(1000):
+        [floats[s] for s in top]
+    dict_read = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(1000):
+        table.records(top, {'price': 'price', 'price_change_24h': 'change'})
+    table_read = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(1000):
+        slots = table.slots(top)
+        [table.column(field)[slots] for field in ('price', 'change')]
+    table_columns = time.perf_counter() - started
+    print('1,000 listings of 100 symbols')
+    print(f'  dict lookup        {rate(1000, dict_read)}')
+    print(f'  table records      {rate(1000, table_read)}  (JSON rows)')
+    print(f'  table columns      {rate(1000, table_columns)}  (columnar formats)')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
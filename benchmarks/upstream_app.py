@@ -0,0 +1,32 @@
+"""Minimal app proxying one upstream call per request, as the routes in routes/api.py do.
+
+Sync workers:        gunicorn -w 4 benchmarks.upstream_app:app
+Cooperative worker:  SOCKETIO_ASYNC_MODE=eventlet python -m benchmarks.upstream_app --port 8001
+"""
+import os
+
+# Same patch-first order as wsgi.py
+if os.getenv('SOCKETIO_ASYNC_MODE') == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+
+import argparse  # noqa: E402
+
+from flask import Flask, jsonify  # noqa: E402
+
+from services.binance_api import BinanceAPI  # noqa: E402
+
+app = Flask(__name__)
+
+@app.route('/api/depth/<symbol>')
+def depth(symbol):
+    return jsonify(BinanceAPI.get_depth(symbol, limit=20))
+
+if __name__ == '__main__':
+    if os.getenv('SOCKETIO_ASYNC_MODE') != 'eventlet':
+        raise SystemExit('Run directly only in cooperative mode (SOCKETIO_ASYNC_MODE=eventlet); use gunicorn otherwise')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8001)
+    args = parser.parse_args()
+    from eventlet import wsgi
+    wsgi.server(eventlet.listen(('127.0.0.1', args.port), backlog=2048), app, log_output=False)
@@ -0,0 +1,73 @@
+"""Full-market refresh: response.json() vs. incremental field-selective parsing.
+
+Run from the repository root:
+
+    python -m benchmarks.upstream_parse [--symbols 3000] [--chunk 65536]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from services.market_table import MarketTable
+from services.price_feed import TICKER_COLUMNS
+from utils.json_stream import iter_items, CHUNK_SIZE
+
+def ticker_payload(count):
+    """Synthetic /ticker/24hr body with every field upstream sends"""
+    rng = random.Random(1)
+    rows = []
+    for i in range(count):
+        price = rng.uniform(0.001, 60000)
+        rows.append({
+            'symbol': f'SYM{i}USDT', 'priceChange': f'{price * 0.01:.8f}',
+            'priceChangePercent': f'{rng.uniform(-20, 20):.3f}', 'weightedAvgPrice': f'{price:.8f}',
+            'prevClosePrice': f'{price:.8f}', 'lastPrice': f'{price:.8f}', 'lastQty': '1.00000000',
+            'bidPrice': f'{price * 0.9999:.8f}', 'bidQty': '2.00000000',
+            'askPrice': f'{price * 1.0001:.8f}', 'askQty': '3.00000000',
+            'openPrice': f'{price:.8f}', 'highPrice': f'{price * 1.1:.8f}', 'lowPrice': f'{price * 0.9:.8f}',
+            'volume': f'{rng.uniform(1, 1e6):.8f}', 'quoteVolume': f'{rng.uniform(1e3, 1e9):.8f}',
+            'openTime': 1700000000000, 'closeTime': 1700086399999,
+            'firstId': i * 1000, 'lastId': i * 1000 + 999, 'count': 1000,
+        })
+    return json.dumps(rows).encode()
+
+def chunked(body, size):
+    return (body[i:i + size] for i in range(0, len(body), size))
+
+def materialized(body, size):
+    # What response.json() does: join the body, then decode the whole document
+    rows = json.loads(b''.join(chunked(body, size)))
+    MarketTable(capacity=len(rows)).load(rows, TICKER_COLUMNS)
+
+def streamed(body, size):
+    fields = ['symbol', *TICKER_COLUMNS]
+    rows = ({f: row[f] for f in fields} for row in iter_items(chunked(body, size)))
+    MarketTable().load(rows, TICKER_COLUMNS)
+
+def run(func, body, size):
+    tracemalloc.start()
+    started = time.perf_counter()
+    func(body, size)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=3000)
+    parser.add_argument('--chunk', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    body = ticker_payload(args.symbols)
+    print(f'{args.symbols} symbols, {len(body) / 1e6:.1f} MB body, {args.chunk} B chunks')
+    for name, func in (('response.json()', materialized), ('incremental', streamed)):
+        elapsed, peak = run(func, body, args.chunk)
+        print(f'  {name:<16} {elapsed * 1000:>8.1f} ms  peak {peak / 1e6:>6.2f} MB')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Concurrent-request capacity: sync gunicorn workers vs. one cooperative eventlet process.
+
+Both serve benchmarks.upstream_app, whose every request waits on the local
+fake upstream. Run from the repository root:
+
+    python -m benchmarks.worker_modes [--latency 0.1] [--sync-workers 4] [--concurrency 16 64 256]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+from benchmarks import fake_upstream
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_ready(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=5).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server at {url} did not start')
+
+def load(url, concurrency, requests_per_client):
+    """(requests/s, p50 ms, p95 ms, errors) for ``concurrency`` clients issuing requests back to back"""
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def client():
+        for _ in range(requests_per_client):
+            started = time.perf_counter()
+            try:
+                urllib.request.urlopen(url, timeout=120).read()
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+            except OSError as e:
+                with lock:
+                    errors.append(e)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    return len(latencies) / elapsed, statistics.median(latencies or [0]) * 1000, p95 * 1000, len(errors)
+
+def serve(mode, port, env, sync_workers):
+    if mode == 'sync':
+        command = [sys.executable, '-m', 'gunicorn', '-w', str(sync_workers), '-b', f'127.0.0.1:{port}',
+                   '--backlog', '2048', '--log-level', 'warning', 'benchmarks.upstream_app:app']
+    else:
+        env = {**env, 'SOCKETIO_ASYNC_MODE': 'eventlet'}
+        command = [sys.executable, '-m', 'benchmarks.upstream_app', '--port', str(port)]
+    return subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.1, help='fake upstream latency in seconds')
+    parser.add_argument('--sync-workers', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[16, 64, 256])
+    parser.add_argument('--requests', type=int, default=4, help='requests per client')
+    args = parser.parse_args(argv)
+
+    upstream = fake_upstream.start(latency=args.latency)
+    env = {**os.environ, 'BINANCE_API_BASE_URL': f'http://127.0.0.1:{upstream.server_port}/api/v3'}
+    env.pop('SOCKETIO_ASYNC_MODE', None)
+
+    print(f'Fake upstream latency {args.latency * 1000:.0f} ms')
+    print(f'{"mode":<22} {"clients":>7} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"errors":>6}')
+    for mode, label in (('sync', f'gunicorn sync x{args.sync_workers}'), ('eventlet', 'eventlet x1')):
+        port = free_port()
+        server = serve(mode, port, env, args.sync_workers)
+        try:
+            url = f'http://127.0.0.1:{port}/api/depth/BTCUSDT'
+            wait_ready(url)
+            for concurrency in args.concurrency:
+                rate, p50, p95, errors = load(url, concurrency, args.requests)
+                print(f'{label:<22} {concurrency:>7} {rate:>8.1f} {p50:>8.0f} {p95:>8.0f} {errors:>6}')
+        finally:
+            server.terminate()
+            server.wait(10)
+    upstream.shutdown()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,10 +3,32 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+_database_url = os.getenv('DATABASE_URL')
+_replica_urls = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+
+def _engine_options():
+    options = {
+        'pool_pre_ping': os.getenv('SQLALCHEMY_POOL_PRE_PING', 'true').lower() == 'true',
+        'pool_recycle': int(os.getenv('SQLALCHEMY_POOL_RECYCLE', 1800)),
+    }
+    # SQLite uses a single-connection pool that rejects sizing arguments
+    if not (_database_url or '').startswith('sqlite'):
+        options.update(
+            pool_size=int(os.getenv('SQLALCHEMY_POOL_SIZE', 10)),
+            max_overflow=int(os.getenv('SQLALCHEMY_MAX_OVERFLOW', 20)),
+            pool_timeout=int(os.getenv('SQLALCHEMY_POOL_TIMEOUT', 30)),
+        )
+    return options
+
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY')
-    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
+    SQLALCHEMY_DATABASE_URI = _database_url
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options()
+    SQLALCHEMY_BINDS = {f'replica_{i}': url for i, url in enumerate(_replica_urls)}
+    SQLALCHEMY_REPLICA_MAX_LAG = float(os.getenv('SQLALCHEMY_REPLICA_MAX_LAG', 5))
+    SQLALCHEMY_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('SQLALCHEMY_REPLICA_LAG_CHECK_INTERVAL', 10))
+    SQLALCHEMY_READ_YOUR_WRITES_WINDOW = float(os.getenv('SQLALCHEMY_READ_YOUR_WRITES_WINDOW', 10))
     BINANCE_API_KEY = os.getenv('BINANCE_API_KEY')
     BINANCE_SECRET_KEY = os.getenv('BINANCE_SECRET_KEY')
     COINMARKETCAP_API_KEY = os.getenv('COINMARKETCAP_API_KEY')
@@ -16,3 +38,11 @@ class Config:
     MAIL_USERNAME = os.getenv('MAIL_USERNAME')
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER')
+    REDIS_URL = os.getenv('REDIS_URL') or os.getenv('CACHE_REDIS_URL')
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE') or REDIS_URL
+    SOCKETIO_CHANNEL = os.getenv('SOCKETIO_CHANNEL', 'crypto-market-socketio')
+    SOCKETIO_ASYNC_MODE = os.getenv('SOCKETIO_ASYNC_MODE', 'threading')
+    # Whether the serving process drains the local notification queue; CLI commands never do
+    NOTIFICATION_DISPATCH = os.getenv('NOTIFICATION_DISPATCH', 'true').lower() == 'true'
+    # With a queue the singleton jobs belong to worker.py alone; without one the single web process runs them
+    REALTIME_PRODUCER = 'external' if SOCKETIO_MESSAGE_QUEUE else 'inline'
@@ -1,6 +1,132 @@
+import itertools
+import logging
+import time
+
+from flask import current_app, has_request_context, request, session as flask_session
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+
+from utils.concurrency import bounded_map
+
+logger = logging.getLogger(__name__)
+
+READ_ONLY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+LAST_WRITE_KEY = '_db_last_write'
+
+
+class ReplicaRouter:
+    """Picks a healthy read replica, skipping replicas that lag too far behind the primary."""
+
+    def __init__(self):
+        self._counter = itertools.count()
+        self._lag = {}  # bind key -> (checked_at, lag_seconds)
+
+    def replica_keys(self):
+        binds = current_app.config.get('SQLALCHEMY_BINDS') or {}
+        return sorted(key for key in binds if key.startswith('replica_'))
+
+    def choose(self, db):
+        keys = self.replica_keys()
+        if not keys:
+            return None
+
+        max_lag = current_app.config['SQLALCHEMY_REPLICA_MAX_LAG']
+        start = next(self._counter)
+        for offset in range(len(keys)):
+            key = keys[(start + offset) % len(keys)]
+            engine = db.engines[key]
+            if self.lag(key, engine) <= max_lag:
+                return engine
+        return None
+
+    def lag(self, key, engine):
+        checked_at, lag = self._lag.get(key, (0, None))
+        if lag is not None and time.monotonic() - checked_at < current_app.config['SQLALCHEMY_REPLICA_LAG_CHECK_INTERVAL']:
+            return lag
+
+        lag = self._measure_lag(engine)
+        self._lag[key] = (time.monotonic(), lag)
+        return lag
+
+    @staticmethod
+    def _measure_lag(engine):
+        if engine.dialect.name != 'postgresql':
+            return 0.0
+        try:
+            with engine.connect() as conn:
+                lag = conn.execute(text(
+                    'SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)'
+                )).scalar()
+            return float(lag or 0)
+        except Exception as e:
+            logger.warning(f"Replica lag check failed for {engine.url.host}: {e}")
+            return float('inf')
+
+
+replica_router = ReplicaRouter()
+
+
+def _is_read_only_request():
+    return has_request_context() and request.method in READ_ONLY_METHODS
+
+
+def _wrote_recently():
+    """Read-your-writes: keep a browser session on the primary for a while after it wrote."""
+    if not has_request_context():
+        return False
+    last_write = flask_session.get(LAST_WRITE_KEY)
+    window = current_app.config['SQLALCHEMY_READ_YOUR_WRITES_WINDOW']
+    return last_write is not None and time.time() - last_write < window
+
+
+class RoutingSession(Session):
+    """Session that sends reads from read-only request handlers to a replica and everything else to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        primary = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or primary is not self._db.engine:
+            return primary
+
+        if (
+            self._flushing
+            or self.info.get('wrote')
+            or getattr(clause, 'is_dml', False)
+            or not self.info.get('replica_reads', _is_read_only_request() and not _wrote_recently())
+        ):
+            return primary
+
+        return replica_router.choose(self._db) or primary
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _record_write(session, flush_context):
+    session.info['wrote'] = True
+    if has_request_context():
+        flask_session[LAST_WRITE_KEY] = time.time()
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+def run_reads(*queries):
+    """Run independent read-only query functions concurrently and return their results in order.
+
+    Each query runs in its own app context, so it gets its own scoped session
+    and connection. The workers have no request context, so the request's
+    replica routing decision is made here and handed to their sessions.
+    Returned rows are detached; only attributes loaded inside the query can
+    be read afterwards.
+    """
+    app = current_app._get_current_object()
+    replica_reads = _is_read_only_request() and not _wrote_recently()
+
+    def run(query):
+        with app.app_context():
+            db.session.info['replica_reads'] = replica_reads
+            return query()
 
-db = SQLAlchemy()
+    return bounded_map(run, queries, len(queries))
 
 def init_db(app):
     db.init_app(app)
@@ -1,5 +1,5 @@
 from .user import User
-from .portfolio import Portfolio, PortfolioItem
+from .portfolio import Portfolio, PortfolioItem, Position
 from .alert import Alert
 from .watchlist import Watchlist, WatchlistSymbol
 
@@ -1,11 +1,19 @@
-from app import db
+from datetime import datetime
+from database import db
 from models.user import User
 
+COST_METHODS = ('average', 'fifo')
+
 class Portfolio(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     user = db.relationship('User', backref=db.backref('portfolio', lazy='dynamic'))
+    name = db.Column(db.String(100), nullable=False, default='My Portfolio')
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     items = db.relationship('PortfolioItem', backref='portfolio', lazy='dynamic')
+    positions = db.relationship('Position', backref='portfolio', lazy='dynamic')
+    cost_method = db.Column(db.String(10), nullable=False, default='average')
 
     def add_item(self, symbol, quantity, avg_price):
         item = PortfolioItem(symbol=symbol, quantity=quantity, avg_price=avg_price, portfolio_id=self.id)
@@ -22,3 +30,26 @@ class PortfolioItem(db.Model):
     quantity = db.Column(db.Float, nullable=False)
     avg_price = db.Column(db.Float, nullable=False)
     portfolio_id = db.Column(db.Integer, db.ForeignKey('portfolio.id'), nullable=False)
+    purchase_price = db.Column(db.Float)
+    purchase_date = db.Column(db.DateTime, default=datetime.utcnow)
+    is_deleted = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Position(db.Model):
+    """Per-symbol aggregate of a portfolio's lots, maintained alongside them"""
+    __table_args__ = (db.UniqueConstraint('portfolio_id', 'symbol'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    portfolio_id = db.Column(db.Integer, db.ForeignKey('portfolio.id'), nullable=False, index=True)
+    symbol = db.Column(db.String(10), nullable=False)
+    quantity = db.Column(db.Float, nullable=False, default=0.0)
+    cost_basis = db.Column(db.Float, nullable=False, default=0.0)
+    realized_pnl = db.Column(db.Float, nullable=False, default=0.0)
+    open_lots = db.Column(db.JSON, default=list)  # FIFO only: [[quantity, price], ...] oldest first
+    lot_count = db.Column(db.Integer, nullable=False, default=0)
+    last_lot_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def average_price(self):
+        return self.cost_basis / self.quantity if self.quantity else 0.0
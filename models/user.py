@@ -1,9 +1,19 @@
-from app import db, login_manager
+from database import db
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from database import RoutingSession
+from services.user_cache import load_user as load_cached_user, invalidate_user
 import pyotp
 import secrets
 
+DEFAULT_SETTINGS = {
+    'theme': 'light',
+    'currency': 'USD',
+    'email_notifications': True
+}
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(64), index=True, unique=True)
@@ -13,6 +23,7 @@ class User(UserMixin, db.Model):
     two_factor_enabled = db.Column(db.Boolean, default=False)
     two_factor_secret = db.Column(db.String(16))
     recovery_codes = db.Column(db.String(200))
+    settings = db.Column(db.JSON, default=dict)
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -60,10 +71,31 @@ class User(UserMixin, db.Model):
                 return True
         return False
 
+    def update_settings(self, data):
+        settings = dict(DEFAULT_SETTINGS, **(self.settings or {}))
+        settings.update({key: value for key, value in data.items() if key in DEFAULT_SETTINGS})
+        # Reassign so SQLAlchemy notices the JSON column changed
+        self.settings = settings
+        return settings
+
     def save(self):
         db.session.add(self)
         db.session.commit()
 
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
+# Cached user entries are dropped only once the change is committed, so a
+# concurrent request cannot re-cache the old row in between.
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _mark_user_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('changed_users', set()).add(target.id)
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop('changed_users', ()):
+        invalidate_user(user_id)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_changed_users(session):
+    session.info.pop('changed_users', None)
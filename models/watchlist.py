@@ -1,10 +1,13 @@
-from app import db
+from datetime import datetime
+from database import db
 from models.user import User
 
 class Watchlist(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     user = db.relationship('User', backref=db.backref('watchlist', lazy='dynamic'))
+    name = db.Column(db.String(100), nullable=False, default='Watchlist')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     symbols = db.relationship('WatchlistSymbol', backref='watchlist', lazy='dynamic')
 
     def add_symbol(self, symbol):
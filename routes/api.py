@@ -6,9 +6,26 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from flask import Blueprint, jsonify, request, abort
 from flask_login import current_user, login_required
 from models import User, Portfolio, PortfolioItem, Alert, Watchlist, WatchlistSymbol
-from database import db
+from models.user import DEFAULT_SETTINGS
+from models.portfolio import COST_METHODS
+from database import db, run_reads
 from services.binance_service import BinanceService
 from services.binance_api import BinanceAPI
+from services.kline_store import kline_store, kline_columns, MAX_LIMIT as KLINE_MAX_LIMIT, MAX_BASE_ROWS
+from services.downsample import downsample_array, downsample_klines
+from services.price_feed import price_feed
+from services.trade_tape import agg_trade_tape, trade_tape
+from services.ticker_service import ticker_service, FIELDS as TICKER_FIELDS
+from services.screener_service import screener_service, METRICS as SCREENER_METRICS
+from services.search_service import search_service
+from services.news_service import news_service
+from services.risk_service import risk_service
+from services.backtest_service import backtest_service, MAX_EVENTS as BACKTEST_MAX_EVENTS
+from services.position_service import position_service
+from services.indicator_cache import indicator_cache, NotEnoughData
+from services.scan_service import scan_service
+from utils.circuit import all_breakers
+from utils.wire import negotiate_format, columns_response, depth_columns, JSON
 import uuid
 from datetime import datetime
 import logging
@@ -25,23 +42,24 @@ limiter = Limiter(get_remote_address, default_limits=["60 per minute"])  # Remov
 def get_prices():
     """Get all cryptocurrency prices"""
     try:
-        prices = BinanceService.get_crypto_prices()
-        changes_data = BinanceService.get_ticker_24hr()
-
-        if not prices or not changes_data:
-            return jsonify([]), 200
-
-        changes = {item['symbol']: float(item['priceChangePercent']) for item in changes_data}
-        result = [
-            {
-                'symbol': price['symbol'],
-                'price': float(price['price']),
-                'price_change_24h': changes.get(price['symbol'], 0)
-            }
-            for price in prices if price['symbol'].endswith('USDT')
-        ]
-
-        return jsonify(result[:100])  # Limit to top 100
+        since = request.args.get('since', type=int)
+        
+        if since is not None:
+            # Only the symbols that moved after the client's version, unless its listing differs
+            version, listing, full, rows = price_feed.changes_since(since, request.args.get('listing'))
+            return jsonify({'version': version, 'listing': listing, 'full': full, 'prices': rows})
+        
+        fmt = negotiate_format()
+        if fmt != JSON:
+            # Numeric columns sliced from the market table, symbols in meta
+            version, symbols, columns = price_feed.columns()
+            return columns_response(columns, fmt, meta={'version': version, 'symbols': symbols})
+        
+        version, rows = price_feed.snapshot()
+        response = jsonify(rows)
+        response.headers['X-Price-Version'] = str(version)
+        response.headers['X-Price-Listing'] = price_feed.listing
+        return response
     except Exception as e:
         logger.error(f"Error fetching prices: {e}")
         return jsonify({'error': 'Failed to fetch prices'}), 500
@@ -52,10 +70,33 @@ def get_klines(symbol):
     try:
         interval = request.args.get('interval', '1d')
         limit = int(request.args.get('limit', 100))
-        
-        klines = BinanceService.get_klines(symbol, interval=interval, limit=limit)
+        points = request.args.get('points', type=int)
+        mode = request.args.get('mode', 'candles')
+        fmt = negotiate_format()
+        
+        # Downsampled responses stay small, so only they may span more than one upstream page
+        max_limit = MAX_BASE_ROWS if points else KLINE_MAX_LIMIT
+        if not 1 <= limit <= max_limit:
+            return jsonify({'error': f'limit must be between 1 and {max_limit}'}), 400
+        
+        if fmt != JSON:
+            # Compact columnar numbers instead of arrays of strings
+            if points:
+                rows = downsample_array(symbol, interval, limit, points, mode)
+            else:
+                rows = kline_store.get_array(symbol, interval, limit)
+            return columns_response(kline_columns(rows), fmt, meta={'symbol': symbol, 'interval': interval})
+        
+        if points:
+            # Reduce long ranges to roughly one point per pixel of chart width
+            return jsonify(downsample_klines(symbol, interval, limit, points, mode))
+        
+        # Any interval is resampled locally from stored base candles
+        klines = kline_store.get_klines(symbol, interval, limit=limit)
         
         return jsonify(klines)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching klines for {symbol}: {e}")
         return jsonify({'error': f'Failed to fetch klines for {symbol}'}), 500
@@ -66,35 +107,179 @@ def get_depth(symbol):
     try:
         limit = int(request.args.get('limit', 100))
         
-        depth = BinanceService.get_depth(symbol, limit=limit)
+        depth = BinanceAPI.get_depth(symbol, limit=limit)
+        
+        fmt = negotiate_format()
+        if fmt != JSON:
+            return columns_response(depth_columns(depth), fmt,
+                                    meta={'symbol': symbol, 'lastUpdateId': depth.get('lastUpdateId')})
         
         return jsonify(depth)
     except Exception as e:
         logger.error(f"Error fetching depth for {symbol}: {e}")
         return jsonify({'error': f'Failed to fetch depth for {symbol}'}), 500
 
+@api_bp.route('/trades/stats/<symbol>', methods=['GET'])
+def get_trade_stats(symbol):
+    """Get rolling VWAP, buy/sell volume and trade counts for a symbol"""
+    try:
+        return jsonify({
+            'symbol': symbol.upper(),
+            'windows': agg_trade_tape.stats(symbol)
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error fetching trade stats for {symbol}: {e}")
+        return jsonify({'error': f'Failed to fetch trade stats for {symbol}'}), 500
+
+@api_bp.route('/tickers', methods=['GET'])
+def get_tickers():
+    """Get ticker fields for many symbols in one response"""
+    try:
+        symbols = [s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()]
+        fields = [f.strip() for f in request.args.get('fields', ','.join(TICKER_FIELDS)).split(',') if f.strip()]
+        
+        # Validate parameters
+        if not symbols:
+            return jsonify({'error': 'Missing required parameter: symbols'}), 400
+        if len(symbols) > 200:
+            return jsonify({'error': 'Too many symbols (max 200)'}), 400
+        invalid = [s for s in symbols if not ticker_service.valid_symbol(s)]
+        if invalid:
+            return jsonify({'error': f'Invalid symbols: {", ".join(invalid)}'}), 400
+        unknown = [f for f in fields if f not in TICKER_FIELDS]
+        if unknown:
+            return jsonify({'error': f'Invalid fields: {", ".join(unknown)}'}), 400
+        
+        return jsonify(ticker_service.get_tickers(symbols, fields))
+    except Exception as e:
+        logger.error(f"Error fetching tickers: {e}")
+        return jsonify({'error': 'Failed to fetch tickers'}), 500
+
+@api_bp.route('/screener', methods=['GET'])
+def get_screener():
+    """Get symbols ranked by 24h change, quote volume, volatility or spread"""
+    try:
+        sort = request.args.get('sort', 'quote_volume')
+        limit = min(int(request.args.get('limit', 20)), 500)
+        quote = request.args.get('quote')
+        order = request.args.get('order')
+        
+        if sort not in SCREENER_METRICS:
+            return jsonify({'error': f'Invalid sort. Must be one of: {", ".join(SCREENER_METRICS)}'}), 400
+        
+        descending = None if order is None else order == 'desc'
+        return jsonify(screener_service.top(sort, limit, quote.upper() if quote else None, descending))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error fetching screener: {e}")
+        return jsonify({'error': 'Failed to fetch screener'}), 500
+
+@api_bp.route('/search', methods=['GET'])
+def search_symbols():
+    """Typeahead search over symbols, assets and coin names"""
+    try:
+        query = request.args.get('q', '')
+        limit = min(int(request.args.get('limit', 10)), 50)
+        
+        return jsonify(search_service.search(query, limit))
+    except Exception as e:
+        logger.error(f"Error searching symbols: {e}")
+        return jsonify({'error': 'Failed to search symbols'}), 500
+
+@api_bp.route('/scan', methods=['GET'])
+def scan_indicators():
+    """Get symbols whose indicator value meets a condition, e.g. RSI below 30 on 1h"""
+    try:
+        indicator = request.args.get('indicator', 'rsi')
+        interval = request.args.get('interval', '1h')
+        condition = request.args.get('condition', 'lt:30')
+        period = request.args.get('period', type=int)
+        quote = request.args.get('quote', 'USDT').upper()
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        
+        return jsonify(scan_service.scan(indicator, interval, condition, period=period, quote=quote, limit=limit))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error scanning {request.args.get('indicator')}: {e}")
+        return jsonify({'error': 'Failed to run indicator scan'}), 500
+
 @api_bp.route('/indicators/<symbol>', methods=['GET'])
 def get_indicators(symbol):
     """Get technical indicators for a symbol"""
     try:
         interval = request.args.get('interval', '1d')
         
-        indicators = TechnicalAnalysisService.get_technical_indicators(symbol, interval=interval)
+        # Computed on closed candles and shared until the next close
+        indicators = indicator_cache.get(symbol, interval, 'summary')
         
         return jsonify(indicators)
+    except NotEnoughData as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error calculating indicators for {symbol}: {e}")
         return jsonify({'error': f'Failed to calculate indicators for {symbol}'}), 500
 
+@api_bp.route('/indicators/cache/stats', methods=['GET'])
+def get_indicator_cache_stats():
+    """Get indicator cache hit/miss counters for this worker and the whole deployment"""
+    try:
+        return jsonify({
+            'process': indicator_cache.stats(),
+            'cluster': indicator_cache.cluster_stats()
+        })
+    except Exception as e:
+        logger.error(f"Error fetching indicator cache stats: {e}")
+        return jsonify({'error': 'Failed to fetch indicator cache stats'}), 500
+
+@api_bp.route('/technical/rsi/<symbol>', methods=['GET'])
+def get_rsi(symbol):
+    """Get RSI for a symbol"""
+    try:
+        interval = request.args.get('interval', '1d')
+        period = request.args.get('period', 14, type=int)
+        
+        return jsonify(indicator_cache.get(symbol, interval, 'rsi', {'period': period}))
+    except NotEnoughData as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error calculating RSI for {symbol}: {e}")
+        return jsonify({'error': f'Failed to calculate RSI for {symbol}'}), 500
+
+@api_bp.route('/technical/ma/<symbol>', methods=['GET'])
+def get_moving_averages(symbol):
+    """Get moving averages for a symbol"""
+    try:
+        interval = request.args.get('interval', '1d')
+        
+        return jsonify(indicator_cache.get(symbol, interval, 'ma'))
+    except NotEnoughData as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error calculating moving averages for {symbol}: {e}")
+        return jsonify({'error': f'Failed to calculate moving averages for {symbol}'}), 500
+
 @api_bp.route('/news', methods=['GET'])
 def get_news():
     """Get cryptocurrency news"""
     try:
         limit = int(request.args.get('limit', 10))
         
-        news = NewsService.get_crypto_news(limit=limit)
+        # Served from the in-process article index; never waits on a feed
+        news = news_service.get_crypto_news(limit=limit)
         
         return jsonify(news)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching news: {e}")
         return jsonify({'error': 'Failed to fetch news'}), 500
@@ -105,13 +290,123 @@ def get_coin_news(coin):
     try:
         limit = int(request.args.get('limit', 10))
         
-        news = NewsService.get_coin_specific_news(coin, limit=limit)
+        news = news_service.get_coin_specific_news(coin, limit=limit)
         
         return jsonify(news)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching news for {coin}: {e}")
         return jsonify({'error': f'Failed to fetch news for {coin}'}), 500
 
+def _portfolio_json(portfolio, positions, prices, items=None):
+    """Portfolio response body from its positions (and optionally its lots) at ``prices``"""
+    # Calculate position values
+    positions_data = []
+    total_invested = 0
+    total_current_value = 0
+    total_realized = 0
+    
+    for position in positions:
+        current_price = prices.get(position.symbol, 0)
+        current_value = position.quantity * current_price
+        
+        total_invested += position.cost_basis
+        total_current_value += current_value
+        total_realized += position.realized_pnl
+        
+        positions_data.append({
+            'symbol': position.symbol,
+            'quantity': position.quantity,
+            'average_price': position.average_price,
+            'cost_basis': position.cost_basis,
+            'realized_pnl': position.realized_pnl,
+            'current_price': current_price,
+            'current_value': current_value,
+            'unrealized_pnl': current_value - position.cost_basis,
+            'lot_count': position.lot_count
+        })
+    
+    # Calculate profit/loss
+    total_profit_loss = total_current_value - total_invested
+    total_profit_loss_percent = (total_profit_loss / total_invested * 100) if total_invested > 0 else 0
+    
+    result = {
+        'id': portfolio.id,
+        'name': portfolio.name,
+        'cost_method': portfolio.cost_method,
+        'positions': positions_data,
+        'total_invested': total_invested,
+        'total_current_value': total_current_value,
+        'total_profit_loss': total_profit_loss,
+        'total_profit_loss_percent': total_profit_loss_percent,
+        'total_realized_pnl': total_realized
+    }
+    
+    if items is not None:
+        result['items'] = []
+        for item in items:
+            current_price = prices.get(item.symbol, 0)
+            result['items'].append({
+                'id': item.id,
+                'symbol': item.symbol,
+                'quantity': item.quantity,
+                'purchase_price': item.purchase_price,
+                'purchase_date': item.purchase_date.isoformat(),
+                'current_price': current_price,
+                'invested': item.quantity * item.purchase_price,
+                'current_value': item.quantity * current_price
+            })
+    
+    return result
+
+def _alert_json(alert):
+    return {
+        'id': alert.id,
+        'symbol': alert.symbol,
+        'alert_type': 'above' if alert.is_above else 'below',
+        'target_price': alert.price_threshold,
+        'is_active': alert.is_active
+    }
+
+def _symbol_counts(watchlists):
+    """watchlist id -> number of symbols, in one grouped query"""
+    if not watchlists:
+        return {}
+    rows = (db.session.query(WatchlistSymbol.watchlist_id, db.func.count(WatchlistSymbol.id))
+            .filter(WatchlistSymbol.watchlist_id.in_([watchlist.id for watchlist in watchlists]))
+            .group_by(WatchlistSymbol.watchlist_id).all())
+    return dict(rows)
+
+def _watchlists_json(watchlists, counts):
+    return [
+        {
+            'id': watchlist.id,
+            'name': watchlist.name,
+            'created_at': watchlist.created_at.isoformat(),
+            'symbol_count': counts.get(watchlist.id, 0)
+        }
+        for watchlist in watchlists
+    ]
+
+def _watchlist_json(watchlist, symbols, quotes):
+    """Watchlist detail with current prices and 24hr changes from ``quotes`` ({symbol: row})"""
+    symbols_result = []
+    for symbol in symbols:
+        quote = quotes.get(symbol, {})
+        symbols_result.append({
+            'symbol': symbol,
+            'price': quote.get('price') or 0,
+            'price_change_24h': quote.get('price_change_24h') or 0
+        })
+    
+    return {
+        'id': watchlist.id,
+        'name': watchlist.name,
+        'created_at': watchlist.created_at.isoformat(),
+        'symbols': symbols_result
+    }
+
 @api_bp.route('/portfolio', methods=['GET'])
 @login_required
 def get_portfolio():
@@ -123,7 +418,6 @@ def get_portfolio():
         if not portfolio:
             # Create a new portfolio if none exists
             portfolio = Portfolio(
-                id=str(uuid.uuid4()),
                 user_id=current_user.id,
                 name="My Portfolio",
                 is_active=True,
@@ -135,6 +429,8 @@ def get_portfolio():
             return jsonify({
                 'id': portfolio.id,
                 'name': portfolio.name,
+                'cost_method': portfolio.cost_method,
+                'positions': [],
                 'items': [],
                 'total_invested': 0,
                 'total_current_value': 0,
@@ -142,63 +438,73 @@ def get_portfolio():
                 'total_profit_loss_percent': 0
             })
         
-        # Get current prices for all assets
-        all_prices = {item['symbol']: float(item['price']) for item in BinanceService.get_ticker_prices()}
-        
-        # Calculate portfolio values
-        items = []
-        total_invested = 0
-        total_current_value = 0
-        
-        for item in portfolio.items:
-            # Skip deleted items
-            if item.is_deleted:
-                continue
-                
-            symbol = item.symbol
-            quantity = item.quantity
-            purchase_price = item.purchase_price
-            
-            # Get current price
-            current_price = all_prices.get(symbol, 0)
-            
-            # Calculate values
-            invested = quantity * purchase_price
-            current_value = quantity * current_price
-            
-            # Add to totals
-            total_invested += invested
-            total_current_value += current_value
-            
-            # Add item data
-            items.append({
-                'id': item.id,
-                'symbol': symbol,
-                'quantity': quantity,
-                'purchase_price': purchase_price,
-                'purchase_date': item.purchase_date.isoformat(),
-                'current_price': current_price,
-                'invested': invested,
-                'current_value': current_value
-            })
+        # Totals come from the per-symbol aggregates, not from every lot
+        positions = position_service.positions(portfolio)
+        held = [position.symbol for position in positions if position.quantity > 0]
+        all_prices = price_feed.prices(held) if held else {}
         
-        # Calculate profit/loss
-        total_profit_loss = total_current_value - total_invested
-        total_profit_loss_percent = (total_profit_loss / total_invested * 100) if total_invested > 0 else 0
+        # Individual lots are only listed on request (the holdings table edits them)
+        items = None
+        if request.args.get('items', 'false').lower() in ('1', 'true'):
+            items = portfolio.items.filter(PortfolioItem.is_deleted.isnot(True)).all()
         
-        return jsonify({
-            'id': portfolio.id,
-            'name': portfolio.name,
-            'items': items,
-            'total_invested': total_invested,
-            'total_current_value': total_current_value,
-            'total_profit_loss': total_profit_loss,
-            'total_profit_loss_percent': total_profit_loss_percent
-        })
+        return jsonify(_portfolio_json(portfolio, positions, all_prices, items))
     except Exception as e:
         logger.error(f"Error fetching portfolio: {e}")
         return jsonify({'error': 'Failed to fetch portfolio'}), 500
 
+@api_bp.route('/portfolio/risk', methods=['GET'])
+@login_required
+def get_portfolio_risk():
+    """Get volatility, correlation and value-at-risk for the user's holdings"""
+    try:
+        interval = request.args.get('interval', '1d')
+        window = request.args.get('window', 90, type=int)
+        confidence = request.args.get('confidence', 0.95, type=float)
+        
+        # Only parameter errors are echoed back; anything later is an internal error
+        try:
+            risk_service.validate(interval, window, confidence)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        portfolio = Portfolio.query.filter_by(user_id=current_user.id, is_active=True).first()
+        
+        positions = position_service.positions(portfolio) if portfolio else []
+        holdings = {position.symbol: position.quantity for position in positions if position.quantity > 0}
+        
+        if not holdings:
+            return jsonify({'symbols': [], 'excluded': [], 'portfolio': None})
+        
+        return jsonify(risk_service.portfolio_risk(holdings, interval, window, confidence))
+    except Exception as e:
+        logger.error(f"Error computing portfolio risk: {e}")
+        return jsonify({'error': 'Failed to compute portfolio risk'}), 500
+
+@api_bp.route('/portfolio/cost-method', methods=['PUT'])
+@login_required
+def set_portfolio_cost_method():
+    """Switch between average-cost and FIFO accounting"""
+    try:
+        method = (request.json or {}).get('cost_method')
+        if method not in COST_METHODS:
+            return jsonify({'error': f'cost_method must be one of: {", ".join(COST_METHODS)}'}), 400
+        
+        portfolio = Portfolio.query.filter_by(user_id=current_user.id, is_active=True).first()
+        if not portfolio:
+            return jsonify({'error': 'Portfolio not found'}), 404
+        
+        # Realized P&L depends on the method, so every position is replayed
+        portfolio.cost_method = method
+        position_service.rebuild_portfolio(portfolio)
+        db.session.commit()
+        
+        return jsonify({'success': True, 'cost_method': method})
+    except Exception as e:
+        logger.error(f"Error setting cost method: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to set cost method'}), 500
+
 @api_bp.route('/portfolio/add', methods=['POST'])
 @login_required
 def add_portfolio_item():
@@ -218,7 +524,6 @@ def add_portfolio_item():
         if not portfolio:
             # Create a new portfolio if none exists
             portfolio = Portfolio(
-                id=str(uuid.uuid4()),
                 user_id=current_user.id,
                 name="My Portfolio",
                 is_active=True,
@@ -241,6 +546,7 @@ def add_portfolio_item():
         )
         
         db.session.add(item)
+        position_service.record_lot(portfolio, item)
         db.session.commit()
         
         return jsonify({'success': True, 'id': item.id})
@@ -304,6 +610,7 @@ def update_portfolio_item(item_id):
         if 'purchase_date' in data:
             item.purchase_date = datetime.fromisoformat(data['purchase_date'])
         
+        position_service.rebuild_symbol(portfolio, item.symbol)
         db.session.commit()
         
         return jsonify({'success': True})
@@ -330,6 +637,7 @@ def delete_portfolio_item(item_id):
         
         # Soft delete
         item.is_deleted = True
+        position_service.rebuild_symbol(portfolio, item.symbol)
         db.session.commit()
         
         return jsonify({'success': True})
@@ -343,21 +651,9 @@ def delete_portfolio_item(item_id):
 def get_alerts():
     """Get user's price alerts"""
     try:
-        alerts = Alert.query.filter_by(user_id=current_user.id).order_by(Alert.created_at.desc()).all()
-        
-        result = []
-        for alert in alerts:
-            result.append({
-                'id': alert.id,
-                'symbol': alert.symbol,
-                'alert_type': alert.alert_type,
-                'target_price': alert.target_price,
-                'triggered': alert.triggered,
-                'created_at': alert.created_at.isoformat(),
-                'triggered_at': alert.triggered_at.isoformat() if alert.triggered_at else None
-            })
+        alerts = Alert.query.filter_by(user_id=current_user.id).order_by(Alert.id.desc()).all()
         
-        return jsonify(result)
+        return jsonify([_alert_json(alert) for alert in alerts])
     except Exception as e:
         logger.error(f"Error fetching alerts: {e}")
         return jsonify({'error': 'Failed to fetch alerts'}), 500
@@ -381,12 +677,10 @@ def add_alert():
         
         # Create new alert
         alert = Alert(
-            id=str(uuid.uuid4()),
             user_id=current_user.id,
             symbol=data['symbol'],
-            alert_type=data['alert_type'],
-            target_price=data['target_price'],
-            created_at=datetime.utcnow()
+            is_above=data['alert_type'] == 'above',
+            price_threshold=float(data['target_price'])
         )
         
         db.session.add(alert)
@@ -398,6 +692,33 @@ def add_alert():
         db.session.rollback()
         return jsonify({'error': 'Failed to add alert'}), 500
 
+@api_bp.route('/alerts/backtest', methods=['POST'])
+@login_required
+def backtest_alert():
+    """Count how often alerts at one or many prices would have fired in the past"""
+    try:
+        data = request.json or {}
+        
+        # Accepts the /alerts/add payload, or a list of candidate prices
+        if 'symbol' not in data or 'alert_type' not in data:
+            return jsonify({'error': 'Missing required field: symbol or alert_type'}), 400
+        thresholds = data.get('thresholds', [data['target_price']] if 'target_price' in data else None)
+        
+        result = backtest_service.backtest(
+            data['symbol'],
+            data['alert_type'],
+            thresholds,
+            interval=data.get('interval', '1h'),
+            limit=int(data.get('limit', 1000)),
+            max_events=int(data.get('max_events', BACKTEST_MAX_EVENTS))
+        )
+        return jsonify(result)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error backtesting alert: {e}")
+        return jsonify({'error': 'Failed to backtest alert'}), 500
+
 @api_bp.route('/alerts/reset/<alert_id>', methods=['PUT'])
 @login_required
 def reset_alert(alert_id):
@@ -414,8 +735,7 @@ def reset_alert(alert_id):
             return jsonify({'error': 'Unauthorized'}), 403
         
         # Reset alert
-        alert.triggered = False
-        alert.triggered_at = None
+        alert.is_active = True
         db.session.commit()
         
         return jsonify({'success': True})
@@ -456,16 +776,7 @@ def get_watchlists():
     try:
         watchlists = Watchlist.query.filter_by(user_id=current_user.id).all()
         
-        result = []
-        for watchlist in watchlists:
-            result.append({
-                'id': watchlist.id,
-                'name': watchlist.name,
-                'created_at': watchlist.created_at.isoformat(),
-                'symbol_count': WatchlistSymbol.query.filter_by(watchlist_id=watchlist.id).count()
-            })
-        
-        return jsonify(result)
+        return jsonify(_watchlists_json(watchlists, _symbol_counts(watchlists)))
     except Exception as e:
         logger.error(f"Error fetching watchlists: {e}")
         return jsonify({'error': 'Failed to fetch watchlists'}), 500
@@ -489,36 +800,10 @@ def get_watchlist(watchlist_id):
         symbols_data = WatchlistSymbol.query.filter_by(watchlist_id=watchlist_id).all()
         symbols = [symbol.symbol for symbol in symbols_data]
         
-        # Get current prices and 24hr changes
-        all_prices = {}
-        all_changes = {}
-        
-        prices_data = BinanceService.get_ticker_prices()
-        changes_data = BinanceService.get_ticker_24hr()
-        
-        if prices_data:
-            for item in prices_data:
-                all_prices[item['symbol']] = float(item['price'])
-        
-        if changes_data:
-            for item in changes_data:
-                all_changes[item['symbol']] = float(item['priceChangePercent'])
+        # Current prices and 24hr changes from the in-process market table
+        quotes = {row['symbol']: row for row in price_feed.quotes(symbols)} if symbols else {}
         
-        # Prepare result
-        symbols_result = []
-        for symbol in symbols:
-            symbols_result.append({
-                'symbol': symbol,
-                'price': all_prices.get(symbol, 0),
-                'price_change_24h': all_changes.get(symbol, 0)
-            })
-        
-        return jsonify({
-            'id': watchlist.id,
-            'name': watchlist.name,
-            'created_at': watchlist.created_at.isoformat(),
-            'symbols': symbols_result
-        })
+        return jsonify(_watchlist_json(watchlist, symbols, quotes))
     except Exception as e:
         logger.error(f"Error fetching watchlist: {e}")
         return jsonify({'error': 'Failed to fetch watchlist'}), 500
@@ -536,7 +821,6 @@ def create_watchlist():
         
         # Create watchlist
         watchlist = Watchlist(
-            id=str(uuid.uuid4()),
             user_id=current_user.id,
             name=data['name'],
             created_at=datetime.utcnow()
@@ -644,7 +928,8 @@ def remove_symbol_from_watchlist():
 def get_settings():
     """Get user settings"""
     try:
-        return jsonify(current_user.settings)
+        # Served from the user cache; no user-table query in steady state
+        return jsonify(dict(DEFAULT_SETTINGS, **(current_user.settings or {})))
     except Exception as e:
         logger.error(f"Error fetching settings: {e}")
         return jsonify({'error': 'Failed to fetch settings'}), 500
@@ -666,11 +951,67 @@ def update_settings():
         db.session.rollback()
         return jsonify({'error': 'Failed to update settings'}), 500
 
+@api_bp.route('/dashboard/bootstrap', methods=['GET'])
+@login_required
+def get_dashboard_bootstrap():
+    """Get prices, portfolio, alerts, watchlists and settings for the first page load in one response"""
+    try:
+        user_id = current_user.id
+        
+        def load_portfolio():
+            portfolio = Portfolio.query.filter_by(user_id=user_id, is_active=True).first()
+            if not portfolio:
+                return None, [], []
+            items = portfolio.items.filter(PortfolioItem.is_deleted.isnot(True)).all()
+            return portfolio, position_service.positions(portfolio), items
+        
+        def load_alerts():
+            return Alert.query.filter_by(user_id=user_id).order_by(Alert.id.desc()).all()
+        
+        def load_watchlists():
+            watchlists = Watchlist.query.filter_by(user_id=user_id).all()
+            first = [row.symbol for row in WatchlistSymbol.query.filter_by(watchlist_id=watchlists[0].id)] \
+                if watchlists else []
+            return watchlists, _symbol_counts(watchlists), first
+        
+        # Independent queries run concurrently, each on its own connection
+        (portfolio, positions, items), alerts, (watchlists, counts, first_symbols) = run_reads(
+            load_portfolio, load_alerts, load_watchlists
+        )
+        
+        # One price snapshot serves the market list, the portfolio and the watchlist
+        version, rows = price_feed.snapshot()
+        quotes = {row['symbol']: row for row in rows}
+        unlisted = sorted(({position.symbol for position in positions} | set(first_symbols)) - quotes.keys())
+        if unlisted:
+            quotes.update((row['symbol'], row) for row in price_feed.quotes(unlisted))
+        prices = {symbol: quote['price'] for symbol, quote in quotes.items() if quote['price'] is not None}
+        
+        return jsonify({
+            'prices': {'version': version, 'rows': rows},
+            'portfolio': _portfolio_json(portfolio, positions, prices, items) if portfolio else None,
+            'alerts': [_alert_json(alert) for alert in alerts],
+            'watchlists': _watchlists_json(watchlists, counts),
+            'watchlist': _watchlist_json(watchlists[0], first_symbols, quotes) if watchlists else None,
+            'settings': dict(DEFAULT_SETTINGS, **(current_user.settings or {}))
+        })
+    except Exception as e:
+        logger.error(f"Error fetching dashboard bootstrap: {e}")
+        return jsonify({'error': 'Failed to fetch dashboard data'}), 500
+
+@api_bp.route('/upstreams/status', methods=['GET'])
+def get_upstream_status():
+    """Get the circuit breaker state of each upstream"""
+    return jsonify(all_breakers())
+
 @api_bp.route('/binance/aggTrades', methods=['GET'])
 def agg_trades():
     symbol = request.args.get('symbol')
-    limit = request.args.get('limit', 500)
-    data = BinanceAPI.get_agg_trades(symbol, limit)
+    limit = int(request.args.get('limit', 500))
+    try:
+        data = agg_trade_tape.get_agg_trades(symbol, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify(data)
 
 @api_bp.route('/binance/avgPrice', methods=['GET'])
@@ -696,6 +1037,15 @@ def klines():
     symbol = request.args.get('symbol')
     interval = request.args.get('interval')
     limit = request.args.get('limit', 500)
+    points = request.args.get('points', type=int)
+    if points:
+        if not symbol or not interval:
+            return jsonify({'error': 'symbol and interval are required'}), 400
+        try:
+            mode = request.args.get('mode', 'candles')
+            return jsonify(downsample_klines(symbol, interval, int(limit), points, mode))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     data = BinanceAPI.get_klines(symbol, interval, limit)
     return jsonify(data)
 
@@ -736,8 +1086,11 @@ def server_time():
 @api_bp.route('/binance/trades', methods=['GET'])
 def trades():
     symbol = request.args.get('symbol')
-    limit = request.args.get('limit', 500)
-    data = BinanceAPI.get_trades(symbol, limit)
+    limit = int(request.args.get('limit', 500))
+    try:
+        data = trade_tape.get_trades(symbol, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify(data)
 
 @api_bp.route('/binance/uiKlines', methods=['GET'])
@@ -1,11 +1,13 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, abort
 from flask_login import login_required, current_user
 from models.portfolio import Portfolio, PortfolioItem
 from models.watchlist import Watchlist, WatchlistSymbol
 from models.alert import Alert
 from services.api_service import CryptoAPIService
 from services.binance_service import BinanceService
-from services.websocket_service import WebSocketService
+from services.market_overview import market_overview
+from services.price_feed import price_feed
+from utils.fragments import Lazy, model_versions
 
 main = Blueprint('main', __name__)
 
@@ -15,49 +17,42 @@ def index():
         return redirect(url_for('main.dashboard'))
     return render_template('index.html')
 
+def _watchlist_symbols(user_id):
+    watchlist = Watchlist.query.filter_by(user_id=user_id).first()
+    return [symbol.symbol for symbol in watchlist.symbols] if watchlist else []
+
+def _portfolio_items(user_id):
+    portfolio = Portfolio.query.filter_by(user_id=user_id).first()
+    return PortfolioItem.query.filter_by(portfolio_id=portfolio.id).all() if portfolio else []
+
 @main.route('/dashboard')
 @login_required
 def dashboard():
-    crypto_api = CryptoAPIService()
-    binance_service = BinanceService()
-    websocket_service = WebSocketService()
-
-    market_data = crypto_api.get_market_data()
-    watchlist = Watchlist.query.filter_by(user_id=current_user.id).first()
-    watchlist_symbols = []
-    if watchlist:
-        watchlist_symbols = [symbol.symbol for symbol in watchlist.symbols]
-
-    portfolio = Portfolio.query.filter_by(user_id=current_user.id).first()
-    portfolio_items = []
-    if portfolio:
-        portfolio_items = PortfolioItem.query.filter_by(portfolio_id=portfolio.id).all()
-
-    alerts = Alert.query.filter_by(user_id=current_user.id).all()
+    user_id = current_user.id
+    market_version = market_overview.version()
 
+    # Only loaded when a fragment misses; a fully cached page makes no queries or upstream calls
     return render_template('dashboard.html',
-                           market_data=market_data,
-                           watchlist_symbols=watchlist_symbols,
-                           portfolio_items=portfolio_items,
-                           alerts=alerts)
+                           market_version=market_version,
+                           versions=model_versions.get(user_id),
+                           market_data=Lazy(lambda: market_overview.market_data(market_version)),
+                           watchlist_symbols=Lazy(lambda: _watchlist_symbols(user_id)),
+                           portfolio_items=Lazy(lambda: _portfolio_items(user_id)),
+                           alerts=Lazy(lambda: Alert.query.filter_by(user_id=user_id).all()))
 
 @main.route('/portfolio')
 @login_required
 def portfolio():
-    portfolio = Portfolio.query.filter_by(user_id=current_user.id).first()
-    portfolio_items = []
-    if portfolio:
-        portfolio_items = PortfolioItem.query.filter_by(portfolio_id=portfolio.id).all()
-    return render_template('portfolio.html', portfolio_items=portfolio_items)
+    user_id = current_user.id
+    return render_template('portfolio.html', portfolio_items=Lazy(lambda: _portfolio_items(user_id)))
 
 @main.route('/watchlist')
 @login_required
 def watchlist():
-    watchlist = Watchlist.query.filter_by(user_id=current_user.id).first()
-    watchlist_symbols = []
-    if watchlist:
-        watchlist_symbols = [symbol.symbol for symbol in watchlist.symbols]
-    return render_template('watchlist.html', watchlist_symbols=watchlist_symbols)
+    user_id = current_user.id
+    return render_template('watchlist.html',
+                           versions=model_versions.get(user_id),
+                           watchlist_symbols=Lazy(lambda: _watchlist_symbols(user_id)))
 
 @main.route('/alerts')
 @login_required
@@ -68,13 +63,17 @@ def alerts():
 @main.route('/crypto/<symbol>')
 @login_required
 def crypto_detail(symbol):
-    crypto_api = CryptoAPIService()
-    binance_service = BinanceService()
+    # Served from the streamed market table, so the render never waits on Binance
+    ticker_data = price_feed.ticker(symbol.upper())
+    if ticker_data is None:
+        abort(404)
+    market_version = market_overview.version()
 
-    coin_data = crypto_api.get_coin_data(symbol)
-    ticker_data = binance_service.get_ticker_data(symbol)
+    # The coin section is shared by every user viewing the symbol; the ticker stays live
+    coin_data = Lazy(lambda: market_overview.coin(market_version, symbol))
 
-    return render_template('crypto_detail.html', coin_data=coin_data, ticker_data=ticker_data)
+    return render_template('crypto_detail.html', symbol=symbol.upper(), market_version=market_version,
+                           coin_data=coin_data, ticker_data=ticker_data)
 
 @main.route('/api/binance/ticker')
 def binance_ticker():
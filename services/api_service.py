@@ -1,20 +1,36 @@
 import requests
 from flask import current_app
 
+from utils.circuit import CircuitBreaker, last_known_good
+
+UPSTREAM_TIMEOUT = (3.05, 10)
+
+cmc_breaker = CircuitBreaker('coinmarketcap')
+
+def _request(url, **kwargs):
+    response = requests.get(url, timeout=UPSTREAM_TIMEOUT, **kwargs)
+    if response.status_code >= 500 or response.status_code == 429:
+        # Outages and rate limiting count against the breaker; 4xx answers do not
+        response.raise_for_status()
+    return response
+
 class CryptoAPIService:
-    def __init__(self):
+    def __init__(self, api_key=None):
         self.base_url = 'https://pro-api.coinmarketcap.com/v1'
-        self.api_key = current_app.config['COINMARKETCAP_API_KEY']
+        # Background jobs run outside an app context and pass the key themselves
+        self.api_key = current_app.config['COINMARKETCAP_API_KEY'] if api_key is None else api_key
 
+    @last_known_good('coinmarketcap', key=lambda self: 'global-metrics')
     def get_market_data(self):
         url = f'{self.base_url}/global-metrics/quotes/latest'
         headers = {
             'X-CMC_PRO_API_KEY': self.api_key
         }
-        response = requests.get(url, headers=headers)
+        response = cmc_breaker.call(_request, url, headers=headers)
         response.raise_for_status()
         return response.json()['data']
 
+    @last_known_good('coinmarketcap', key=lambda self, symbol=None: ('listings', symbol))
     def get_coin_data(self, symbol=None):
         url = f'{self.base_url}/cryptocurrency/listings/latest'
         headers = {
@@ -26,6 +42,6 @@ class CryptoAPIService:
         }
         if symbol:
             params['symbol'] = symbol
-        response = requests.get(url, headers=headers, params=params)
+        response = cmc_breaker.call(_request, url, headers=headers, params=params)
         response.raise_for_status()
         return response.json()['data']
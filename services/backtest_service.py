@@ -0,0 +1,133 @@
+import logging
+import math
+
+import numpy as np
+
+from services.kline_store import kline_store, INTERVAL_MS, MAX_BASE_ROWS, OPEN_TIME, OPEN, HIGH, LOW, CLOSE, CLOSE_TIME
+from services.symbol_registry import symbol_registry
+
+logger = logging.getLogger(__name__)
+
+ALERT_TYPES = ('above', 'below')
+MAX_THRESHOLDS = 5000
+MAX_EVENTS = 20  # most recent trigger times returned per threshold
+MAX_TOTAL_EVENTS = 100_000  # trigger times returned per request, across all thresholds
+EVENT_CHUNK = 65_536  # candles expanded into (candle, threshold) events at a time
+
+def trigger_ranges(rows, thresholds, alert_type):
+    """Per candle, the slice of sorted ``thresholds`` the candle would have triggered.
+
+    An 'above' alert at t fires in a candle whose high reaches t after the
+    price started it below t; the start is the lower of the open and the
+    previous close, so gaps count as crossings. 'below' mirrors this with
+    the low. Crossings back and forth inside one candle are invisible at
+    candle resolution, so counts are a lower bound for coarse intervals.
+    """
+    opens = rows[:, OPEN]
+    previous = np.r_[opens[:1], rows[:-1, CLOSE]]
+    if alert_type == 'above':
+        start = np.minimum(opens, previous)
+        return np.searchsorted(thresholds, start, 'right'), np.searchsorted(thresholds, rows[:, HIGH], 'right')
+    start = np.maximum(opens, previous)
+    return np.searchsorted(thresholds, rows[:, LOW], 'left'), np.searchsorted(thresholds, start, 'left')
+
+def trigger_counts(lo, hi, size):
+    """Triggers per threshold from the candle ranges, via a difference array"""
+    diff = np.bincount(lo, minlength=size + 1) - np.bincount(hi, minlength=size + 1)
+    return np.cumsum(diff)[:size]
+
+def recent_triggers(times, lo, hi, size, max_events, chunk=EVENT_CHUNK):
+    """Open times of the last ``max_events`` triggers of every threshold, newest first.
+
+    Candles are expanded into (threshold, time) events a chunk at a time from
+    the newest end, and the walk stops once every threshold with triggers
+    left has its quota, so old history is rarely touched.
+    """
+    remaining = np.minimum(trigger_counts(lo, hi, size), max_events)
+    kept_thresholds, kept_times = [], []
+    end = len(times)
+    while end > 0 and remaining.any():
+        start = max(0, end - chunk)
+        candles = np.arange(end - 1, start - 1, -1)
+        lengths = hi[candles] - lo[candles]
+        total = int(lengths.sum())
+        if total:
+            first = np.cumsum(lengths) - lengths
+            thresholds = np.repeat(lo[candles], lengths) + np.arange(total) - np.repeat(first, lengths)
+            event_times = np.repeat(times[candles], lengths)
+
+            # Group by threshold keeping newest-first order, then keep what each still needs
+            order = np.argsort(thresholds, kind='stable')
+            thresholds, event_times = thresholds[order], event_times[order]
+            group_start = np.searchsorted(thresholds, thresholds, 'left')
+            keep = np.arange(total) - group_start < remaining[thresholds]
+            kept_thresholds.append(thresholds[keep])
+            kept_times.append(event_times[keep])
+            remaining -= np.bincount(thresholds[keep], minlength=size)
+        end = start
+
+    if not kept_thresholds:
+        return [[] for _ in range(size)]
+    thresholds = np.concatenate(kept_thresholds)
+    order = np.argsort(thresholds, kind='stable')
+    event_times = np.concatenate(kept_times)[order].astype(np.int64).tolist()
+    bounds = np.searchsorted(thresholds[order], np.arange(size + 1)).tolist()
+    return [event_times[bounds[i]:bounds[i + 1]] for i in range(size)]
+
+def backtest(rows, thresholds, alert_type, max_events=MAX_EVENTS):
+    """Trigger count and recent trigger times for each threshold, in the given order"""
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    order = np.argsort(thresholds)
+    lo, hi = trigger_ranges(rows, thresholds[order], alert_type)
+    counts = trigger_counts(lo, hi, len(thresholds))
+    times = recent_triggers(rows[:, OPEN_TIME], lo, hi, len(thresholds), max_events) if max_events \
+        else [[] for _ in thresholds]
+
+    results = [None] * len(thresholds)
+    for position, index in enumerate(order.tolist()):
+        results[index] = {
+            'threshold': float(thresholds[index]),
+            'triggers': int(counts[position]),
+            'triggered_at': times[position]
+        }
+    return results
+
+class BacktestService:
+    """How often price alerts would have fired over stored candles"""
+
+    def backtest(self, symbol, alert_type, thresholds, interval='1h', limit=1000, max_events=MAX_EVENTS):
+        if not isinstance(symbol, str) or not symbol_registry.is_listed(symbol.upper()):
+            raise ValueError(f'Unknown symbol: {symbol}')
+        if alert_type not in ALERT_TYPES:
+            raise ValueError('Invalid alert type. Must be "above" or "below"')
+        if interval not in INTERVAL_MS:
+            raise ValueError(f'Unsupported interval: {interval}')
+        if not 1 <= limit <= MAX_BASE_ROWS or kline_store.base_for(interval, limit) is None:
+            raise ValueError(f'limit must be between 1 and {MAX_BASE_ROWS} base candles for interval {interval}')
+        if not 0 <= max_events <= 1000:
+            raise ValueError('max_events must be between 0 and 1000')
+        if not isinstance(thresholds, list) or not 1 <= len(thresholds) <= MAX_THRESHOLDS:
+            raise ValueError(f'thresholds must be a list of 1 to {MAX_THRESHOLDS} prices')
+        if max_events * len(thresholds) > MAX_TOTAL_EVENTS:
+            raise ValueError(f'max_events times the number of thresholds must not exceed {MAX_TOTAL_EVENTS}')
+        try:
+            thresholds = [float(t) for t in thresholds]
+        except (TypeError, ValueError):
+            raise ValueError('thresholds must be numbers')
+        if not all(math.isfinite(t) and t > 0 for t in thresholds):
+            raise ValueError('thresholds must be positive prices')
+
+        rows = kline_store.get_array(symbol, interval, limit)
+        return {
+            'symbol': symbol.upper(),
+            'alert_type': alert_type,
+            'interval': interval,
+            'candles': len(rows),
+            'from': int(rows[0, OPEN_TIME]) if len(rows) else None,
+            'to': int(rows[-1, CLOSE_TIME]) if len(rows) else None,
+            'results': backtest(rows, thresholds, alert_type, max_events) if len(rows) else [
+                {'threshold': t, 'triggers': 0, 'triggered_at': []} for t in thresholds
+            ]
+        }
+
+backtest_service = BacktestService()
@@ -1,81 +1,159 @@
+import json
+import os
+import threading
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from utils.circuit import CircuitBreaker, last_known_good
+from utils.json_stream import iter_items, CHUNK_SIZE
+
+BASE_URL = os.getenv("BINANCE_API_BASE_URL", "https://data-api.binance.vision/api/v3")
+# Upstream calls in flight per process; also the size of the keep-alive connection pool
+UPSTREAM_CONCURRENCY = int(os.getenv("UPSTREAM_CONCURRENCY", 32))
+UPSTREAM_TIMEOUT = (3.05, float(os.getenv("UPSTREAM_READ_TIMEOUT", 10)))  # (connect, read) seconds
+
+# One pooled session per process. Under eventlet its sockets are green, so a slow
+# upstream parks the calling green thread instead of blocking the worker.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_maxsize=UPSTREAM_CONCURRENCY))
+_session.mount("http://", HTTPAdapter(pool_maxsize=UPSTREAM_CONCURRENCY))
+_in_flight = threading.BoundedSemaphore(UPSTREAM_CONCURRENCY)
+
+binance_breaker = CircuitBreaker("binance")
+
+def _replayable(value):
+    # Upstream error payloads ({"code": ..., "msg": ...}) are answers, but not ones worth replaying
+    return value is not None and not (isinstance(value, dict) and "code" in value)
+
+def _latest_klines_key(symbol, interval, limit=500, start_time=None, end_time=None):
+    # Only the newest candles are worth replaying; backfill pages pass straight through
+    if start_time is not None or end_time is not None:
+        return None
+    return repr((symbol, interval, limit))
+
+_last_good = last_known_good("binance", cacheable=_replayable)
+_last_good_klines = last_known_good("binance", key=_latest_klines_key, cacheable=_replayable)
 
-BASE_URL = "https://data-api.binance.vision/api/v3"
+def _request(path, params, stream):
+    response = _session.get(f"{BASE_URL}{path}", params=params, stream=stream, timeout=UPSTREAM_TIMEOUT)
+    if response.status_code >= 500 or response.status_code == 429:
+        # Outages and rate limiting count against the breaker; 4xx answers do not
+        response.raise_for_status()
+    return response
+
+def _get(path, params=None, stream=False):
+    with _in_flight:
+        return binance_breaker.call(_request, path, params, stream)
+
+def _symbol_params(symbol=None, symbols=None):
+    """Single ``symbol`` or a batched ``symbols`` JSON array, as the ticker endpoints accept"""
+    if symbols:
+        return {"symbols": json.dumps(list(symbols), separators=(",", ":"))}
+    return {"symbol": symbol} if symbol else {}
+
+def _stream_items(path, params=None, key=None, fields=None):
+    """Array elements of a large response, decoded as they arrive and trimmed to ``fields``"""
+    with _get(path, params, stream=True) as response:
+        response.raise_for_status()
+        for item in iter_items(response.iter_content(CHUNK_SIZE), key):
+            yield {field: item.get(field) for field in fields} if fields else item
 
 class BinanceAPI:
     @staticmethod
+    @_last_good
     def get_agg_trades(symbol, limit=500):
-        response = requests.get(f"{BASE_URL}/aggTrades", params={"symbol": symbol, "limit": limit})
+        response = _get("/aggTrades", params={"symbol": symbol, "limit": limit})
         return response.json()
 
     @staticmethod
+    @_last_good
     def get_avg_price(symbol):
-        response = requests.get(f"{BASE_URL}/avgPrice", params={"symbol": symbol})
+        response = _get("/avgPrice", params={"symbol": symbol})
         return response.json()
 
     @staticmethod
+    @_last_good
     def get_depth(symbol, limit=100):
-        response = requests.get(f"{BASE_URL}/depth", params={"symbol": symbol, "limit": limit})
+        response = _get("/depth", params={"symbol": symbol, "limit": limit})
         return response.json()
 
     @staticmethod
+    @_last_good
     def get_exchange_info():
-        response = requests.get(f"{BASE_URL}/exchangeInfo")
+        response = _get("/exchangeInfo")
         return response.json()
 
     @staticmethod
-    def get_klines(symbol, interval, limit=500):
-        response = requests.get(f"{BASE_URL}/klines", params={"symbol": symbol, "interval": interval, "limit": limit})
+    def iter_exchange_symbols(fields=None):
+        """Streams exchangeInfo ``symbols`` without materializing the multi-megabyte document"""
+        return _stream_items("/exchangeInfo", key="symbols", fields=fields)
+
+    @staticmethod
+    @_last_good_klines
+    def get_klines(symbol, interval, limit=500, start_time=None, end_time=None):
+        params = {"symbol": symbol, "interval": interval, "limit": limit}
+        if start_time is not None:
+            params["startTime"] = start_time
+        if end_time is not None:
+            params["endTime"] = end_time
+        response = _get("/klines", params=params)
         return response.json()
 
     @staticmethod
     def ping():
-        response = requests.get(f"{BASE_URL}/ping")
+        response = _get("/ping")
         return response.status_code == 200
 
     @staticmethod
-    def get_ticker(symbol=None):
-        params = {"symbol": symbol} if symbol else {}
-        response = requests.get(f"{BASE_URL}/ticker", params=params)
+    @_last_good
+    def get_ticker(symbol=None, symbols=None):
+        params = _symbol_params(symbol, symbols)
+        response = _get("/ticker", params=params)
         return response.json()
 
     @staticmethod
-    def get_24hr_ticker(symbol=None):
-        params = {"symbol": symbol} if symbol else {}
-        response = requests.get(f"{BASE_URL}/ticker/24hr", params=params)
+    @_last_good
+    def get_24hr_ticker(symbol=None, symbols=None):
+        params = _symbol_params(symbol, symbols)
+        response = _get("/ticker/24hr", params=params)
         return response.json()
 
     @staticmethod
-    def get_book_ticker(symbol=None):
-        params = {"symbol": symbol} if symbol else {}
-        response = requests.get(f"{BASE_URL}/ticker/bookTicker", params=params)
+    def iter_24hr_ticker(fields=None):
+        """Streams the all-symbol 24hr ticker, keeping only ``fields`` of each entry"""
+        return _stream_items("/ticker/24hr", fields=fields)
+
+    @staticmethod
+    @_last_good
+    def get_book_ticker(symbol=None, symbols=None):
+        params = _symbol_params(symbol, symbols)
+        response = _get("/ticker/bookTicker", params=params)
         return response.json()
 
     @staticmethod
-    def get_price(symbol=None):
+    @_last_good
+    def get_price(symbol=None, symbols=None):
         """
-        Fetches the latest price(s) for a symbol or all symbols.
+        Fetches the latest price(s) for a symbol, a list of symbols or all symbols.
         """
-        params = {"symbol": symbol} if symbol else {}
-        try:
-            response = requests.get(f"{BASE_URL}/ticker/price", params=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            print(f"Error fetching price: {e}")
-            return None
+        params = _symbol_params(symbol, symbols)
+        response = _get("/ticker/price", params=params)
+        return response.json()
 
     @staticmethod
     def get_server_time():
-        response = requests.get(f"{BASE_URL}/time")
+        response = _get("/time")
         return response.json()
 
     @staticmethod
+    @_last_good
     def get_trades(symbol, limit=500):
-        response = requests.get(f"{BASE_URL}/trades", params={"symbol": symbol, "limit": limit})
+        response = _get("/trades", params={"symbol": symbol, "limit": limit})
         return response.json()
 
     @staticmethod
+    @_last_good
     def get_ui_klines(symbol, interval, limit=500):
-        response = requests.get(f"{BASE_URL}/uiKlines", params={"symbol": symbol, "interval": interval, "limit": limit})
+        response = _get("/uiKlines", params={"symbol": symbol, "interval": interval, "limit": limit})
         return response.json()
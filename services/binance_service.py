@@ -1,29 +1,19 @@
-import requests
-from flask import current_app
+from services.binance_api import BinanceAPI
+
+def _checked(data):
+    # Upstream rejected the request (unknown symbol, bad interval)
+    if isinstance(data, dict) and 'code' in data:
+        raise ValueError(data.get('msg'))
+    return data
 
 class BinanceService:
-    def __init__(self):
-        self.base_url = 'https://data-api.binance.vision/api/v3'
-        
+    """Page-level Binance lookups; shares BinanceAPI's circuit breaker and last-known-good data"""
 
     def get_ticker_data(self, symbol):
-        url = f'{self.base_url}/ticker/24hr'
-        params = {
-            'symbol': symbol
-        }
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
+        return _checked(BinanceAPI.get_24hr_ticker(symbol))
 
     def get_kline_data(self, symbol, interval):
-        url = f'{self.base_url}/klines'
-        params = {
-            'symbol': symbol,
-            'interval': interval
-        }
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
+        return _checked(BinanceAPI.get_klines(symbol, interval))
 
     def subscribe_to_symbol(self, symbol, client_id):
         # Implement WebSocket subscription logic here
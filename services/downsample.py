@@ -0,0 +1,82 @@
+import numpy as np
+
+from services.kline_store import (
+    kline_store, to_binance, OPEN_TIME, OPEN, HIGH, LOW, CLOSE, CLOSE_TIME, SUM_COLUMNS, NUM_COLUMNS
+)
+from utils.cache import TTLCache
+
+# Keyed by (symbol, interval, limit, points, mode); short TTL keeps the open candle fresh
+downsample_cache = TTLCache(maxsize=512, ttl=15)
+
+def lttb_indices(x, y, points):
+    """Largest-Triangle-Three-Buckets: indices of ``points`` samples preserving the visual shape"""
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n)
+
+    # First and last points are always kept; the rest is split into points - 2 buckets
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    selected = np.empty(points, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket is the third triangle vertex
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        px, py = x[previous], y[previous]
+        areas = np.abs((px - avg_x) * (y[start:end] - py) - (px - x[start:end]) * (avg_y - py))
+        previous = start + int(areas.argmax())
+        selected[i + 1] = previous
+    return selected
+
+def downsample_line(rows, points):
+    """Close-price line series reduced with LTTB, as [open_time, close] pairs"""
+    index = lttb_indices(rows[:, OPEN_TIME], rows[:, CLOSE], points)
+    return rows[index][:, [OPEN_TIME, CLOSE]]
+
+def downsample_candles(rows, points):
+    """Merge consecutive candles into at most ``points`` candles, keeping true OHLC extremes"""
+    n = len(rows)
+    if points >= n or points < 1:
+        return rows
+
+    starts = np.unique(np.linspace(0, n, points, endpoint=False).astype(int))
+    ends = np.r_[starts[1:], n] - 1
+
+    out = np.empty((len(starts), NUM_COLUMNS))
+    out[:, OPEN_TIME] = rows[starts, OPEN_TIME]
+    out[:, OPEN] = rows[starts, OPEN]
+    out[:, HIGH] = np.maximum.reduceat(rows[:, HIGH], starts)
+    out[:, LOW] = np.minimum.reduceat(rows[:, LOW], starts)
+    out[:, CLOSE] = rows[ends, CLOSE]
+    out[:, CLOSE_TIME] = rows[ends, CLOSE_TIME]
+    out[:, SUM_COLUMNS] = np.add.reduceat(rows[:, SUM_COLUMNS], starts, axis=0)
+    return out
+
+def downsample_array(symbol, interval, limit, points, mode='candles'):
+    """Reduced kline matrix for a chart ``points`` pixels wide, cached per request shape"""
+    if mode not in ('candles', 'line'):
+        raise ValueError('mode must be "candles" or "line"')
+    if points < 1:
+        raise ValueError('points must be positive')
+    key = (symbol.upper(), interval, limit, points, mode)
+
+    def build():
+        rows = kline_store.get_array(symbol, interval, limit)
+        if mode == 'line':
+            return downsample_line(rows, points)
+        return downsample_candles(rows, points)
+
+    return downsample_cache.get_or_set(key, build)
+
+def downsample_klines(symbol, interval, limit, points, mode='candles'):
+    """downsample_array in the JSON shapes: [time, close] pairs or upstream kline arrays"""
+    rows = downsample_array(symbol, interval, limit, points, mode)
+    if mode == 'line':
+        return [[int(t), c] for t, c in rows.tolist()]
+    return to_binance(rows)
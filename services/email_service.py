@@ -1,18 +1,16 @@
-from flask import current_app
-from flask_mail import Mail, Message
+from flask import url_for
+from flask_mail import Mail
+from services.notification_service import init_notifications, enqueue_email
 
 mail = Mail()
 
 def init_email(app):
     mail.init_app(app)
+    init_notifications(app, mail)
 
 def send_password_reset_email(user):
     token = user.get_reset_password_token()
-    msg = Message('Password Reset Request',
-                  sender=current_app.config['MAIL_DEFAULT_SENDER'],
-                  recipients=[user.email])
-    msg.body = f'''To reset your password, visit the following link:
+    enqueue_email(user.email, 'Password Reset Request', f'''To reset your password, visit the following link:
 {url_for('auth.reset_password', token=token, _external=True)}
 If you did not make this request, please ignore this email.
-'''
-    mail.send(msg)
+''')
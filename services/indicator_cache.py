@@ -0,0 +1,188 @@
+import json
+import logging
+import threading
+import time
+from collections import Counter
+
+from services.kline_store import kline_store, INTERVAL_MS, OPEN_TIME, CLOSE, bucket_offset
+from services.technical_analysis import TechnicalAnalysisService
+from utils.cache import TieredCache
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+LOOKBACK = 250
+CACHE_SIZE = 5000
+MAX_TTL = 86_400
+PENDING_TTL = 5  # closed candle not in the store yet; retry soon
+WARM_DELAY_MS = 2000  # let the final candle arrive before warming
+HOT_KEYS = 200
+FLUSH_SECONDS = 10
+HOT_PREFIX = 'indicators:hot:'
+STATS_KEY = 'indicators:stats'
+STAT_FIELDS = ('local_hits', 'shared_hits', 'misses', 'computed', 'warmed')
+
+# name -> (compute(closes, params), accepted params)
+INDICATORS = {
+    'summary': (lambda closes, params: TechnicalAnalysisService.summary(closes), ()),
+    'ma': (lambda closes, params: TechnicalAnalysisService.moving_averages(closes), ()),
+    'rsi': (lambda closes, params: TechnicalAnalysisService.relative_strength(closes, params.get('period', 14)), ('period',)),
+}
+
+class NotEnoughData(LookupError):
+    """Too few closed candles to compute an indicator; never cached"""
+
+def last_closed_open_time(interval, now_ms=None):
+    """Open time of the most recent candle of ``interval`` that has closed"""
+    interval_ms = INTERVAL_MS[interval]
+    offset = bucket_offset(interval)
+    now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+    return (now_ms - offset) // interval_ms * interval_ms + offset - interval_ms
+
+class IndicatorCache:
+    """Indicator results keyed by (symbol, interval, indicator, params, last closed candle).
+
+    Values never go stale: a closed candle is final, so the key itself rolls
+    over at each close and entries only leave through LRU/TTL eviction. The
+    local tier absorbs repeat viewers in a worker, the Redis tier shares one
+    computation across workers. Request counts per spec are aggregated in
+    Redis so the warming job can recompute the hottest keys right after each
+    close, before viewers ask for them.
+    """
+
+    def __init__(self):
+        self.cache = TieredCache('indicators', maxsize=CACHE_SIZE, ttl=MAX_TTL)
+        self.computed = 0
+        self.warmed = 0
+        self._hot = Counter()
+        self._published = Counter()
+        self._flushed_at = time.time()
+        self._warmed_close = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def spec(symbol, interval, indicator, params=None):
+        if indicator not in INDICATORS:
+            raise ValueError(f'indicator must be one of: {", ".join(INDICATORS)}')
+        if interval not in INTERVAL_MS:
+            raise ValueError(f'Unsupported interval: {interval}')
+        accepted = INDICATORS[indicator][1]
+        params = {k: v for k, v in (params or {}).items() if k in accepted and v is not None}
+        if 'period' in params and not 2 <= params['period'] <= LOOKBACK // 2:
+            raise ValueError(f'period must be between 2 and {LOOKBACK // 2}')
+        return json.dumps([symbol.upper(), interval, indicator, params], sort_keys=True, separators=(',', ':'))
+
+    def get(self, symbol, interval, indicator, params=None):
+        spec = self.spec(symbol, interval, indicator, params)
+        closed_at = last_closed_open_time(interval)
+        key = f'{spec}:{closed_at}'
+        self._record(spec)
+
+        value = self.cache.get(key)
+        if value is None:
+            value, ttl = self._compute(spec, closed_at)
+            self.cache.set(key, value, ttl)
+        return value
+
+    def _compute(self, spec, closed_at):
+        symbol, interval, indicator, params = json.loads(spec)
+        rows = kline_store.get_array(symbol, interval, LOOKBACK + 1)
+        # Only closed candles: the open one would change the result on every tick
+        rows = rows[rows[:, OPEN_TIME] <= closed_at]
+        with self._lock:
+            self.computed += 1
+
+        if len(rows) < 2:
+            raise NotEnoughData(f'Not enough data for {symbol}')
+        value = INDICATORS[indicator][0](rows[:, CLOSE].reshape(1, -1), params)
+        value.update(symbol=symbol, interval=interval, closed_at=int(rows[-1, OPEN_TIME]))
+        ttl = min(MAX_TTL, INTERVAL_MS[interval] // 1000 * 2)
+        return value, (ttl if rows[-1, OPEN_TIME] == closed_at else PENDING_TTL)
+
+    def _record(self, spec):
+        with self._lock:
+            self._hot[spec] += 1
+            due = time.time() - self._flushed_at >= FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Push request counts and hit/miss deltas to Redis for the warmer and /stats"""
+        stats = self.stats()
+        totals = Counter({field: stats[field] for field in STAT_FIELDS})
+        with self._lock:
+            hot, self._hot = self._hot, Counter()
+            deltas = totals - self._published
+            self._published = totals
+            self._flushed_at = time.time()
+
+        client = get_redis()
+        if client is None:
+            # Single process: the warmer reads this process's counts directly
+            with self._lock:
+                self._hot.update(hot)
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for spec, count in hot.items():
+                pipe.zincrby(HOT_PREFIX + json.loads(spec)[1], count, spec)
+            for field, delta in deltas.items():
+                if delta:
+                    pipe.hincrby(STATS_KEY, field, delta)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Error publishing indicator cache counters: {e}")
+
+    def hot_specs(self, interval, limit=HOT_KEYS):
+        client = get_redis()
+        if client is None:
+            with self._lock:
+                specs = [s for s, _ in self._hot.most_common() if json.loads(s)[1] == interval][:limit]
+                for spec in [s for s in self._hot if json.loads(s)[1] == interval]:
+                    self._hot[spec] //= 2
+                self._hot += Counter()  # drop specs decayed to zero
+            return specs
+        key = HOT_PREFIX + interval
+        specs = [s.decode() for s in client.zrevrange(key, 0, limit - 1)]
+        # Halve the scores each close so popularity follows current traffic
+        client.zunionstore(key, {key: 0.5})
+        client.zremrangebyscore(key, '-inf', 0.5)
+        return specs
+
+    def warm_due(self, now_ms=None):
+        """Recompute hot keys of every interval whose candle just closed; run by one instance"""
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        for interval in INTERVAL_MS:
+            closed_at = last_closed_open_time(interval, now_ms - WARM_DELAY_MS)
+            previous = self._warmed_close.setdefault(interval, closed_at)
+            if closed_at == previous:
+                continue
+            self._warmed_close[interval] = closed_at
+            try:
+                specs = self.hot_specs(interval)
+            except Exception as e:
+                logger.warning(f"Error reading hot indicator keys for {interval}: {e}")
+                continue
+            for spec in specs:
+                try:
+                    value, ttl = self._compute(spec, closed_at)
+                    self.cache.set(f'{spec}:{closed_at}', value, ttl)
+                    self.warmed += 1
+                except NotEnoughData:
+                    continue
+                except Exception as e:
+                    logger.warning(f"Error warming indicator {spec}: {e}")
+            if specs:
+                logger.info(f"Warmed {len(specs)} hot indicator keys for {interval}")
+
+    def stats(self):
+        return {**self.cache.stats(), 'computed': self.computed, 'warmed': self.warmed}
+
+    def cluster_stats(self):
+        client = get_redis()
+        if client is None:
+            return None
+        raw = client.hgetall(STATS_KEY)
+        return {k.decode(): int(v) for k, v in raw.items()}
+
+indicator_cache = IndicatorCache()
@@ -0,0 +1,24 @@
+import time
+
+from services.indicator_cache import indicator_cache
+from services.market_overview import market_overview, REFRESH_SECONDS as OVERVIEW_REFRESH_SECONDS
+from services.market_publisher import MarketPublisher
+from services.news_service import news_service, REFRESH_SECONDS as NEWS_REFRESH_SECONDS
+from utils.leader import SingletonScheduler
+
+def build_scheduler(emit, sleep=time.sleep):
+    """Singleton background jobs, run by worker.py, or by the web process when there is no message queue"""
+    scheduler = SingletonScheduler()
+
+    publisher = MarketPublisher(emit)
+    scheduler.hold('market-publisher', lambda lease: publisher.run(sleep, lambda: lease.is_leader))
+
+    # Recompute popular indicators as soon as their candle closes
+    scheduler.every('indicator-warmer', 1, lambda lease: indicator_cache.warm_due())
+
+    # Feeds are fetched once per deployment; every process indexes the results
+    scheduler.every('news-fetcher', NEWS_REFRESH_SECONDS, news_service.refresh)
+
+    # Server-rendered pages read the market overview this job publishes
+    scheduler.every('market-overview', OVERVIEW_REFRESH_SECONDS, market_overview.refresh)
+    return scheduler
@@ -0,0 +1,318 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from services.binance_api import BinanceAPI
+from services.market_stream import market_stream
+from services.symbol_registry import symbol_registry
+
+logger = logging.getLogger(__name__)
+
+INTERVAL_MS = {
+    '1m': 60_000, '3m': 180_000, '5m': 300_000, '15m': 900_000, '30m': 1_800_000,
+    '1h': 3_600_000, '2h': 7_200_000, '4h': 14_400_000, '6h': 21_600_000,
+    '8h': 28_800_000, '12h': 43_200_000, '1d': 86_400_000, '3d': 259_200_000,
+    '1w': 604_800_000,
+}
+
+# Intervals kept as stored base series; everything else is resampled from them
+BASE_INTERVALS = ('1m', '1h', '1d')
+
+# Binance weeks start on Monday and the Unix epoch was a Thursday
+WEEK_OFFSET_MS = 4 * 86_400_000
+
+# Column layout of the Binance kline array (the trailing "ignore" field is dropped)
+OPEN_TIME, OPEN, HIGH, LOW, CLOSE, VOLUME, CLOSE_TIME, QUOTE_VOLUME, TRADES, TAKER_BASE, TAKER_QUOTE = range(11)
+NUM_COLUMNS = 11
+SUM_COLUMNS = [VOLUME, QUOTE_VOLUME, TRADES, TAKER_BASE, TAKER_QUOTE]
+
+MAX_BASE_ROWS = 50_000
+UPSTREAM_PAGE = 1000
+MAX_LIMIT = 1000  # candles per response, as upstream allows
+MAX_SERIES = 512  # each one holds a kline stream subscription
+MAX_STORED_ROWS = 1_000_000  # base plus derived candles across all series, about 88 MB
+
+def bucket_offset(interval):
+    return WEEK_OFFSET_MS if interval == '1w' else 0
+
+def to_array(klines):
+    """Binance kline lists (numbers as strings) to a float64 matrix"""
+    if isinstance(klines, dict):
+        # Upstream rejected the request (unknown symbol, bad interval)
+        raise ValueError(klines.get('msg'))
+    if not klines:
+        return np.empty((0, NUM_COLUMNS))
+    return np.array([k[:NUM_COLUMNS] for k in klines], dtype=np.float64)
+
+def to_binance(rows):
+    """Float64 kline matrix back to the upstream list-of-strings format"""
+    return [
+        [int(r[OPEN_TIME]), f'{r[OPEN]:.8f}', f'{r[HIGH]:.8f}', f'{r[LOW]:.8f}', f'{r[CLOSE]:.8f}',
+         f'{r[VOLUME]:.8f}', int(r[CLOSE_TIME]), f'{r[QUOTE_VOLUME]:.8f}', int(r[TRADES]),
+         f'{r[TAKER_BASE]:.8f}', f'{r[TAKER_QUOTE]:.8f}', '0']
+        for r in rows.tolist()
+    ]
+
+def kline_columns(rows):
+    """Named numeric columns for the compact wire formats (two-column rows are a time/close line)"""
+    if rows.shape[1] == 2:
+        return {'t': rows[:, 0], 'c': rows[:, 1]}
+    return {
+        't': rows[:, OPEN_TIME], 'o': rows[:, OPEN], 'h': rows[:, HIGH], 'l': rows[:, LOW],
+        'c': rows[:, CLOSE], 'v': rows[:, VOLUME], 'q': rows[:, QUOTE_VOLUME], 'n': rows[:, TRADES]
+    }
+
+def resample(base, interval_ms, offset=0):
+    """Aggregate base candles into ``interval_ms`` buckets in one vectorized pass"""
+    if len(base) == 0:
+        return np.empty((0, NUM_COLUMNS))
+
+    buckets = (base[:, OPEN_TIME] - offset) // interval_ms * interval_ms + offset
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(base)] - 1
+
+    out = np.empty((len(starts), NUM_COLUMNS))
+    out[:, OPEN_TIME] = buckets[starts]
+    out[:, OPEN] = base[starts, OPEN]
+    out[:, HIGH] = np.maximum.reduceat(base[:, HIGH], starts)
+    out[:, LOW] = np.minimum.reduceat(base[:, LOW], starts)
+    out[:, CLOSE] = base[ends, CLOSE]
+    out[:, CLOSE_TIME] = out[:, OPEN_TIME] + interval_ms - 1
+    out[:, SUM_COLUMNS] = np.add.reduceat(base[:, SUM_COLUMNS], starts, axis=0)
+    return out
+
+def merge(acc, row):
+    """Fold a later candle into an aggregate candle"""
+    if acc is None:
+        return row.copy()
+    out = acc.copy()
+    out[HIGH] = max(acc[HIGH], row[HIGH])
+    out[LOW] = min(acc[LOW], row[LOW])
+    out[CLOSE] = row[CLOSE]
+    out[SUM_COLUMNS] += row[SUM_COLUMNS]
+    return out
+
+class DerivedSeries:
+    """Higher-interval candles kept current as base candles arrive.
+
+    Completed buckets are frozen in ``completed``; the open bucket is the
+    aggregate of its already-closed base candles plus the live base candle,
+    so each update costs O(1) no matter how wide the bucket is.
+    """
+
+    def __init__(self, base, interval):
+        self.interval_ms = INTERVAL_MS[interval]
+        self.offset = bucket_offset(interval)
+        self.completed = np.empty((0, NUM_COLUMNS))
+        self.bucket_start = None
+        self.closed = None
+        self.live = None
+
+        if len(base):
+            full = resample(base, self.interval_ms, self.offset)
+            self.completed = full[:-1]
+            self.bucket_start = full[-1, OPEN_TIME]
+            in_bucket = base[base[:, OPEN_TIME] >= self.bucket_start]
+            for row in in_bucket[:-1]:
+                self.closed = merge(self.closed, row)
+            self.live = in_bucket[-1].copy()
+
+    def bucket_of(self, open_time):
+        return (open_time - self.offset) // self.interval_ms * self.interval_ms + self.offset
+
+    def push(self, row):
+        if self.live is not None and row[OPEN_TIME] > self.live[OPEN_TIME]:
+            # The previous base candle has closed
+            self.closed = merge(self.closed, self.live)
+            self.live = None
+
+        bucket = self.bucket_of(row[OPEN_TIME])
+        if self.bucket_start is not None and bucket > self.bucket_start:
+            self.completed = np.vstack([self.completed[-MAX_BASE_ROWS:], self._finish(self.closed)])
+            self.closed = None
+        self.bucket_start = bucket
+        self.live = row.copy()
+
+    def current(self):
+        if self.live is None:
+            return None
+        return self._finish(merge(self.closed, self.live))
+
+    def _finish(self, row):
+        row = row.copy()
+        row[OPEN_TIME] = self.bucket_start
+        row[CLOSE_TIME] = self.bucket_start + self.interval_ms - 1
+        return row
+
+    def tail(self, limit):
+        current = self.current()
+        if current is None:
+            return self.completed[-limit:]
+        return np.vstack([self.completed[-(limit - 1):] if limit > 1 else self.completed[:0], current])
+
+class BaseSeries:
+    """Growable float64 matrix of base candles ordered by open time"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.rows = np.empty((0, NUM_COLUMNS))
+        self.complete_history = False
+        self.updated_at = 0
+        self.derived = {}
+        self.lock = threading.RLock()
+
+    def merge_history(self, rows):
+        """Merge an older/overlapping block fetched from upstream"""
+        if len(rows) == 0:
+            return
+        combined = np.vstack([rows, self.rows])
+        # np.unique keeps the first occurrence, so freshly fetched candles win over stored ones
+        _, index = np.unique(combined[:, OPEN_TIME], return_index=True)
+        self.rows = combined[index][-MAX_BASE_ROWS:]
+        self.derived.clear()
+        self.updated_at = time.time()
+
+    def push(self, row):
+        """Apply one streamed candle: replace the open candle or append a new one"""
+        if len(self.rows) and row[OPEN_TIME] == self.rows[-1, OPEN_TIME]:
+            self.rows[-1] = row
+        elif not len(self.rows) or row[OPEN_TIME] > self.rows[-1, OPEN_TIME]:
+            self.rows = np.vstack([self.rows[-(MAX_BASE_ROWS - 1):], row])
+        else:
+            return
+        for series in self.derived.values():
+            series.push(row)
+        self.updated_at = time.time()
+
+    def get_derived(self, interval):
+        if interval not in self.derived:
+            self.derived[interval] = DerivedSeries(self.rows, interval)
+        return self.derived[interval]
+
+    def size(self):
+        return len(self.rows) + sum(len(series.completed) for series in list(self.derived.values()))
+
+class KlineStore:
+    """Stores base candles per symbol and derives every other interval locally.
+
+    Series are kept least recently used first and evicted, along with their
+    stream subscription, once there are more than MAX_SERIES of them or they
+    hold more than MAX_STORED_ROWS candles together.
+    """
+
+    def __init__(self):
+        self._series = OrderedDict()
+        self._lock = threading.RLock()
+        market_stream.on('kline', self._on_kline)
+
+    @staticmethod
+    def base_for(interval, limit):
+        """Largest base interval that divides ``interval`` and covers ``limit`` candles.
+
+        The largest divisor needs the fewest stored rows and upstream pages, e.g.
+        250 hourly candles are 250 1h rows rather than 15,000 1m rows.
+        """
+        target = INTERVAL_MS.get(interval)
+        if target is None:
+            return None
+        for base in reversed(BASE_INTERVALS):
+            ratio = target // INTERVAL_MS[base]
+            if target % INTERVAL_MS[base] == 0 and limit * ratio <= MAX_BASE_ROWS:
+                return base
+        return None
+
+    def get_klines(self, symbol, interval, limit=500):
+        """Candles in the upstream array format, served from local base candles"""
+        if self.base_for(interval, limit) is None:
+            return BinanceAPI.get_klines(symbol.upper(), interval, limit)
+        return to_binance(self.get_array(symbol, interval, limit))
+
+    def get_array(self, symbol, interval, limit=500):
+        """Candles as a float64 matrix (see the column constants above)"""
+        if not 1 <= limit <= MAX_BASE_ROWS:
+            raise ValueError(f'limit must be between 1 and {MAX_BASE_ROWS}')
+        symbol = symbol.upper()
+        base = self.base_for(interval, limit)
+        if base is None:
+            return to_array(BinanceAPI.get_klines(symbol, interval, limit))
+
+        needed = limit * (INTERVAL_MS[interval] // INTERVAL_MS[base])
+        series = self._get_series(symbol, base)
+        # Per-series lock: upstream backfills of different symbols run concurrently
+        with series.lock:
+            self._ensure_history(symbol, series, needed)
+            if interval == base:
+                rows = series.rows[-limit:].copy()
+            else:
+                rows = series.get_derived(interval).tail(limit)
+        self._evict()
+        return rows
+
+    def _get_series(self, symbol, base):
+        key = (symbol, base)
+        with self._lock:
+            series = self._series.get(key)
+            if series is not None:
+                self._series.move_to_end(key)
+                return series
+
+        # Unknown symbols would otherwise hold a series and a stream subscription each
+        if not symbol_registry.is_listed(symbol):
+            raise ValueError(f'Unknown symbol: {symbol}')
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = BaseSeries(base)
+                market_stream.subscribe(f'{symbol.lower()}@kline_{base}')
+        self._evict()
+        return series
+
+    def _evict(self):
+        with self._lock:
+            stored = sum(series.size() for series in self._series.values())
+            # The most recently used series always stays, however large
+            while len(self._series) > 1 and (len(self._series) > MAX_SERIES or stored > MAX_STORED_ROWS):
+                (symbol, base), series = self._series.popitem(last=False)
+                stored -= series.size()
+                market_stream.unsubscribe(f'{symbol.lower()}@kline_{base}')
+
+    def _ensure_history(self, symbol, series, needed):
+        base = series.interval
+        if len(series.rows) < needed and not series.complete_history:
+            self._backfill(symbol, series, needed)
+        elif not market_stream.is_subscribed(f'{symbol.lower()}@kline_{base}') and \
+                time.time() - series.updated_at > INTERVAL_MS[base] / 1000:
+            # No live feed; top up with the latest few candles
+            series.merge_history(to_array(BinanceAPI.get_klines(symbol, base, 10)))
+
+    def _backfill(self, symbol, series, needed):
+        end_time = int(series.rows[0, OPEN_TIME]) - 1 if len(series.rows) else None
+        if end_time is None:
+            first_page = min(needed, UPSTREAM_PAGE)
+            series.merge_history(to_array(BinanceAPI.get_klines(symbol, series.interval, first_page)))
+            end_time = int(series.rows[0, OPEN_TIME]) - 1 if len(series.rows) else None
+
+        while end_time is not None and len(series.rows) < needed:
+            page = to_array(BinanceAPI.get_klines(symbol, series.interval, UPSTREAM_PAGE, end_time=end_time))
+            if len(page) == 0:
+                series.complete_history = True
+                break
+            series.merge_history(page)
+            end_time = int(page[0, OPEN_TIME]) - 1
+            if len(page) < UPSTREAM_PAGE:
+                series.complete_history = True
+
+    def _on_kline(self, event):
+        k = event['k']
+        series = self._series.get((k['s'], k['i']))
+        if series is None:
+            return
+        with series.lock:
+            series.push(np.array([
+                k['t'], k['o'], k['h'], k['l'], k['c'], k['v'], k['T'], k['q'], k['n'], k['V'], k['Q']
+            ], dtype=np.float64))
+
+kline_store = KlineStore()
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from config import Config
+from services.api_service import CryptoAPIService
+from utils.cache import TTLCache
+from utils.leader import fenced_set
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+REFRESH_SECONDS = 60
+MAX_AGE = 300  # older than this and a web process refreshes in the background itself
+RETRY_SECONDS = 30  # after a failed inline refresh, pages render without the overview this long
+STORE_SECONDS = 3600
+KEY = 'market-overview'
+POINTER_KEY = f'{KEY}:published'  # hash of the fencing token and the current version
+QUOTE_SUFFIXES = ('USDT', 'USDC', 'FDUSD', 'BUSD', 'USD')
+EMPTY = {'version': None, 'fetched_at': 0, 'market_data': {}, 'coins': []}
+
+class MarketOverview:
+    """CoinMarketCap global metrics and top listings for the server-rendered pages.
+
+    The elected ``market-overview`` job fetches both and publishes them under
+    a content version, which only moves when the data changed. Pages key their
+    shared fragments by that version and load the data only on a fragment
+    miss, so a render never waits on CoinMarketCap. A process that finds the
+    overview older than MAX_AGE (no scheduler, no Redis) refreshes it in the
+    background and keeps serving the old version meanwhile. Only a cold
+    start fetches inline, and after a failure pages render without the
+    overview for RETRY_SECONDS instead of waiting on CoinMarketCap again.
+
+    The current-version pointer is written through the job lease's fencing
+    token, so a deposed job cannot roll it back to older data. Refreshes
+    without a lease publish only until a leader has.
+    """
+
+    def __init__(self, api=None):
+        self.api = api or CryptoAPIService(Config.COINMARKETCAP_API_KEY or '')
+        self._entry = None  # {'version', 'fetched_at', 'market_data', 'coins'}
+        self._retry_at = 0
+        self._refreshing = threading.Lock()
+        self._listings = TTLCache(maxsize=1024, ttl=STORE_SECONDS)  # base -> (coin outside the top listings, fetched_at)
+        self._looking_up = set()
+        self._lock = threading.Lock()
+
+    def refresh(self, lease=None):
+        data = {'market_data': self.api.get_market_data(), 'coins': self.api.get_coin_data()}
+        version = hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()[:12]
+        self._entry = entry = {'version': version, 'fetched_at': time.time(), **data}
+
+        client = get_redis()
+        if client is not None:
+            try:
+                client.set(f'{KEY}:data:{version}', json.dumps(entry), ex=STORE_SECONDS)
+                pointer = json.dumps({'version': version, 'fetched_at': entry['fetched_at']})
+                if lease is not None:
+                    published = lease.fenced_set(POINTER_KEY, pointer)
+                else:
+                    published = fenced_set(client, POINTER_KEY, 0, pointer)
+                if lease is not None and not published:
+                    logger.warning("Market overview job lost leadership; not publishing its version")
+            except Exception as e:
+                logger.warning(f"Publishing market overview failed: {e}")
+        return version
+
+    def _current(self):
+        """(version, fetched_at) of the newer of the published overview and this process's own"""
+        entry = self._entry
+        local = (entry['version'], entry['fetched_at']) if entry else (None, 0)
+        client = get_redis()
+        if client is not None:
+            try:
+                raw = client.hget(POINTER_KEY, 'value')
+                if raw is not None:
+                    current = json.loads(raw)
+                    if current['fetched_at'] >= local[1]:
+                        return current['version'], current['fetched_at']
+            except Exception as e:
+                logger.warning(f"Reading market overview version failed: {e}")
+        return local
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"Refreshing market overview failed: {e}")
+        finally:
+            self._refreshing.release()
+
+    def _refresh_inline(self):
+        """refresh() for a render with nothing to show; None while backing off after a failure"""
+        if time.time() < self._retry_at:
+            return None
+        try:
+            return self.refresh()
+        except Exception as e:
+            logger.warning(f"Refreshing market overview failed: {e}")
+            self._retry_at = time.time() + RETRY_SECONDS
+            return None
+
+    def version(self):
+        """Content version of the newest overview; fetches inline only on a cold start"""
+        version, fetched_at = self._current()
+        if version is None:
+            return self._refresh_inline()
+        if time.time() - fetched_at > MAX_AGE and self._refreshing.acquire(blocking=False):
+            threading.Thread(target=self._refresh_quietly, name='market-overview', daemon=True).start()
+        return version
+
+    def _stored(self, version):
+        """Entry of ``version`` from this process or Redis, or None if neither holds it"""
+        entry = self._entry
+        if entry is not None and entry['version'] == version:
+            return entry
+
+        client = get_redis()
+        if client is not None:
+            try:
+                raw = client.get(f'{KEY}:data:{version}')
+                if raw is not None:
+                    self._entry = entry = json.loads(raw)
+                    return entry
+            except Exception as e:
+                logger.warning(f"Reading market overview {version} failed: {e}")
+        return None
+
+    def data(self, version):
+        if version is None:
+            return EMPTY
+        entry = self._stored(version)
+        if entry is not None:
+            return entry
+        # Evicted or never published; the fresh data is what the page should show anyway
+        self._refresh_inline()
+        return self._entry or EMPTY
+
+    def coins(self):
+        """Top listings of the newest overview held, or None; never calls CoinMarketCap"""
+        version, _ = self._current()
+        entry = self._stored(version) if version is not None else None
+        return entry['coins'] if entry else None
+
+    def market_data(self, version):
+        return self.data(version)['market_data']
+
+    def coin(self, version, symbol):
+        """Listing entry for ``symbol`` ('BTC' or a pair such as 'BTCUSDT'), or None until it is known.
+
+        Coins outside the top listings are looked up in the background; the
+        page shows them from the next market version on.
+        """
+        symbol = symbol.upper()
+        candidates = [symbol] + [symbol[:-len(q)] for q in QUOTE_SUFFIXES if symbol.endswith(q) and len(symbol) > len(q)]
+        coins = {coin['symbol']: coin for coin in self.data(version)['coins']}
+        for candidate in candidates:
+            if candidate in coins:
+                return coins[candidate]
+        entry = self._listings.get(candidates[-1])
+        if entry is None or time.time() - entry[1] > MAX_AGE:
+            self._look_up_later(candidates)
+        # {} marks a coin CoinMarketCap does not list
+        return (entry[0] or None) if entry else None
+
+    def _look_up_later(self, candidates):
+        with self._lock:
+            if candidates[-1] in self._looking_up:
+                return
+            self._looking_up.add(candidates[-1])
+        threading.Thread(target=self._look_up, args=(candidates,), name='market-overview-coin', daemon=True).start()
+
+    def _look_up(self, candidates):
+        try:
+            listing = self.api.get_coin_data(candidates[-1])
+            coin = next((coin for coin in listing if coin['symbol'] in candidates), {})
+            self._listings.set(candidates[-1], (coin, time.time()))
+        except Exception as e:
+            logger.warning(f"Looking up {candidates[-1]} on CoinMarketCap failed: {e}")
+        finally:
+            with self._lock:
+                self._looking_up.discard(candidates[-1])
+
+market_overview = MarketOverview()
@@ -0,0 +1,142 @@
+import logging
+import re
+import time
+
+from services.kline_store import INTERVAL_MS
+from services.market_stream import market_stream
+from services.price_feed import price_feed
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+ROOM_RE = re.compile(r'^(ticker_[a-z0-9]{2,20}|kline_([a-z0-9]{2,20})_(\w{2,3}))$')
+ROOM_TTL = 120
+ROOMS_KEY = 'realtime:rooms'
+SYNC_SECONDS = 5
+PRICE_FLUSH_SECONDS = 1
+
+def valid_room(room):
+    match = ROOM_RE.match(room or '')
+    return bool(match) and (match.group(3) is None or match.group(3) in INTERVAL_MS)
+
+class RoomRegistry:
+    """Rooms with listeners anywhere in the deployment.
+
+    Web workers ``touch`` the rooms their clients joined, with an expiry; the
+    publisher reads the live set to decide which upstream streams it needs.
+    Falls back to process memory when Redis is not configured.
+    """
+
+    def __init__(self, ttl=ROOM_TTL):
+        self.ttl = ttl
+        self._local = {}  # room -> expiry
+
+    def touch(self, rooms):
+        if not rooms:
+            return
+        expiry = time.time() + self.ttl
+        client = get_redis()
+        if client is not None:
+            try:
+                client.zadd(ROOMS_KEY, {room: expiry for room in rooms})
+                return
+            except Exception as e:
+                logger.warning(f"Error registering realtime rooms: {e}")
+        self._local.update((room, expiry) for room in rooms)
+
+    def active(self):
+        now = time.time()
+        client = get_redis()
+        if client is not None:
+            try:
+                client.zremrangebyscore(ROOMS_KEY, '-inf', now)
+                return {room.decode() for room in client.zrange(ROOMS_KEY, 0, -1)}
+            except Exception as e:
+                logger.warning(f"Error reading realtime rooms: {e}")
+        self._local = {room: expiry for room, expiry in self._local.items() if expiry > now}
+        return set(self._local)
+
+room_registry = RoomRegistry()
+
+class MarketPublisher:
+    """Turns market stream events into Socket.IO emits, once per deployment.
+
+    ``emit`` is either the app's SocketIO.emit (single process) or a
+    write-only SocketIO bound to the message queue (worker.py); with a queue,
+    every web worker receives the emit and delivers it to its own clients.
+    Ticker rooms are served from the ``!ticker@arr`` stream; kline rooms
+    subscribe their stream only while someone is listening.
+    """
+
+    def __init__(self, emit, registry=room_registry):
+        self.emit = emit
+        self.registry = registry
+        self._rooms = set()
+        self._owned_streams = set()
+        self._price_version = None
+        self._started = False
+
+    def start(self):
+        if not self._started:
+            market_stream.on('24hrTicker', self._on_ticker)
+            market_stream.on('kline', self._on_kline)
+            self._started = True
+        market_stream.subscribe('!ticker@arr')
+
+    def stop(self):
+        self._rooms = set()
+        if self._owned_streams:
+            market_stream.unsubscribe(*self._owned_streams)
+            self._owned_streams = set()
+        self._price_version = None
+
+    def run(self, sleep=time.sleep, active=lambda: True):
+        """Publish until ``active()`` turns false, e.g. when leadership is lost"""
+        self.start()
+        synced_at = 0
+        while active():
+            if time.time() - synced_at >= SYNC_SECONDS:
+                self.sync_rooms()
+                synced_at = time.time()
+            try:
+                self.flush_prices()
+            except Exception as e:
+                logger.error(f"Error publishing price updates: {e}")
+            sleep(PRICE_FLUSH_SECONDS)
+        self.stop()
+
+    def sync_rooms(self):
+        self._rooms = self.registry.active()
+        wanted = set()
+        for room in self._rooms:
+            match = ROOM_RE.match(room)
+            if match and match.group(2):
+                wanted.add(f'{match.group(2)}@kline_{match.group(3)}')
+
+        # Never drop a stream another service in this process subscribed first
+        new = [s for s in wanted - self._owned_streams if not market_stream.is_subscribed(s)]
+        gone = self._owned_streams - wanted
+        if new:
+            market_stream.subscribe(*new)
+        if gone:
+            market_stream.unsubscribe(*gone)
+        self._owned_streams = (self._owned_streams - gone) | set(new)
+
+    def flush_prices(self):
+        """Broadcast price_update for every listing row changed since the last flush"""
+        if self._price_version is None:
+            self._price_version, _ = price_feed.snapshot()
+            return
+        self._price_version, full, rows = price_feed.changes_since(self._price_version)
+        for row in rows:
+            self.emit('price_update', row)
+
+    def _on_ticker(self, event):
+        room = f"ticker_{event['s'].lower()}"
+        if room in self._rooms:
+            self.emit(room, event, to=room)
+
+    def _on_kline(self, event):
+        room = f"kline_{event['s'].lower()}_{event['k']['i']}"
+        if room in self._rooms:
+            self.emit(room, event, to=room)
@@ -0,0 +1,100 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+WS_BASE_URL = os.getenv('BINANCE_WS_BASE_URL', 'wss://data-stream.binance.vision')
+
+class MarketStream:
+    """Single Binance combined-stream connection per process.
+
+    Services register handlers per event type (``kline``, ``aggTrade``,
+    ``24hrTicker``...) and ask for streams with ``subscribe``; the connection
+    is opened lazily and re-subscribes everything after a reconnect.
+    """
+
+    def __init__(self, base_url=WS_BASE_URL):
+        self.base_url = base_url
+        self._handlers = defaultdict(list)
+        self._streams = set()
+        self._ws = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._request_id = 0
+
+    def on(self, event_type, handler):
+        self._handlers[event_type].append(handler)
+
+    def is_subscribed(self, stream):
+        return stream in self._streams and self._ws is not None
+
+    def subscribe(self, *streams):
+        with self._lock:
+            new = [s for s in streams if s not in self._streams]
+            self._streams.update(new)
+            if self._thread is None:
+                self._start()
+            elif new:
+                self._send('SUBSCRIBE', new)
+
+    def unsubscribe(self, *streams):
+        with self._lock:
+            gone = [s for s in streams if s in self._streams]
+            self._streams.difference_update(gone)
+            if gone:
+                self._send('UNSUBSCRIBE', gone)
+
+    def dispatch(self, data):
+        """Route one decoded event payload to the registered handlers"""
+        for handler in self._handlers.get(data.get('e'), ()):
+            try:
+                handler(data)
+            except Exception as e:
+                logger.error(f"Error handling {data.get('e')} event: {e}")
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='market-stream', daemon=True)
+        self._thread.start()
+
+    def _send(self, method, params):
+        if self._ws is None:
+            return
+        self._request_id += 1
+        try:
+            self._ws.send(json.dumps({'method': method, 'params': params, 'id': self._request_id}))
+        except Exception as e:
+            logger.warning(f"Error sending {method} to market stream: {e}")
+
+    def _run(self):
+        import websocket
+
+        while True:
+            def on_open(ws):
+                self._ws = ws
+                with self._lock:
+                    if self._streams:
+                        self._send('SUBSCRIBE', sorted(self._streams))
+
+            def on_message(ws, message):
+                payload = json.loads(message)
+                data = payload.get('data')
+                if data is None:
+                    return  # subscription acknowledgement
+                if isinstance(data, list):
+                    # Array streams such as !ticker@arr
+                    for item in data:
+                        self.dispatch(item)
+                else:
+                    self.dispatch(data)
+
+            app = websocket.WebSocketApp(f'{self.base_url}/stream', on_open=on_open, on_message=on_message)
+            app.run_forever(ping_interval=60, ping_timeout=20)
+            self._ws = None
+            logger.warning("Market stream disconnected; reconnecting")
+            time.sleep(5)
+
+market_stream = MarketStream()
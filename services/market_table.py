@@ -0,0 +1,150 @@
+import sys
+import threading
+
+import numpy as np
+
+# Column order of the table; 'volume' is the 24h quote-asset volume, 'high' and 'low' the 24h range
+FIELDS = ('price', 'change', 'volume', 'bid', 'ask', 'high', 'low')
+INITIAL_CAPACITY = 4096
+LOAD_BATCH = 512
+
+class MarketRow:
+    """Read-only view of one symbol's slot; holds no copies of the numbers"""
+
+    __slots__ = ('_table', 'slot', 'symbol')
+
+    def __init__(self, table, slot, symbol):
+        self._table = table
+        self.slot = slot
+        self.symbol = symbol
+
+    def _get(self, field):
+        value = self._table._data[FIELDS.index(field), self.slot]
+        return None if value != value else float(value)  # NaN: never reported
+
+    price = property(lambda self: self._get('price'))
+    change = property(lambda self: self._get('change'))
+    volume = property(lambda self: self._get('volume'))
+    bid = property(lambda self: self._get('bid'))
+    ask = property(lambda self: self._get('ask'))
+    high = property(lambda self: self._get('high'))
+    low = property(lambda self: self._get('low'))
+
+    def to_dict(self):
+        return {'symbol': self.symbol, **{field: self._get(field) for field in FIELDS}}
+
+class MarketTable:
+    """Latest market numbers for every symbol in one contiguous float64 block.
+
+    Each symbol is interned once and owns a fixed slot; each field is one row
+    of a (fields, capacity) array, so a column for all symbols is a zero-copy
+    slice and an update is an in-place store instead of a new dict of strings.
+    Slots are never reused, so a MarketRow stays valid for the process lifetime.
+    """
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self._slots = {}
+        self.symbols = []
+        self._data = np.full((len(FIELDS), capacity), np.nan)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self._slots
+
+    def _slot(self, symbol):
+        slot = self._slots.get(symbol)
+        if slot is None:
+            slot = len(self.symbols)
+            if slot == self._data.shape[1]:
+                grown = np.full((len(FIELDS), slot * 2), np.nan)
+                grown[:, :slot] = self._data
+                self._data = grown
+            symbol = sys.intern(symbol)
+            self._slots[symbol] = slot
+            self.symbols.append(symbol)
+        return slot
+
+    def slots(self, symbols):
+        """Slot per symbol, -1 for symbols never seen"""
+        return np.fromiter((self._slots.get(s, -1) for s in symbols), dtype=np.intp, count=len(symbols))
+
+    def update(self, symbol, **values):
+        """Store one symbol's fields in place; True if any of them changed"""
+        with self._lock:
+            slot = self._slot(symbol)
+            changed = False
+            for field, value in values.items():
+                row = self._data[FIELDS.index(field)]
+                value = float(value)
+                if row[slot] != value:
+                    row[slot] = value
+                    changed = True
+            return changed
+
+    def update_many(self, symbols, columns):
+        """Store ``{field: values}`` for ``symbols`` in one vectorized pass; returns the symbols that changed"""
+        with self._lock:
+            slots = np.fromiter((self._slot(s) for s in symbols), dtype=np.intp, count=len(symbols))
+            changed = np.zeros(len(symbols), dtype=bool)
+            for field, values in columns.items():
+                row = self._data[FIELDS.index(field)]
+                values = np.asarray(values, dtype=np.float64)
+                changed |= row[slots] != values
+                row[slots] = values
+            return [symbols[i] for i in np.flatnonzero(changed)]
+
+    def load(self, rows, fields, batch=LOAD_BATCH):
+        """Store a stream of upstream dicts, ``fields`` mapping their keys to columns.
+
+        Rows are consumed in batches, so a full-market refresh never holds
+        more than ``batch`` parsed rows. Returns (symbols seen, symbols changed).
+        """
+        symbols, changed = [], []
+        chunk, columns = [], {key: [] for key in fields}
+        for row in rows:
+            chunk.append(row['symbol'])
+            for key, values in columns.items():
+                values.append(row[key])
+            if len(chunk) == batch:
+                changed += self.update_many(chunk, {fields[k]: v for k, v in columns.items()})
+                symbols += chunk
+                chunk, columns = [], {key: [] for key in fields}
+        if chunk:
+            changed += self.update_many(chunk, {fields[k]: v for k, v in columns.items()})
+            symbols += chunk
+        return symbols, changed
+
+    def row(self, symbol):
+        slot = self._slots.get(symbol)
+        return None if slot is None else MarketRow(self, slot, symbol)
+
+    def column(self, field):
+        """Zero-copy view of ``field`` for every slot, in slot order (a snapshot of the slots if the table grows)"""
+        return self._data[FIELDS.index(field), :len(self.symbols)]
+
+    def get(self, symbols, field):
+        """``{symbol: value}`` for the known symbols that have ``field``"""
+        slots = self.slots(symbols)
+        with self._lock:
+            values = self._data[FIELDS.index(field)][slots].tolist()
+        return {s: v for s, slot, v in zip(symbols, slots, values) if slot >= 0 and v == v}
+
+    def records(self, symbols, fields):
+        """List of ``{'symbol', name: value}`` dicts, ``fields`` mapping response names to columns"""
+        slots = self.slots(symbols)
+        known = slots >= 0
+        symbols = [s for s, ok in zip(symbols, known) if ok]
+        with self._lock:
+            block = self._data[np.ix_([FIELDS.index(f) for f in fields.values()], slots[known])]
+        keys = ('symbol', *fields)
+        if np.isnan(block).any():
+            block = np.where(np.isnan(block), None, block)  # JSON has no NaN
+        return [dict(zip(keys, values)) for values in zip(symbols, *block.tolist())]
+
+    def nbytes(self):
+        return self._data.nbytes
+
+market_table = MarketTable()
@@ -0,0 +1,299 @@
+import hashlib
+import heapq
+import html
+import json
+import logging
+import os
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+from services.market_overview import market_overview
+from utils.concurrency import bounded_map
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEEDS = (
+    'https://www.coindesk.com/arc/outboundfeeds/rss/',
+    'https://cointelegraph.com/rss',
+    'https://decrypt.co/feed',
+)
+NEWS_FEEDS = [url.strip() for url in os.getenv('NEWS_FEEDS', ','.join(DEFAULT_FEEDS)).split(',') if url.strip()]
+REFRESH_SECONDS = 300
+SYNC_SECONDS = 15
+FEED_TIMEOUT = (3.05, 10)
+FETCH_CONCURRENCY = 8
+MAX_ARTICLES = 2000
+MAX_LIMIT = 100
+SUMMARY_LENGTH = 500
+STREAM_KEY = 'news:articles'
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+TAG_RE = re.compile(r'<[^>]+>')
+WORD_RE = re.compile(r'[A-Za-z0-9]+')
+QUOTE_SUFFIXES = ('USDT', 'USDC', 'FDUSD', 'BUSD', 'BTC', 'ETH', 'EUR', 'USD')
+
+# Used until the market overview's CoinMarketCap listings are available
+DEFAULT_NAMES = {
+    'BTC': 'Bitcoin', 'ETH': 'Ethereum', 'USDT': 'Tether', 'BNB': 'BNB', 'SOL': 'Solana',
+    'XRP': 'XRP', 'USDC': 'USD Coin', 'ADA': 'Cardano', 'DOGE': 'Dogecoin', 'TRX': 'TRON',
+    'AVAX': 'Avalanche', 'DOT': 'Polkadot', 'LINK': 'Chainlink', 'MATIC': 'Polygon',
+    'LTC': 'Litecoin', 'SHIB': 'Shiba Inu', 'TON': 'Toncoin', 'XLM': 'Stellar', 'ATOM': 'Cosmos',
+}
+# Upper-case words that look like tickers but usually are not
+NOT_TICKERS = {'A', 'AI', 'CEO', 'CPI', 'ETF', 'FED', 'FOR', 'GDP', 'IPO', 'IT', 'NFT', 'ON', 'SEC', 'THE', 'UK', 'US', 'USD'}
+
+def _text(element, *tags):
+    for tag in tags:
+        found = element.find(tag)
+        if found is not None and (found.text or found.get('href')):
+            return (found.text or found.get('href')).strip()
+    return ''
+
+def _published(value):
+    try:
+        published = parsedate_to_datetime(value) if ',' in value else datetime.fromisoformat(value)
+        return (published if published.tzinfo else published.replace(tzinfo=timezone.utc)).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+def content_hash(title, summary):
+    """Identity of a story: syndicated copies with other URLs or markup hash the same"""
+    normalized = ' '.join(WORD_RE.findall(f'{title} {summary}'.lower()))
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+def parse_feed(body, source):
+    """Articles from an RSS 2.0 or Atom document"""
+    root = ET.fromstring(body)
+    entries = root.iter('item') if root.find('channel') is not None else root.iter(f'{ATOM}entry')
+    articles = []
+    for entry in entries:
+        title = html.unescape(_text(entry, 'title', f'{ATOM}title'))
+        summary = _text(entry, 'description', f'{ATOM}summary', f'{ATOM}content')
+        summary = ' '.join(html.unescape(TAG_RE.sub(' ', summary)).split())[:SUMMARY_LENGTH]
+        if not title:
+            continue
+        link = entry.find(f'{ATOM}link')
+        articles.append({
+            'id': content_hash(title, summary),
+            'title': title,
+            'url': _text(entry, 'link') or (link.get('href') if link is not None else ''),
+            'summary': summary,
+            'source': source,
+            'published': _published(_text(entry, 'pubDate', f'{ATOM}published', f'{ATOM}updated')),
+        })
+    return articles
+
+class CoinMatcher:
+    """Finds the coins an article mentions, by ticker (upper-case only) or by name.
+
+    One-word names are also ordinary words ("Render", "Flow", "Core"), so they
+    only match when capitalized in the text; longer names match in any case.
+    """
+
+    def __init__(self, names):
+        self.symbols = set(names)
+        self.aliases = {}  # lower-case symbol or name -> symbol
+        self._phrases = defaultdict(list)  # first word of a name -> [(words, symbol)]
+        for symbol, name in names.items():
+            self.aliases[symbol.lower()] = symbol
+            words = tuple(WORD_RE.findall(name.lower()))
+            if words:
+                self.aliases[' '.join(words)] = symbol
+                self._phrases[words[0]].append((words, symbol))
+
+    def coins(self, text):
+        tokens = WORD_RE.findall(text)
+        lower = [token.lower() for token in tokens]
+        found = {token for token in tokens
+                 if token.isupper() and token in self.symbols and token not in NOT_TICKERS}
+        for i, word in enumerate(lower):
+            for words, symbol in self._phrases.get(word, ()):
+                if len(words) == 1 and not tokens[i][0].isupper():
+                    continue
+                if tuple(lower[i:i + len(words)]) == words:
+                    found.add(symbol)
+        return found
+
+    def resolve(self, coin):
+        """'btc', 'Bitcoin' or 'BTCUSDT' -> 'BTC'"""
+        coin = ' '.join(WORD_RE.findall(coin.lower()))
+        if coin in self.aliases:
+            return self.aliases[coin]
+        for quote in QUOTE_SUFFIXES:
+            base = coin[:-len(quote)]
+            if coin.endswith(quote.lower()) and base in self.aliases:
+                return self.aliases[base]
+        return None
+
+class NewsService:
+    """Aggregated crypto news with a per-coin inverted index.
+
+    The elected ``news-fetcher`` job polls the configured RSS/Atom feeds
+    (conditional GETs), drops stories already seen by content hash and
+    appends new ones to a capped Redis stream. Every process replays that
+    stream into a bounded in-memory store, so requests are index lookups
+    that never wait on a feed. Without Redis the fetching process indexes
+    its own results.
+    """
+
+    def __init__(self, feeds=None, max_articles=MAX_ARTICLES):
+        self.feeds = feeds if feeds is not None else NEWS_FEEDS
+        self.max_articles = max_articles
+        self._articles = {}  # id -> article
+        self._by_time = []  # heap of (published, id); oldest evicted first
+        self._index = defaultdict(set)  # coin symbol -> article ids
+        self._names = None
+        self._matcher = CoinMatcher(DEFAULT_NAMES)
+        self._validators = {}  # feed -> conditional request headers
+        self._stream_id = '-'
+        self._sync_thread = None
+        self._lock = threading.Lock()
+
+    def _refresh_matcher(self):
+        try:
+            coins = market_overview.coins()
+        except Exception as e:
+            logger.warning(f"Error loading coin names for news: {e}")
+            return
+        names = {coin['symbol']: coin['name'] for coin in coins or ()}
+        if names and names != self._names:
+            with self._lock:
+                self._names = names
+                self._matcher = CoinMatcher({**DEFAULT_NAMES, **names})
+                self._index.clear()
+                for article in self._articles.values():
+                    self._index_article(article)
+
+    def _index_article(self, article):
+        coins = self._matcher.coins(f"{article['title']} {article['summary']}")
+        article['coins'] = sorted(coins)
+        for coin in coins:
+            self._index[coin].add(article['id'])
+
+    def ingest(self, articles):
+        """Add articles not seen before; returns the new ones"""
+        added = []
+        with self._lock:
+            for article in articles:
+                if article['id'] in self._articles:
+                    continue
+                self._articles[article['id']] = article
+                heapq.heappush(self._by_time, (article['published'], article['id']))
+                self._index_article(article)
+                added.append(article)
+            while len(self._articles) > self.max_articles:
+                _, oldest = heapq.heappop(self._by_time)
+                for coin in self._articles.pop(oldest)['coins']:
+                    self._index[coin].discard(oldest)
+                    if not self._index[coin]:
+                        del self._index[coin]
+        return added
+
+    def _fetch_feed(self, url):
+        try:
+            if '://' not in url or url.startswith('file://'):
+                # Local feed files, used for development and fixtures
+                with open(url.removeprefix('file://'), 'rb') as f:
+                    return parse_feed(f.read(), os.path.basename(url))
+            response = requests.get(url, headers=self._validators.get(url, {}), timeout=FEED_TIMEOUT)
+            if response.status_code == 304:
+                return []
+            response.raise_for_status()
+            self._validators[url] = {header: response.headers[source] for header, source in
+                                     (('If-None-Match', 'ETag'), ('If-Modified-Since', 'Last-Modified'))
+                                     if source in response.headers}
+            return parse_feed(response.content, urlparse(url).hostname)
+        except Exception as e:
+            logger.warning(f"Error fetching news feed {url}: {e}")
+            return []
+
+    def refresh(self, lease=None):
+        """Fetch every feed once and publish new stories; run by the elected fetcher.
+
+        With the fetcher's ``lease``, appends are fenced by its token, so a
+        fetcher deposed mid-refresh cannot publish after its successor.
+        """
+        self.sync()
+        self._refresh_matcher()
+        fetched = [article for articles in bounded_map(self._fetch_feed, self.feeds, FETCH_CONCURRENCY)
+                   for article in articles]
+        added = self.ingest(fetched)
+
+        client = get_redis()
+        if client is not None and added:
+            pipe = client.pipeline(transaction=False)
+            for article in sorted(added, key=lambda a: a['published']):
+                if lease is None:
+                    pipe.xadd(STREAM_KEY, {'article': json.dumps(article)}, maxlen=self.max_articles, approximate=True)
+                else:
+                    lease.fenced_call('XADD', STREAM_KEY, 'MAXLEN', '~', self.max_articles, '*',
+                                      'article', json.dumps(article), client=pipe)
+            if not all(pipe.execute()):
+                logger.warning("News fetcher lost leadership; its articles were not published")
+        if added:
+            logger.info(f"Added {len(added)} news articles from {len(self.feeds)} feeds")
+        return len(added)
+
+    def sync(self):
+        """Replay articles published to the stream since the last sync"""
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            entries = client.xrange(STREAM_KEY, min=self._stream_id if self._stream_id == '-' else f'({self._stream_id}')
+        except Exception as e:
+            logger.warning(f"Error syncing news articles: {e}")
+            return
+        if entries:
+            self._stream_id = entries[-1][0].decode()
+            self.ingest(json.loads(fields[b'article']) for _, fields in entries)
+
+    def _ensure_started(self):
+        if self._sync_thread is None and get_redis() is not None:
+            self._sync_thread = threading.Thread(target=self._sync_forever, name='news-sync', daemon=True)
+            self._sync_thread.start()
+            self.sync()
+
+    def _sync_forever(self):
+        while True:
+            time.sleep(SYNC_SECONDS)
+            self.sync()
+            self._refresh_matcher()
+
+    @staticmethod
+    def _public(article):
+        return {
+            **{key: article[key] for key in ('id', 'title', 'url', 'summary', 'source', 'coins')},
+            'published_at': datetime.fromtimestamp(article['published'], timezone.utc).isoformat()
+        }
+
+    def get_crypto_news(self, limit=10):
+        """Newest articles across all feeds"""
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError(f'limit must be between 1 and {MAX_LIMIT}')
+        self._ensure_started()
+        with self._lock:
+            newest = heapq.nlargest(limit, self._by_time)
+            return [self._public(self._articles[article_id]) for _, article_id in newest]
+
+    def get_coin_specific_news(self, coin, limit=10):
+        """Newest articles mentioning ``coin`` (ticker, name or trading pair)"""
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError(f'limit must be between 1 and {MAX_LIMIT}')
+        self._ensure_started()
+        with self._lock:
+            symbol = self._matcher.resolve(coin)
+            ids = self._index.get(symbol, ())
+            newest = heapq.nlargest(limit, ids, key=lambda article_id: self._articles[article_id]['published'])
+            return [self._public(self._articles[article_id]) for article_id in newest]
+
+news_service = NewsService()
@@ -0,0 +1,258 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from flask import current_app
+from flask_mail import Message
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notification (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipient TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    html TEXT,
+    digest_key TEXT,
+    digest_line TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    claimed_until REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_notification_due ON notification (next_attempt_at, claimed_until);
+"""
+
+class NotificationQueue:
+    """Durable FIFO of outgoing emails stored in a local SQLite file.
+
+    Rows are claimed with a lease so several worker threads (or several
+    processes on the same host) can drain the queue without double-sending;
+    a crashed worker's lease simply expires and the rows become due again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def put(self, recipient, subject, body, html=None, digest_key=None, digest_line=None, delay=0):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO notification (recipient, subject, body, html, digest_key, digest_line, next_attempt_at, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (recipient, subject, body, html, digest_key, digest_line, now + delay, now)
+            )
+
+    def claim(self, limit, lease):
+        """Claim up to ``limit`` due rows for ``lease`` seconds; returns (rows, claim expiry)"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                rows = conn.execute(
+                    'SELECT * FROM notification WHERE next_attempt_at <= ? AND claimed_until <= ? '
+                    'ORDER BY next_attempt_at LIMIT ?',
+                    (now, now, limit)
+                ).fetchall()
+                conn.executemany(
+                    'UPDATE notification SET claimed_until = ? WHERE id = ?',
+                    [(now + lease, row['id']) for row in rows]
+                )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return rows, now + lease
+
+    def renew(self, ids, claimed_until, lease):
+        """Extend a claim on ``ids`` that still expires at ``claimed_until``; returns (new expiry, ids still held)"""
+        until = time.time() + lease
+        if not ids:
+            return until, []
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # A row whose claim lapsed and was taken by another worker carries that worker's expiry
+                held = [row['id'] for row in conn.execute(
+                    f'SELECT id FROM notification WHERE claimed_until = ? AND id IN ({", ".join("?" * len(ids))})',
+                    (claimed_until, *ids)
+                )]
+                conn.executemany('UPDATE notification SET claimed_until = ? WHERE id = ?', [(until, i) for i in held])
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return until, held
+
+    def ack(self, ids):
+        with self._connect() as conn:
+            conn.executemany('DELETE FROM notification WHERE id = ?', [(i,) for i in ids])
+
+    def retry(self, ids, attempts, delay):
+        with self._connect() as conn:
+            conn.executemany(
+                'UPDATE notification SET attempts = ?, next_attempt_at = ?, claimed_until = 0 WHERE id = ?',
+                [(attempts, time.time() + delay, i) for i in ids]
+            )
+
+    def pending(self):
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM notification').fetchone()[0]
+
+class NotificationDispatcher:
+    """Worker pool that drains the queue, one SMTP connection per batch"""
+
+    def __init__(self, app, mail, queue):
+        self.app = app
+        self.mail = mail
+        self.queue = queue
+        self.workers = app.config['NOTIFICATION_WORKERS']
+        self.batch_size = app.config['NOTIFICATION_BATCH_SIZE']
+        self.poll_interval = app.config['NOTIFICATION_POLL_INTERVAL']
+        self.max_attempts = app.config['NOTIFICATION_MAX_ATTEMPTS']
+        self.retry_base = app.config['NOTIFICATION_RETRY_BASE']
+        self.lease = app.config['NOTIFICATION_LEASE']
+        self._threads = []
+        self._stop = threading.Event()
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'notification-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                rows, claimed_until = self.queue.claim(self.batch_size, lease=self.lease)
+            except Exception as e:
+                logger.error(f"Error claiming notifications: {e}")
+                rows = []
+            if rows:
+                self._send_batch(rows, claimed_until)
+            else:
+                self._stop.wait(self.poll_interval)
+
+    def _send_batch(self, rows, claimed_until):
+        with self.app.app_context():
+            messages = coalesce(rows)
+            try:
+                with self.mail.connect() as conn:
+                    while messages:
+                        message, ids, attempts = messages[0]
+                        # Renew the claim on what is left before each send, so a slow batch never outlives it
+                        unsent = [i for _, group, _ in messages for i in group]
+                        claimed_until, held = self.queue.renew(unsent, claimed_until, self.lease)
+                        held = set(held)
+                        lost = [m for m in messages if not held.issuperset(m[1])]
+                        if lost:
+                            logger.warning(f"Lost the claim on notifications {[m[1] for m in lost]}; leaving them to another worker")
+                            messages = [m for m in messages if held.issuperset(m[1])]
+                            continue
+                        try:
+                            conn.send(message)
+                            self.queue.ack(ids)
+                        except Exception as e:
+                            logger.warning(f"Error sending notification to {message.recipients}: {e}")
+                            self._retry(ids, attempts)
+                        messages.pop(0)
+            except Exception as e:
+                # Could not reach the SMTP server at all; every message still held waits
+                logger.error(f"SMTP connection failed: {e}")
+                for message, ids, attempts in messages:
+                    self._retry(ids, attempts)
+
+    def _retry(self, ids, attempts):
+        attempts += 1
+        if attempts >= self.max_attempts:
+            logger.error(f"Dropping notifications {ids} after {attempts} attempts")
+            self.queue.ack(ids)
+            return
+        delay = min(self.retry_base * 2 ** attempts, 3600)
+        self.queue.retry(ids, attempts, delay)
+
+def coalesce(rows):
+    """Fold rows sharing a digest key into one digest message per recipient"""
+    groups = OrderedDict()
+    for row in rows:
+        key = (row['recipient'], row['digest_key']) if row['digest_key'] else ('row', row['id'])
+        groups.setdefault(key, []).append(row)
+
+    messages = []
+    for group in groups.values():
+        first = group[0]
+        attempts = max(row['attempts'] for row in group)
+        ids = [row['id'] for row in group]
+        if len(group) == 1:
+            message = Message(first['subject'], recipients=[first['recipient']],
+                              body=first['body'], html=first['html'])
+        else:
+            lines = '\n'.join(f"- {row['digest_line'] or row['subject']}" for row in group)
+            message = Message(f"{len(group)} price alerts triggered",
+                              recipients=[first['recipient']],
+                              body=f"The following alerts were triggered:\n\n{lines}\n")
+        messages.append((message, ids, attempts))
+    return messages
+
+notification_queue = None
+
+def init_notifications(app, mail):
+    global notification_queue
+    app.config.setdefault('NOTIFICATION_QUEUE_PATH', os.path.join(app.instance_path, 'notifications.db'))
+    app.config.setdefault('NOTIFICATION_WORKERS', 2)
+    app.config.setdefault('NOTIFICATION_BATCH_SIZE', 50)
+    app.config.setdefault('NOTIFICATION_POLL_INTERVAL', 2)
+    app.config.setdefault('NOTIFICATION_MAX_ATTEMPTS', 8)
+    app.config.setdefault('NOTIFICATION_RETRY_BASE', 5)
+    app.config.setdefault('NOTIFICATION_LEASE', 60)  # renewed before every send
+    app.config.setdefault('NOTIFICATION_DIGEST_WINDOW', 30)
+
+    notification_queue = NotificationQueue(app.config['NOTIFICATION_QUEUE_PATH'])
+    app.extensions['notification_dispatcher'] = NotificationDispatcher(app, mail, notification_queue)
+
+def start_notification_dispatcher(app):
+    """Start sending from this process; only the serving process calls this, never CLI commands"""
+    dispatcher = app.extensions['notification_dispatcher']
+    if app.config.get('NOTIFICATION_DISPATCH', True) and not dispatcher._threads:
+        dispatcher.start()
+    return dispatcher
+
+def enqueue_email(recipient, subject, body, html=None):
+    """Queue an email for background delivery; never blocks on SMTP"""
+    notification_queue.put(recipient, subject, body, html=html)
+
+def enqueue_price_alert(user, symbol, alert_type, target_price, price):
+    """Queue a price alert email, held briefly so alerts firing together become one digest"""
+    direction = 'above' if alert_type == 'above' else 'below'
+    line = f"{symbol} moved {direction} {target_price:,.2f} USD (now {price:,.2f} USD)"
+    notification_queue.put(
+        user.email,
+        f"Price alert: {symbol}",
+        f"Hello {user.username},\n\nYour price alert was triggered: {line}.\n",
+        digest_key=f'price_alert:{user.id}',
+        digest_line=line,
+        delay=current_app.config['NOTIFICATION_DIGEST_WINDOW']
+    )
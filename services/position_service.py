@@ -0,0 +1,112 @@
+import logging
+
+from database import db
+from models.portfolio import Position, PortfolioItem
+
+logger = logging.getLogger(__name__)
+
+EPSILON = 1e-12
+
+def apply_lot(position, quantity, price, method):
+    """Fold one lot into ``position``; a negative quantity is a sale at ``price``"""
+    quantity, price = float(quantity), float(price or 0)
+    if quantity >= 0:
+        position.quantity += quantity
+        position.cost_basis += quantity * price
+        if method == 'fifo':
+            # Reassigned rather than mutated so the JSON column is marked dirty
+            position.open_lots = (position.open_lots or []) + [[quantity, price]]
+        return
+
+    # Sales beyond the held quantity have no cost basis to realize against
+    sold = min(-quantity, position.quantity)
+    if method == 'fifo':
+        lots = [list(lot) for lot in position.open_lots or []]
+        cost, remaining = 0.0, sold
+        while remaining > EPSILON and lots:
+            taken = min(remaining, lots[0][0])
+            cost += taken * lots[0][1]
+            lots[0][0] -= taken
+            remaining -= taken
+            if lots[0][0] <= EPSILON:
+                lots.pop(0)
+        position.open_lots = lots
+    else:
+        cost = sold * position.average_price
+
+    position.quantity -= sold
+    position.cost_basis -= cost
+    position.realized_pnl += sold * price - cost
+    if position.quantity <= EPSILON:
+        position.quantity = position.cost_basis = 0.0
+        position.open_lots = []
+
+class PositionService:
+    """Keeps Position rows in step with PortfolioItem lots inside the caller's transaction.
+
+    Appending a lot dated at or after a position's newest lot is applied in
+    O(1). Edits, deletions and back-dated lots replay only that symbol's lots,
+    since they can change the cost of every later sale.
+    """
+
+    @staticmethod
+    def _position(portfolio_id, symbol):
+        position = (Position.query.filter_by(portfolio_id=portfolio_id, symbol=symbol)
+                    .with_for_update().first())
+        if position is None:
+            position = Position(portfolio_id=portfolio_id, symbol=symbol, quantity=0.0,
+                                cost_basis=0.0, realized_pnl=0.0, open_lots=[], lot_count=0)
+            db.session.add(position)
+        return position
+
+    @staticmethod
+    def _reset(position):
+        position.quantity = position.cost_basis = position.realized_pnl = 0.0
+        position.open_lots = []
+        position.lot_count = 0
+        position.last_lot_at = None
+
+    def record_lot(self, portfolio, item):
+        """Account for a newly added lot"""
+        position = self._position(portfolio.id, item.symbol)
+        if position.last_lot_at is not None and item.purchase_date < position.last_lot_at:
+            self.rebuild_symbol(portfolio, item.symbol)
+            return
+        apply_lot(position, item.quantity, item.purchase_price, portfolio.cost_method)
+        position.lot_count += 1
+        position.last_lot_at = item.purchase_date
+
+    def rebuild_symbol(self, portfolio, symbol):
+        """Recompute one position by replaying its live lots in purchase order"""
+        position = self._position(portfolio.id, symbol)
+        self._reset(position)
+        lots = (PortfolioItem.query
+                .filter_by(portfolio_id=portfolio.id, symbol=symbol)
+                .filter(PortfolioItem.is_deleted.isnot(True))
+                .order_by(PortfolioItem.purchase_date, PortfolioItem.created_at)
+                .all())
+        for item in lots:
+            apply_lot(position, item.quantity, item.purchase_price, portfolio.cost_method)
+            position.lot_count += 1
+            position.last_lot_at = item.purchase_date
+        if not lots:
+            db.session.delete(position)
+
+    def rebuild_portfolio(self, portfolio):
+        """Reconcile every position of ``portfolio`` with its lots; returns the symbols rebuilt"""
+        symbols = {symbol for (symbol,) in db.session.query(PortfolioItem.symbol)
+                   .filter_by(portfolio_id=portfolio.id)
+                   .filter(PortfolioItem.is_deleted.isnot(True))
+                   .distinct()}
+        for position in Position.query.filter_by(portfolio_id=portfolio.id).all():
+            if position.symbol not in symbols:
+                db.session.delete(position)
+        for symbol in sorted(symbols):
+            self.rebuild_symbol(portfolio, symbol)
+        return symbols
+
+    @staticmethod
+    def positions(portfolio):
+        return Position.query.filter_by(portfolio_id=portfolio.id).order_by(Position.symbol).all()
+
+position_service = PositionService()
@@ -0,0 +1,166 @@
+import hashlib
+import logging
+import threading
+import time
+
+from services.binance_api import BinanceAPI
+from services.market_stream import market_stream
+from services.market_table import market_table
+
+logger = logging.getLogger(__name__)
+
+UNIVERSE_SIZE = 100
+REFRESH_SECONDS = 10
+UNIVERSE_REFRESH_SECONDS = 300
+
+# Upstream 24hr ticker field -> market table column
+TICKER_COLUMNS = {
+    'lastPrice': 'price',
+    'priceChangePercent': 'change',
+    'quoteVolume': 'volume',
+    'bidPrice': 'bid',
+    'askPrice': 'ask',
+    'highPrice': 'high',
+    'lowPrice': 'low',
+}
+
+# Response field -> market table column for price listing rows
+ROW_FIELDS = {'price': 'price', 'price_change_24h': 'change'}
+
+class PriceFeed:
+    """USDT price listing versioned by upstream event time.
+
+    Numbers live in the shared market table, updated in place by the REST
+    refresh and the ticker stream; the feed only tracks which symbols are
+    listed and the Binance timestamp of each one's latest change. The version
+    is the newest of those timestamps, so it means the same thing in every
+    worker: a client that last saw version N only needs the symbols stamped
+    after N, whichever worker it asks.
+
+    Each worker picks its own listing, so the listing has an id of its own.
+    A client whose listing id differs from the worker's gets the listing in
+    full, since deltas cannot express removals. Symbols entering a listing
+    are stamped with the refresh's upstream time, so clients that send no
+    listing id still receive them.
+    """
+
+    def __init__(self, universe_size=UNIVERSE_SIZE, table=market_table):
+        self.universe_size = universe_size
+        self.table = table
+        self.universe = []  # listed symbols, most traded first
+        self._listed = frozenset()
+        self.listing = ''  # id of the listed symbol set
+        self._stamps = {}  # listed symbol -> upstream time (ms) of its latest change
+        self._resync_at = 0
+        self._refreshed_at = 0
+        self._lock = threading.Lock()
+        market_stream.on('24hrTicker', self._on_ticker)
+
+    @property
+    def version(self):
+        with self._lock:
+            return self._version()
+
+    def _version(self):
+        return max(self._resync_at, max(self._stamps.values(), default=0))
+
+    def _stamp(self, times):
+        """Record ``{symbol: upstream ms}`` changes of listed symbols; stamps never move back"""
+        with self._lock:
+            for symbol, at in times.items():
+                if symbol in self._listed and at > self._stamps.get(symbol, 0):
+                    self._stamps[symbol] = at
+
+    def rows(self, symbols):
+        return self.table.records(symbols, ROW_FIELDS)
+
+    def prices(self, symbols):
+        """``{symbol: last price}`` for any traded symbol, listed or not"""
+        self._ensure_fresh()
+        return self.table.get(symbols, 'price')
+
+    def quotes(self, symbols):
+        """Listing rows for any traded symbols, listed or not"""
+        self._ensure_fresh()
+        return self.rows(symbols)
+
+    def ticker(self, symbol):
+        """24hr ticker fields of any traded symbol from the market table, or None if it never traded"""
+        self._ensure_fresh()
+        row = self.table.row(symbol)
+        if row is None or row.price is None:
+            return None
+        return {'symbol': symbol, 'lastPrice': row.price, 'priceChangePercent': row.change,
+                'highPrice': row.high, 'lowPrice': row.low}
+
+    def columns(self):
+        """(version, symbols, {field: values}) for the listing, read straight from the table's columns"""
+        self._ensure_fresh()
+        with self._lock:
+            version, universe = self._version(), self.universe
+        slots = self.table.slots(universe)
+        return version, universe, {name: self.table.column(field)[slots] for name, field in ROW_FIELDS.items()}
+
+    def snapshot(self):
+        self._ensure_fresh()
+        with self._lock:
+            version, universe = self._version(), self.universe
+        return version, self.rows(universe)
+
+    def changes_since(self, since, listing=None):
+        """(version, listing, full, rows): rows changed after ``since``, or everything for another listing"""
+        self._ensure_fresh()
+        with self._lock:
+            universe, current = self.universe, self.listing
+            version = self._version()
+            # A version from the future (another worker's faster stream, a bad client) must not pin the client
+            since = min(since, version)
+            full = listing != current if listing is not None else since <= self._resync_at
+            symbols = [s for s in universe if self._stamps.get(s, 0) > since]
+        if full:
+            return version, current, True, self.rows(universe)
+        return version, current, False, self.rows(symbols)
+
+    def _ensure_fresh(self):
+        market_stream.subscribe('!ticker@arr')
+        age = time.time() - self._refreshed_at
+        if age > UNIVERSE_REFRESH_SECONDS or (age > REFRESH_SECONDS and not market_stream.is_subscribed('!ticker@arr')):
+            self.refresh()
+
+    def refresh(self):
+        close_times = {}
+
+        def tickers():
+            # Parsed incrementally; only these fields of each ticker are ever kept
+            for ticker in BinanceAPI.iter_24hr_ticker(['symbol', 'closeTime', *TICKER_COLUMNS]):
+                close_times[ticker['symbol']] = ticker['closeTime']
+                yield ticker
+
+        symbols, changed = self.table.load(tickers(), TICKER_COLUMNS)
+
+        # The universe is the most traded USDT symbols, not the first ones upstream lists
+        volumes = self.table.get(symbols, 'volume')
+        universe = sorted((s for s in symbols if s.endswith('USDT')), key=volumes.get, reverse=True)[:self.universe_size]
+        refreshed_at = max(close_times.values(), default=0)
+        with self._lock:
+            entered = set(universe) - self._listed
+            if set(universe) != self._listed:
+                # Clients without a listing id at or before the newest stamp so far resync in full
+                self._resync_at = self._version()
+                self._stamps = {s: at for s, at in self._stamps.items() if s in universe}
+                self.listing = hashlib.sha1(','.join(sorted(universe)).encode()).hexdigest()[:12]
+            self.universe, self._listed = universe, frozenset(universe)
+        self._stamp({s: close_times[s] for s in changed})
+        # After the resync point, so clients already past it still receive the newcomers
+        self._stamp({s: max(refreshed_at, self._resync_at + 1) for s in entered})
+        self._refreshed_at = time.time()
+
+    def _on_ticker(self, event):
+        symbol = event['s']
+        moved = self.table.update(symbol, price=event['c'], change=event['P'])
+        self.table.update(symbol, volume=event['q'], bid=event.get('b', 'nan'), ask=event.get('a', 'nan'),
+                          high=event['h'], low=event['l'])
+        if moved:
+            self._stamp({symbol: event['E']})
+
+price_feed = PriceFeed()
@@ -0,0 +1,140 @@
+import logging
+from functools import reduce
+from statistics import NormalDist
+
+import numpy as np
+
+from services.kline_store import kline_store, INTERVAL_MS, OPEN_TIME, CLOSE
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+YEAR_MS = 365 * 86_400_000
+
+MAX_WINDOW = 1000
+STATS_TTL = 300
+PARTIAL_STATS_TTL = 30  # stats missing a holding, which may be a passing upstream error
+
+class MarketStats:
+    """Return-based statistics for a set of symbols, independent of position sizes"""
+
+    def __init__(self, symbols, returns, last_prices, periods_per_year):
+        self.symbols = symbols
+        self.returns = returns  # (observations, symbols) log returns
+        self.last_prices = last_prices
+        self.periods_per_year = periods_per_year
+        self.covariance = np.cov(returns, rowvar=False).reshape(len(symbols), len(symbols))
+        self.volatility = np.sqrt(np.diag(self.covariance))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.correlation = self.covariance / np.outer(self.volatility, self.volatility)
+        np.fill_diagonal(self.correlation, 1.0)
+
+def build_market_stats(symbols, interval, window):
+    """Aligned log-return matrix over the last ``window`` candles of every symbol"""
+    closes = {}
+    for symbol in symbols:
+        # A holding without market data (delisted, unknown, upstream error) is left out, not fatal
+        try:
+            rows = kline_store.get_array(symbol, interval, window + 1)
+        except Exception as e:
+            logger.warning(f"Excluding {symbol} from risk stats: {e}")
+            continue
+        if len(rows) >= 3 and (rows[:, CLOSE] > 0).all():
+            closes[symbol] = rows
+    usable = sorted(closes)
+    if not usable:
+        return None
+
+    # Only candles every symbol has, so returns line up in time
+    common = reduce(np.intersect1d, [closes[s][:, OPEN_TIME] for s in usable])
+    prices = np.column_stack([
+        closes[s][np.isin(closes[s][:, OPEN_TIME], common), CLOSE] for s in usable
+    ])
+    if len(prices) < 3:
+        return None
+
+    returns = np.diff(np.log(prices), axis=0)
+    return MarketStats(usable, returns, prices[-1], YEAR_MS / INTERVAL_MS[interval])
+
+class RiskService:
+    """Portfolio risk from stored klines.
+
+    The expensive part (aligned returns, covariance, correlation) depends only
+    on the symbol set, interval and window, so it is cached under that key and
+    shared by every user holding the same coins; position weights are applied
+    per request. Stats that leave holdings out are kept only briefly and a
+    result with no usable holdings is not cached, so an upstream hiccup does
+    not stick.
+    """
+
+    def __init__(self):
+        self._stats = TTLCache(maxsize=256, ttl=STATS_TTL)
+
+    def market_stats(self, symbols, interval, window):
+        key = (frozenset(symbols), interval, window)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = build_market_stats(sorted(symbols), interval, window)
+            if stats is not None:
+                self._stats.set(key, stats, STATS_TTL if len(stats.symbols) == len(key[0]) else PARTIAL_STATS_TTL)
+        return stats
+
+    @staticmethod
+    def validate(interval, window, confidence):
+        if interval not in INTERVAL_MS:
+            raise ValueError(f'Unsupported interval: {interval}')
+        if not 2 <= window <= MAX_WINDOW:
+            raise ValueError(f'window must be between 2 and {MAX_WINDOW}')
+        if not 0.5 < confidence < 1:
+            raise ValueError('confidence must be between 0.5 and 1')
+
+    def portfolio_risk(self, holdings, interval='1d', window=90, confidence=0.95):
+        """Volatility, correlation and VaR for ``holdings`` ({symbol: quantity})"""
+        self.validate(interval, window, confidence)
+
+        stats = self.market_stats(holdings, interval, window)
+        if stats is None:
+            return {'symbols': [], 'excluded': sorted(holdings), 'portfolio': None}
+
+        quantities = np.array([holdings[s] for s in stats.symbols])
+        values = quantities * stats.last_prices
+        total_value = float(values.sum())
+        weights = values / total_value if total_value else np.zeros_like(values)
+
+        annualise = np.sqrt(stats.periods_per_year)
+        portfolio_returns = stats.returns @ weights
+        portfolio_sigma = float(np.sqrt(weights @ stats.covariance @ weights))
+        alpha = 1 - confidence
+        z = NormalDist().inv_cdf(confidence)
+
+        historical_var = float(-np.quantile(portfolio_returns, alpha)) * total_value
+        parametric_var = float(z * portfolio_sigma - portfolio_returns.mean()) * total_value
+
+        return {
+            'interval': interval,
+            'window': window,
+            'observations': len(stats.returns),
+            'symbols': stats.symbols,
+            'excluded': sorted(set(holdings) - set(stats.symbols)),
+            'assets': [
+                {
+                    'symbol': symbol,
+                    'value': float(values[i]),
+                    'weight': float(weights[i]),
+                    'volatility': float(stats.volatility[i]),
+                    'annualized_volatility': float(stats.volatility[i] * annualise)
+                }
+                for i, symbol in enumerate(stats.symbols)
+            ],
+            'correlation': np.nan_to_num(stats.correlation).round(4).tolist(),
+            'portfolio': {
+                'value': total_value,
+                'volatility': portfolio_sigma,
+                'annualized_volatility': portfolio_sigma * float(annualise),
+                'confidence': confidence,
+                'historical_var': historical_var,
+                'parametric_var': parametric_var
+            }
+        }
+
+risk_service = RiskService()
@@ -0,0 +1,183 @@
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from services.binance_api import BinanceAPI
+from services.indicator_cache import last_closed_open_time
+from services.kline_store import to_array, INTERVAL_MS, OPEN_TIME, CLOSE, bucket_offset
+from services.symbol_registry import symbol_registry
+from services.technical_analysis import SCAN_INDICATORS
+from utils.cache import TTLCache
+from utils.concurrency import bounded_map
+
+logger = logging.getLogger(__name__)
+
+LOOKBACK = 250
+SCAN_WORKERS = int(os.getenv('SCAN_WORKERS', min(4, os.cpu_count() or 1)))
+FETCH_THREADS = 8
+MIN_SHARD_ROWS = 32
+CONDITION_RE = re.compile(r'^(lt|lte|gt|gte):(-?\d+(?:\.\d+)?)$')
+OPERATORS = {
+    'lt': np.less,
+    'lte': np.less_equal,
+    'gt': np.greater,
+    'gte': np.greater_equal,
+}
+
+def parse_condition(condition):
+    """'lt:30' -> ('lt', 30.0)"""
+    match = CONDITION_RE.match(condition or '')
+    if not match:
+        raise ValueError('condition must look like lt:30, lte:30, gt:70 or gte:70')
+    return match.group(1), float(match.group(2))
+
+def _scan_shard(shm_name, shape, start, stop, indicator, period):
+    """Process-pool entry point: indicator values for rows [start, stop) of the shared close matrix"""
+    # Children share the parent's resource tracker, which unlinks the segment with the parent
+    shm = shared_memory.SharedMemory(name=shm_name)
+    closes = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)[start:stop]
+    func, _, _ = SCAN_INDICATORS[indicator]
+    values = func(closes, period)
+    del closes  # release the buffer view before closing the mapping
+    shm.close()
+    return values
+
+class ScanService:
+    """Evaluates one indicator across every symbol of a quote asset.
+
+    Closes are packed into one (symbols, LOOKBACK) float64 matrix in shared
+    memory; worker processes attach to it by name and each computes a slice
+    of rows, so nothing but the slice bounds and the result vector is
+    pickled. Results are cached until the current candle closes.
+
+    Candles are fetched straight from upstream in the scanned interval and
+    only closed ones are used. They never go through the kline store, which
+    would subscribe every symbol's stream and evict the series users view.
+    """
+
+    def __init__(self, workers=SCAN_WORKERS):
+        self.workers = workers
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._results = TTLCache(maxsize=256, ttl=3600)
+
+    def _executor(self):
+        with self._pool_lock:
+            if self._pool is None:
+                # forkserver children start clean instead of inheriting this process's threads and locks
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else None
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(method))
+            return self._pool
+
+    @staticmethod
+    def seconds_to_close(interval, now_ms=None):
+        interval_ms = INTERVAL_MS[interval]
+        offset = bucket_offset(interval)
+        now_ms = now_ms if now_ms is not None else time.time() * 1000
+        next_close = ((now_ms - offset) // interval_ms + 1) * interval_ms + offset
+        return max(1.0, (next_close - now_ms) / 1000)
+
+    def _close_matrix(self, symbols, interval, needed):
+        """(symbols kept, closes matrix) aligned on the latest LOOKBACK closed candles"""
+        closed_at = last_closed_open_time(interval)
+
+        def fetch(symbol):
+            try:
+                # Ending at the last close leaves out the open candle; ranged calls also skip the last-known-good cache
+                rows = to_array(BinanceAPI.get_klines(symbol, interval, LOOKBACK,
+                                                      end_time=closed_at + INTERVAL_MS[interval] - 1))
+                return rows[rows[:, OPEN_TIME] <= closed_at]
+            except Exception as e:
+                logger.warning(f"Error loading klines for {symbol}: {e}")
+                return None
+
+        arrays = bounded_map(fetch, symbols, FETCH_THREADS)
+
+        latest = max((int(a[-1, OPEN_TIME]) for a in arrays if a is not None and len(a)), default=None)
+        kept, matrix = [], np.empty((len(symbols), LOOKBACK))
+        for symbol, rows in zip(symbols, arrays):
+            # Skip delisted/halted symbols whose last candle is not the current one
+            if rows is None or len(rows) < needed or int(rows[-1, OPEN_TIME]) != latest:
+                continue
+            closes = rows[:, CLOSE]
+            # Short histories are left-padded with their first close
+            matrix[len(kept), LOOKBACK - len(closes):] = closes
+            matrix[len(kept), :LOOKBACK - len(closes)] = closes[0]
+            kept.append(symbol)
+        return kept, matrix[:len(kept)]
+
+    def _evaluate(self, closes, indicator, period):
+        func, _, _ = SCAN_INDICATORS[indicator]
+        shards = min(self.workers, len(closes) // MIN_SHARD_ROWS)
+        if shards < 2:
+            return func(closes, period)
+
+        shm = shared_memory.SharedMemory(create=True, size=closes.nbytes)
+        try:
+            np.ndarray(closes.shape, dtype=np.float64, buffer=shm.buf)[:] = closes
+            bounds = np.linspace(0, len(closes), shards + 1, dtype=int)
+            futures = [
+                self._executor().submit(_scan_shard, shm.name, closes.shape, int(start), int(stop), indicator, period)
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            return np.concatenate([future.result() for future in futures])
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def scan(self, indicator, interval, condition, period=None, quote='USDT', limit=50):
+        """Symbols whose latest indicator value meets ``condition``, most extreme first"""
+        if indicator not in SCAN_INDICATORS:
+            raise ValueError(f'indicator must be one of: {", ".join(SCAN_INDICATORS)}')
+        if interval not in INTERVAL_MS:
+            raise ValueError(f'Unsupported interval: {interval}')
+        op, threshold = parse_condition(condition)
+        _, default_period, warmup = SCAN_INDICATORS[indicator]
+        period = period or default_period
+        if not 2 <= period <= LOOKBACK // 2:
+            raise ValueError(f'period must be between 2 and {LOOKBACK // 2}')
+
+        key = (indicator, period, interval, quote)
+        values = self._results.get(key)
+        if values is None:
+            symbols = sorted(info['symbol'] for info in symbol_registry.all()
+                             if info['quoteAsset'] == quote and info.get('status', 'TRADING') == 'TRADING')
+            started = time.time()
+            kept, closes = self._close_matrix(symbols, interval, warmup(period))
+            computed = self._evaluate(closes, indicator, period) if kept else np.empty(0)
+            values = {'symbols': kept, 'values': computed, 'universe': len(symbols),
+                      'computed_at': int(time.time() * 1000)}
+            self._results.set(key, values, ttl=self.seconds_to_close(interval))
+            logger.info(f"Scanned {indicator}({period}) on {len(kept)} {quote} symbols in {time.time() - started:.2f}s")
+
+        computed = values['values']
+        mask = OPERATORS[op](computed, threshold) & np.isfinite(computed)
+        index = np.flatnonzero(mask)
+        # lt/lte rank lowest first, gt/gte highest first
+        order = index[np.argsort(computed[index])]
+        if op.startswith('gt'):
+            order = order[::-1]
+        order = order[:limit]
+
+        return {
+            'indicator': indicator,
+            'period': period,
+            'interval': interval,
+            'condition': condition,
+            'quote': quote,
+            'scanned': len(values['symbols']),
+            'universe': values['universe'],
+            'matched': int(mask.sum()),
+            'computed_at': values['computed_at'],
+            'expires_in': round(self.seconds_to_close(interval), 1),
+            'results': [{'symbol': values['symbols'][i], 'value': float(computed[i])} for i in order]
+        }
+
+scan_service = ScanService()
@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+
+from services.binance_api import BinanceAPI
+from services.market_stream import market_stream
+from services.symbol_registry import symbol_registry
+
+logger = logging.getLogger(__name__)
+
+REFRESH_SECONDS = 10
+
+# metric -> default ordering (True = largest first)
+METRICS = {
+    'change': True,
+    'quote_volume': True,
+    'volatility': True,
+    'spread': False,
+}
+
+class SortedIndex:
+    """(value, symbol) pairs kept sorted so top-k is a slice"""
+
+    def __init__(self):
+        self._items = []
+
+    def remove(self, value, symbol):
+        i = bisect_left(self._items, (value, symbol))
+        if i < len(self._items) and self._items[i] == (value, symbol):
+            del self._items[i]
+
+    def add(self, value, symbol):
+        insort(self._items, (value, symbol))
+
+    def top(self, limit, descending=True):
+        items = self._items[-limit:][::-1] if descending else self._items[:limit]
+        return [symbol for _, symbol in items]
+
+class ScreenerService:
+    """Market-wide rankings by 24h change, quote volume, volatility and spread.
+
+    Every ticker update moves one symbol within a sorted index per metric
+    (overall and per quote asset), so queries never sort the full market.
+    """
+
+    def __init__(self):
+        self._rows = {}
+        self._indexes = {}
+        self._refreshed_at = 0
+        self._lock = threading.Lock()
+        market_stream.on('24hrTicker', self._on_ticker)
+
+    def _index(self, metric, quote):
+        key = (metric, quote)
+        if key not in self._indexes:
+            self._indexes[key] = SortedIndex()
+        return self._indexes[key]
+
+    def update(self, symbol, price, change, quote_volume, high, low, bid, ask):
+        mid = (bid + ask) / 2
+        row = {
+            'symbol': symbol,
+            'quote': symbol_registry.quote_of(symbol),
+            'price': price,
+            'change': change,
+            'quote_volume': quote_volume,
+            'volatility': (high - low) / low * 100 if low > 0 else 0.0,
+            'spread': (ask - bid) / mid * 100 if bid > 0 and ask > 0 else float('inf')
+        }
+        with self._lock:
+            old = self._rows.get(symbol)
+            for metric in METRICS:
+                if old is not None and old[metric] == row[metric] and old['quote'] == row['quote']:
+                    continue
+                if old is not None:
+                    for quote in {None, old['quote']}:
+                        self._index(metric, quote).remove(old[metric], symbol)
+                for quote in {None, row['quote']}:
+                    self._index(metric, quote).add(row[metric], symbol)
+            self._rows[symbol] = row
+
+    def top(self, metric, limit=20, quote=None, descending=None):
+        quotes = symbol_registry.quote_assets()
+        if quote is not None and quotes and quote not in quotes:
+            raise ValueError(f'Unknown quote asset: {quote}')
+        self._ensure_fresh()
+        if descending is None:
+            descending = METRICS[metric]
+        with self._lock:
+            # Only ticker updates create indexes; a query for an empty quote must not leave one behind
+            index = self._indexes.get((metric, quote))
+            symbols = index.top(limit, descending) if index is not None else []
+            return [self._public(self._rows[s]) for s in symbols]
+
+    @staticmethod
+    def _public(row):
+        row = dict(row)
+        if row['spread'] == float('inf'):
+            row['spread'] = None
+        return row
+
+    def _ensure_fresh(self):
+        market_stream.subscribe('!ticker@arr')
+        if time.time() - self._refreshed_at > REFRESH_SECONDS and not market_stream.is_subscribed('!ticker@arr'):
+            self.refresh()
+
+    def refresh(self):
+        fields = ['symbol', 'lastPrice', 'priceChangePercent', 'quoteVolume', 'highPrice', 'lowPrice', 'bidPrice', 'askPrice']
+        for t in BinanceAPI.iter_24hr_ticker(fields):
+            self.update(
+                t['symbol'], float(t['lastPrice']), float(t['priceChangePercent']), float(t['quoteVolume']),
+                float(t['highPrice']), float(t['lowPrice']), float(t['bidPrice']), float(t['askPrice'])
+            )
+        self._refreshed_at = time.time()
+
+    def _on_ticker(self, e):
+        self.update(
+            e['s'], float(e['c']), float(e['P']), float(e['q']),
+            float(e['h']), float(e['l']), float(e['b']), float(e['a'])
+        )
+
+screener_service = ScreenerService()
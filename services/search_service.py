@@ -0,0 +1,198 @@
+import heapq
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from services.market_overview import market_overview
+from services.symbol_registry import symbol_registry
+
+logger = logging.getLogger(__name__)
+
+NAMES_SYNC_SECONDS = 60
+MIN_FUZZY_SCORE = 0.3
+
+# Lower ranks sort first
+MATCH_RANKS = {'base': 0, 'symbol': 1, 'name': 2, 'quote': 3}
+PREFERRED_QUOTES = ('USDT', 'USDC', 'BTC', 'ETH')
+
+class TrieNode:
+    __slots__ = ('children', 'symbols')
+
+    def __init__(self):
+        self.children = {}
+        self.symbols = {}  # symbol -> best match kind of any key below this node
+
+class SearchIndex:
+    """Prefix trie plus trigram index over symbols, assets and coin names.
+
+    Every trie node stores the symbols reachable below it, so a prefix lookup
+    is a walk of ``len(q)`` nodes with no subtree traversal. Symbols can be
+    added and removed one at a time.
+    """
+
+    def __init__(self):
+        self.root = TrieNode()
+        self.trigrams = defaultdict(set)  # trigram -> {(key, symbol, kind)}
+        self.entries = {}  # symbol -> (info, [(key, kind), ...])
+
+    @staticmethod
+    def _trigrams(key):
+        padded = f'  {key} '
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def add(self, info, name=None):
+        symbol = info['symbol']
+        if symbol in self.entries:
+            self.remove(symbol)
+        keys = [(symbol.lower(), 'symbol'), (info['baseAsset'].lower(), 'base'), (info['quoteAsset'].lower(), 'quote')]
+        if name:
+            keys += [(word, 'name') for word in {name.lower(), *name.lower().split()}]
+        self.entries[symbol] = (dict(info, name=name), keys)
+
+        for key, kind in keys:
+            node = self.root
+            for ch in key:
+                node = node.children.setdefault(ch, TrieNode())
+                if MATCH_RANKS[kind] < MATCH_RANKS.get(node.symbols.get(symbol), 99):
+                    node.symbols[symbol] = kind
+            for trigram in self._trigrams(key):
+                self.trigrams[trigram].add((key, symbol, kind))
+
+    def remove(self, symbol):
+        entry = self.entries.pop(symbol, None)
+        if entry is None:
+            return
+        for key, kind in entry[1]:
+            node = self.root
+            for ch in key:
+                node = node.children.get(ch)
+                if node is None:
+                    break
+                node.symbols.pop(symbol, None)
+            for trigram in self._trigrams(key):
+                self.trigrams[trigram].discard((key, symbol, kind))
+
+    def prefix(self, query):
+        node = self.root
+        for ch in query:
+            node = node.children.get(ch)
+            if node is None:
+                return {}
+        return node.symbols
+
+    def fuzzy(self, query):
+        """symbol -> (score, kind) by trigram Jaccard similarity"""
+        query_trigrams = self._trigrams(query)
+        overlap = defaultdict(int)
+        for trigram in query_trigrams:
+            for candidate in self.trigrams.get(trigram, ()):
+                overlap[candidate] += 1
+
+        scores = {}
+        for (key, symbol, kind), shared in overlap.items():
+            score = shared / (len(query_trigrams) + len(self._trigrams(key)) - shared)
+            if score >= MIN_FUZZY_SCORE and score > scores.get(symbol, (0, None))[0]:
+                scores[symbol] = (score, kind)
+        return scores
+
+class SearchService:
+    """Typeahead over exchange symbols, kept in sync with the symbol registry.
+
+    Coin names come from the CoinMarketCap listings the ``market-overview``
+    job publishes; a background thread picks up each new overview, so a
+    search never waits on CoinMarketCap.
+    """
+
+    def __init__(self):
+        self.index = SearchIndex()
+        self._names = {}  # base asset -> (name, CoinMarketCap rank)
+        self._coins = None  # listings the names were loaded from
+        self._sync_thread = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        symbol_registry.on_refresh(self._on_registry_refresh)
+
+    def _on_registry_refresh(self, added, removed):
+        with self._lock:
+            for info in removed:
+                self.index.remove(info['symbol'])
+            for info in added:
+                self.index.add(info, self._name_for(info['baseAsset']))
+
+    def _name_for(self, base):
+        entry = self._names.get(base)
+        return entry[0] if entry else None
+
+    def _ensure_loaded(self):
+        if self._sync_thread is None:
+            self._sync_thread = threading.Thread(target=self._sync_forever, name='search-names', daemon=True)
+            self._sync_thread.start()
+        if not self._loaded:
+            # The first registry read triggers a refresh, which feeds the listener
+            self._loaded = True
+            symbols = symbol_registry.all()
+            with self._lock:
+                for info in symbols:
+                    if info['symbol'] not in self.index.entries:
+                        self.index.add(info, self._name_for(info['baseAsset']))
+
+    def load_names(self, coins):
+        """Index CoinMarketCap names from get_coin_data(); only affected symbols are re-indexed"""
+        names = {coin['symbol']: (coin['name'], coin.get('cmc_rank') or 10_000) for coin in coins}
+        with self._lock:
+            changed = {base for base in names.keys() | self._names.keys() if names.get(base) != self._names.get(base)}
+            self._names = names
+            for symbol, (info, _) in list(self.index.entries.items()):
+                if info['baseAsset'] in changed:
+                    self.index.add(info, self._name_for(info['baseAsset']))
+
+    def sync_names(self):
+        """Load names from the newest market overview, if it changed since the last sync"""
+        try:
+            coins = market_overview.coins()
+        except Exception as e:
+            logger.warning(f"Error loading coin names for search: {e}")
+            return
+        if coins and coins != self._coins:
+            self._coins = coins
+            self.load_names(coins)
+
+    def _sync_forever(self):
+        while True:
+            self.sync_names()
+            time.sleep(NAMES_SYNC_SECONDS)
+
+    def search(self, query, limit=10):
+        query = query.strip().lower()
+        if not query:
+            return []
+        self._ensure_loaded()
+
+        with self._lock:
+            matches = {symbol: (1.0, kind) for symbol, kind in self.index.prefix(query).items()}
+            if len(matches) < limit and len(query) >= 2:
+                for symbol, scored in self.index.fuzzy(query).items():
+                    matches.setdefault(symbol, (scored[0] * 0.5, scored[1]))
+
+            def rank(item):
+                symbol, (score, kind) = item
+                info = self.index.entries[symbol][0]
+                exact = info['baseAsset'].lower() == query or symbol.lower() == query
+                quote = info['quoteAsset']
+                return (
+                    not exact,
+                    -score,
+                    MATCH_RANKS[kind],
+                    self._names.get(info['baseAsset'], (None, 10_000))[1],
+                    PREFERRED_QUOTES.index(quote) if quote in PREFERRED_QUOTES else len(PREFERRED_QUOTES),
+                    symbol
+                )
+
+            results = []
+            for symbol, (score, kind) in heapq.nsmallest(limit, matches.items(), key=rank):
+                info = self.index.entries[symbol][0]
+                results.append(dict(info, match=kind, fuzzy=score < 1.0))
+            return results
+
+search_service = SearchService()
@@ -0,0 +1,101 @@
+import logging
+import threading
+import time
+
+from services.binance_api import BinanceAPI
+
+logger = logging.getLogger(__name__)
+
+REFRESH_SECONDS = 3600
+RETRY_SECONDS = 30  # first wait after a failed refresh, doubled per failure up to REFRESH_SECONDS
+
+class SymbolRegistry:
+    """Exchange symbols with their base/quote assets, refreshed from exchangeInfo.
+
+    Listeners registered with ``on_refresh`` receive ``(added, removed)``
+    symbol-info dicts after each refresh so derived indexes can update
+    incrementally instead of rebuilding; apply removals before additions.
+
+    Lookups sit on hot paths such as every streamed ticker, so a due refresh
+    runs in one thread at a time while the others keep reading the current
+    symbols, and a failed refresh backs off instead of being retried by the
+    next lookup.
+    """
+
+    def __init__(self):
+        self._symbols = {}
+        self._listeners = []
+        self._refreshed_at = 0
+        self._retry_at = 0
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+
+    def on_refresh(self, listener):
+        self._listeners.append(listener)
+
+    def _due(self):
+        now = time.time()
+        return now - self._refreshed_at > REFRESH_SECONDS and now >= self._retry_at
+
+    def _ensure_fresh(self):
+        if not self._due():
+            return
+        # Only a registry that never loaded makes callers wait for the refresh
+        if not self._refreshing.acquire(blocking=not self._symbols):
+            return
+        try:
+            if self._due():
+                self.refresh()
+                self._failures = 0
+        except Exception as e:
+            self._failures += 1
+            delay = min(REFRESH_SECONDS, RETRY_SECONDS * 2 ** (self._failures - 1))
+            self._retry_at = time.time() + delay
+            logger.warning(f"Refreshing exchange symbols failed, retrying in {delay}s: {e}")
+        finally:
+            self._refreshing.release()
+
+    def refresh(self):
+        # Streamed: each symbol's filters and permissions are dropped as it is parsed
+        fields = ['symbol', 'baseAsset', 'quoteAsset', 'status']
+        symbols = {s['symbol']: s for s in BinanceAPI.iter_exchange_symbols(fields)}
+        with self._lock:
+            added = [symbols[s] for s in symbols.keys() - self._symbols.keys()]
+            removed = [self._symbols[s] for s in self._symbols.keys() - symbols.keys()]
+            changed = [s for s in symbols.keys() & self._symbols.keys() if symbols[s] != self._symbols[s]]
+            # A changed symbol is reported as its old entry removed and its new entry added
+            added += [symbols[s] for s in changed]
+            removed += [self._symbols[s] for s in changed]
+            self._symbols = symbols
+            self._refreshed_at = time.time()
+
+        if added or removed:
+            for listener in self._listeners:
+                try:
+                    listener(added, removed)
+                except Exception as e:
+                    logger.error(f"Error in symbol registry listener: {e}")
+
+    def get(self, symbol):
+        self._ensure_fresh()
+        return self._symbols.get(symbol)
+
+    def all(self):
+        self._ensure_fresh()
+        return list(self._symbols.values())
+
+    def is_listed(self, symbol):
+        """Whether exchangeInfo lists ``symbol``; anything passes until it has loaded once"""
+        info = self.get(symbol)
+        return info is not None or not self._symbols
+
+    def quote_assets(self):
+        self._ensure_fresh()
+        return {info['quoteAsset'] for info in list(self._symbols.values())}
+
+    def quote_of(self, symbol):
+        info = self.get(symbol)
+        return info['quoteAsset'] if info else None
+
+symbol_registry = SymbolRegistry()
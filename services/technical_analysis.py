@@ -0,0 +1,113 @@
+import logging
+
+import numpy as np
+
+from services.kline_store import kline_store, CLOSE
+
+logger = logging.getLogger(__name__)
+
+# Indicator math works on a (symbols, time) matrix of closes so one call covers
+# a single chart or a whole-universe scan; each returns the latest value per row.
+
+def ema_series(closes, period):
+    alpha = 2 / (period + 1)
+    out = np.empty_like(closes)
+    out[:, 0] = closes[:, 0]
+    for t in range(1, closes.shape[1]):
+        out[:, t] = alpha * closes[:, t] + (1 - alpha) * out[:, t - 1]
+    return out
+
+def sma(closes, period):
+    return closes[:, -period:].mean(axis=1)
+
+def ema(closes, period):
+    return ema_series(closes, period)[:, -1]
+
+def rsi(closes, period=14):
+    """Wilder's RSI"""
+    deltas = np.diff(closes, axis=1)
+    gains = np.clip(deltas, 0, None)
+    losses = np.clip(-deltas, 0, None)
+    avg_gain = gains[:, :period].mean(axis=1)
+    avg_loss = losses[:, :period].mean(axis=1)
+    for t in range(period, deltas.shape[1]):
+        avg_gain = (avg_gain * (period - 1) + gains[:, t]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[:, t]) / period
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = 100 - 100 / (1 + avg_gain / avg_loss)
+    values[avg_loss == 0] = 100.0
+    values[(avg_loss == 0) & (avg_gain == 0)] = 50.0
+    return values
+
+def macd(closes, fast=12, slow=26, signal=9):
+    """(macd line, signal line, histogram) latest values"""
+    line = ema_series(closes, fast) - ema_series(closes, slow)
+    signal_line = ema_series(line, signal)
+    return line[:, -1], signal_line[:, -1], line[:, -1] - signal_line[:, -1]
+
+def bollinger(closes, period=20, width=2):
+    """(upper, middle, lower, relative band width) latest values"""
+    window = closes[:, -period:]
+    middle = window.mean(axis=1)
+    deviation = window.std(axis=1)
+    upper, lower = middle + width * deviation, middle - width * deviation
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return upper, middle, lower, (upper - lower) / middle
+
+def _percent_of_close(closes, values):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (values / closes[:, -1]) * 100
+
+# name -> (function(closes, period), default period, candles needed for a meaningful value)
+SCAN_INDICATORS = {
+    'rsi': (lambda c, p: rsi(c, p), 14, lambda p: p + 1),
+    'roc': (lambda c, p: (c[:, -1] / c[:, -p - 1] - 1) * 100, 10, lambda p: p + 1),
+    'sma_distance': (lambda c, p: (c[:, -1] / sma(c, p) - 1) * 100, 50, lambda p: p),
+    'ema_distance': (lambda c, p: (c[:, -1] / ema(c, p) - 1) * 100, 21, lambda p: p),
+    'macd_pct': (lambda c, p: _percent_of_close(c, macd(c)[2]), 26, lambda p: 35),
+    'bb_width': (lambda c, p: bollinger(c, p)[3], 20, lambda p: p),
+}
+
+def _last(values, closes, needed):
+    return float(values[0]) if closes.shape[1] >= needed else None
+
+class TechnicalAnalysisService:
+    @staticmethod
+    def summary(closes):
+        """RSI, MACD and Bollinger values for a (1, time) close matrix"""
+        macd_line, signal_line, histogram = macd(closes)
+        upper, middle, lower, band_width = bollinger(closes)
+        return {
+            'price': float(closes[0, -1]),
+            'rsi': _last(rsi(closes, 14), closes, 15),
+            'macd': _last(macd_line, closes, 35),
+            'macd_signal': _last(signal_line, closes, 35),
+            'macd_histogram': _last(histogram, closes, 35),
+            'bb_upper': _last(upper, closes, 20),
+            'bb_middle': _last(middle, closes, 20),
+            'bb_lower': _last(lower, closes, 20),
+            'bb_width': _last(band_width, closes, 20),
+            **TechnicalAnalysisService.moving_averages(closes)
+        }
+
+    @staticmethod
+    def moving_averages(closes):
+        return {
+            'sma20': _last(sma(closes, 20), closes, 20),
+            'sma50': _last(sma(closes, 50), closes, 50),
+            'ema12': _last(ema(closes, 12), closes, 12),
+            'ema26': _last(ema(closes, 26), closes, 26)
+        }
+
+    @staticmethod
+    def relative_strength(closes, period=14):
+        return {'period': period, 'rsi': _last(rsi(closes, period), closes, period + 1)}
+
+    @staticmethod
+    def get_technical_indicators(symbol, interval='1d', limit=250):
+        """Latest indicator summary for one symbol, including the still-open candle"""
+        rows = kline_store.get_array(symbol, interval, limit)
+        if len(rows) < 2:
+            return {'error': f'Not enough data for {symbol}'}
+        return {'symbol': symbol.upper(), 'interval': interval,
+                **TechnicalAnalysisService.summary(rows[:, CLOSE].reshape(1, -1))}
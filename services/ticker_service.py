@@ -0,0 +1,69 @@
+import logging
+import re
+
+from services.binance_api import BinanceAPI
+from utils.cache import TTLCache
+from utils.concurrency import bounded_map
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_RE = re.compile(r'^[A-Z0-9]{2,20}$')
+BATCH_SIZE = 100  # upstream cap on the symbols= array
+SINGLE_FETCH_CONCURRENCY = 8
+
+# field -> (batched fetch or None for single-symbol endpoints, single fetch, cache TTL seconds)
+FIELDS = {
+    'price': (lambda symbols: BinanceAPI.get_price(symbols=symbols), lambda s: BinanceAPI.get_price(s), 2),
+    'bookTicker': (lambda symbols: BinanceAPI.get_book_ticker(symbols=symbols), lambda s: BinanceAPI.get_book_ticker(s), 2),
+    '24hr': (lambda symbols: BinanceAPI.get_24hr_ticker(symbols=symbols), lambda s: BinanceAPI.get_24hr_ticker(s), 5),
+    'ticker': (lambda symbols: BinanceAPI.get_ticker(symbols=symbols), lambda s: BinanceAPI.get_ticker(s), 5),
+    'avgPrice': (None, lambda s: BinanceAPI.get_avg_price(s), 5),
+}
+
+class TickerService:
+    """Ticker fields for many symbols, fetched with the fewest multi-symbol upstream calls"""
+
+    def __init__(self):
+        self._caches = {field: TTLCache(maxsize=5000, ttl=ttl) for field, (_, _, ttl) in FIELDS.items()}
+
+    @staticmethod
+    def valid_symbol(symbol):
+        return bool(SYMBOL_RE.match(symbol))
+
+    def get_tickers(self, symbols, fields):
+        """{symbol: {field: upstream object or None}} for every requested symbol and field"""
+        result = {symbol: {} for symbol in symbols}
+        for field in fields:
+            cache = self._caches[field]
+            missing = [symbol for symbol in symbols if cache.get(symbol) is None]
+            if missing:
+                self._fetch(field, missing)
+            for symbol in symbols:
+                result[symbol][field] = cache.get(symbol)
+        return result
+
+    def _fetch(self, field, symbols):
+        batch_fetch, single_fetch, _ = FIELDS[field]
+        cache = self._caches[field]
+
+        if batch_fetch is None:
+            bounded_map(lambda symbol: self._fetch_single(field, single_fetch, symbol), symbols, SINGLE_FETCH_CONCURRENCY)
+            return
+
+        for start in range(0, len(symbols), BATCH_SIZE):
+            chunk = symbols[start:start + BATCH_SIZE]
+            data = batch_fetch(chunk)
+            if isinstance(data, list):
+                for item in data:
+                    cache.set(item['symbol'], item)
+            else:
+                # One unknown symbol fails the whole batch upstream; isolate it
+                logger.warning(f"Batched {field} request failed ({data}); retrying per symbol")
+                bounded_map(lambda symbol: self._fetch_single(field, single_fetch, symbol), chunk, SINGLE_FETCH_CONCURRENCY)
+
+    def _fetch_single(self, field, fetch, symbol):
+        data = fetch(symbol)
+        if isinstance(data, dict) and 'code' not in data:
+            self._caches[field].set(symbol, data)
+
+ticker_service = TickerService()
@@ -0,0 +1,280 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from services.binance_api import BinanceAPI
+from services.market_stream import market_stream
+from services.symbol_registry import symbol_registry
+
+logger = logging.getLogger(__name__)
+
+WINDOWS = {'1m': 60_000, '5m': 300_000, '15m': 900_000, '1h': 3_600_000}
+RING_CAPACITY = 8192  # about 400 KB per ring
+MAX_SYMBOLS = 24  # per tape, so two tapes stay under 20 MB per worker
+SEED_LIMIT = 1000
+STALE_SECONDS = 5
+
+class RollingWindow:
+    """Running sums over the trades of the last ``span`` milliseconds"""
+    __slots__ = ('span', 'tail', 'notional', 'volume', 'buy_volume', 'sell_volume', 'count')
+
+    def __init__(self, span):
+        self.span = span
+        self.tail = 0
+        self.notional = 0.0
+        self.volume = 0.0
+        self.buy_volume = 0.0
+        self.sell_volume = 0.0
+        self.count = 0
+
+class TradeRing:
+    """Fixed-size, array-backed ring of trades with incrementally maintained windows.
+
+    Trades are addressed by a monotonically increasing sequence number; slot
+    ``seq % capacity`` holds it. Each window keeps the sequence number of its
+    oldest trade and evicts from there, so every push is amortised O(1).
+    A window reaching back past the oldest trade held is reported truncated:
+    the ring started from a REST seed or has since overwritten trades in it.
+
+    Until its first seed lands, a ring parks streamed trades in ``pending``;
+    the seed then goes in first and the parked trades are replayed after it,
+    so trades streamed while the seed was in flight cannot shadow it.
+    """
+
+    def __init__(self, capacity=RING_CAPACITY):
+        self.capacity = capacity
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.first_ids = np.zeros(capacity, dtype=np.int64)
+        self.last_ids = np.zeros(capacity, dtype=np.int64)
+        self.prices = np.zeros(capacity, dtype=np.float64)
+        self.qtys = np.zeros(capacity, dtype=np.float64)
+        self.times = np.zeros(capacity, dtype=np.int64)
+        self.buyer_maker = np.zeros(capacity, dtype=np.bool_)
+        self.seq = 0
+        self.last_id = -1
+        self.complete = False  # the seed held every trade the symbol ever had
+        self.pending = deque(maxlen=capacity)  # streamed trades awaiting the first seed; None once seeded
+        self.seed_lock = threading.Lock()
+        self.windows = {name: RollingWindow(span) for name, span in WINDOWS.items()}
+
+    def stream(self, *trade):
+        """Push a streamed trade, or park it while the first seed is outstanding"""
+        if self.pending is not None:
+            self.pending.append(trade)
+        else:
+            self.push(*trade)
+
+    def push(self, trade_id, first_id, last_id, price, qty, ts, buyer_maker):
+        if trade_id <= self.last_id:
+            return  # already seen (REST seed overlapping the stream)
+
+        # A window still holding the trade about to be overwritten must drop it first
+        oldest_kept = self.seq - self.capacity + 1
+        for window in self.windows.values():
+            self._evict(window, ts, oldest_kept)
+
+        slot = self.seq % self.capacity
+        self.ids[slot] = trade_id
+        self.first_ids[slot] = first_id
+        self.last_ids[slot] = last_id
+        self.prices[slot] = price
+        self.qtys[slot] = qty
+        self.times[slot] = ts
+        self.buyer_maker[slot] = buyer_maker
+        self.seq += 1
+        self.last_id = trade_id
+
+        for window in self.windows.values():
+            window.notional += price * qty
+            window.volume += qty
+            if buyer_maker:
+                window.sell_volume += qty  # taker sold into the bid
+            else:
+                window.buy_volume += qty
+            window.count += 1
+            self._evict(window, ts)
+
+    def _evict(self, window, now, min_seq=0):
+        cutoff = now - window.span
+        while window.tail < self.seq and (window.tail < min_seq or self.times[window.tail % self.capacity] <= cutoff):
+            slot = window.tail % self.capacity
+            qty = self.qtys[slot]
+            window.notional -= self.prices[slot] * qty
+            window.volume -= qty
+            if self.buyer_maker[slot]:
+                window.sell_volume -= qty
+            else:
+                window.buy_volume -= qty
+            window.count -= 1
+            window.tail += 1
+        if window.count == 0:
+            # Reset accumulated floating-point drift whenever the window empties
+            window.notional = window.volume = window.buy_volume = window.sell_volume = 0.0
+
+    def recent(self, limit):
+        """Slots of the newest ``limit`` trades, oldest first"""
+        limit = min(limit, self.seq, self.capacity)
+        return np.arange(self.seq - limit, self.seq) % self.capacity
+
+    def oldest_time(self):
+        if self.seq == 0:
+            return None
+        return int(self.times[(self.seq - min(self.seq, self.capacity)) % self.capacity])
+
+    def stats(self, now):
+        oldest = self.oldest_time()
+        result = {}
+        for name, window in self.windows.items():
+            self._evict(window, now)
+            result[name] = {
+                'vwap': window.notional / window.volume if window.volume > 0 else None,
+                'volume': window.volume,
+                'buy_volume': window.buy_volume,
+                'sell_volume': window.sell_volume,
+                'trade_count': window.count,
+                'truncated': not self.complete and (oldest is None or oldest > now - window.span)
+            }
+        return result
+
+class TradeTape:
+    """Per-symbol trade rings fed by the market stream and served from memory"""
+
+    def __init__(self, stream_suffix, event_type, fetch):
+        self.stream_suffix = stream_suffix
+        self.fetch = fetch
+        self._rings = OrderedDict()
+        self._seeded_at = {}
+        self._lock = threading.Lock()
+        market_stream.on(event_type, self._on_event)
+
+    def _stream(self, symbol):
+        return f'{symbol.lower()}@{self.stream_suffix}'
+
+    def ring(self, symbol):
+        if not symbol:
+            raise ValueError('symbol is required')
+        symbol = symbol.upper()
+        with self._lock:
+            ring = self._rings.get(symbol)
+        # Unknown symbols would otherwise hold a ring and a stream subscription each
+        if ring is None and not symbol_registry.is_listed(symbol):
+            raise ValueError(f'Unknown symbol: {symbol}')
+
+        with self._lock:
+            ring = self._rings.get(symbol)
+            if ring is not None:
+                self._rings.move_to_end(symbol)
+            else:
+                ring = self._rings[symbol] = TradeRing()
+                market_stream.subscribe(self._stream(symbol))
+                if len(self._rings) > MAX_SYMBOLS:
+                    evicted, _ = self._rings.popitem(last=False)
+                    self._seeded_at.pop(evicted, None)
+                    market_stream.unsubscribe(self._stream(evicted))
+
+        if self._needs_seed(symbol, ring):
+            # One seeder per symbol; the upstream call never holds the tape lock
+            with ring.seed_lock:
+                if self._needs_seed(symbol, ring):
+                    try:
+                        self._seed(symbol, ring)
+                    except ValueError:
+                        self._drop(symbol, ring)
+                        raise
+        return ring
+
+    def _drop(self, symbol, ring):
+        """Forget a ring upstream rejected, unless it was replaced meanwhile"""
+        with self._lock:
+            if self._rings.get(symbol) is ring:
+                del self._rings[symbol]
+                self._seeded_at.pop(symbol, None)
+                market_stream.unsubscribe(self._stream(symbol))
+
+    def _needs_seed(self, symbol, ring):
+        stale = time.time() - self._seeded_at.get(symbol, 0) > STALE_SECONDS
+        return ring.seq == 0 or (stale and not market_stream.is_subscribed(self._stream(symbol)))
+
+    def _seed(self, symbol, ring):
+        trades = self.fetch(symbol, SEED_LIMIT)
+        if isinstance(trades, dict):
+            # Upstream rejected the request (unknown or delisted symbol)
+            raise ValueError(trades.get('msg'))
+        with self._lock:
+            fresh = ring.seq == 0
+            for trade in trades:
+                self._push_rest(ring, trade)
+            if fresh and len(trades) < SEED_LIMIT:
+                ring.complete = True
+            if ring.pending is not None:
+                for trade in ring.pending:
+                    ring.push(*trade)
+                ring.pending = None
+            self._seeded_at[symbol] = time.time()
+
+    def stats(self, symbol):
+        ring = self.ring(symbol)
+        with self._lock:
+            return ring.stats(int(time.time() * 1000))
+
+class AggTradeTape(TradeTape):
+    def __init__(self):
+        super().__init__('aggTrade', 'aggTrade', BinanceAPI.get_agg_trades)
+
+    @staticmethod
+    def _push_rest(ring, t):
+        ring.push(t['a'], t['f'], t['l'], float(t['p']), float(t['q']), t['T'], t['m'])
+
+    def _on_event(self, e):
+        with self._lock:
+            ring = self._rings.get(e['s'])
+            if ring is not None:
+                ring.stream(e['a'], e['f'], e['l'], float(e['p']), float(e['q']), e['T'], e['m'])
+
+    def get_agg_trades(self, symbol, limit=500):
+        """Newest aggregated trades in the upstream /aggTrades format"""
+        ring = self.ring(symbol)
+        with self._lock:
+            index = ring.recent(limit)
+            return [
+                {'a': a, 'p': f'{p:.8f}', 'q': f'{q:.8f}', 'f': f, 'l': l, 'T': t, 'm': m, 'M': True}
+                for a, p, q, f, l, t, m in zip(
+                    ring.ids[index].tolist(), ring.prices[index].tolist(), ring.qtys[index].tolist(),
+                    ring.first_ids[index].tolist(), ring.last_ids[index].tolist(),
+                    ring.times[index].tolist(), ring.buyer_maker[index].tolist()
+                )
+            ]
+
+class RawTradeTape(TradeTape):
+    def __init__(self):
+        super().__init__('trade', 'trade', BinanceAPI.get_trades)
+
+    @staticmethod
+    def _push_rest(ring, t):
+        ring.push(t['id'], t['id'], t['id'], float(t['price']), float(t['qty']), t['time'], t['isBuyerMaker'])
+
+    def _on_event(self, e):
+        with self._lock:
+            ring = self._rings.get(e['s'])
+            if ring is not None:
+                ring.stream(e['t'], e['t'], e['t'], float(e['p']), float(e['q']), e['T'], e['m'])
+
+    def get_trades(self, symbol, limit=500):
+        """Newest trades in the upstream /trades format"""
+        ring = self.ring(symbol)
+        with self._lock:
+            index = ring.recent(limit)
+            return [
+                {'id': i, 'price': f'{p:.8f}', 'qty': f'{q:.8f}', 'quoteQty': f'{p * q:.8f}',
+                 'time': t, 'isBuyerMaker': m, 'isBestMatch': True}
+                for i, p, q, t, m in zip(
+                    ring.ids[index].tolist(), ring.prices[index].tolist(), ring.qtys[index].tolist(),
+                    ring.times[index].tolist(), ring.buyer_maker[index].tolist()
+                )
+            ]
+
+agg_trade_tape = AggTradeTape()
+trade_tape = RawTradeTape()
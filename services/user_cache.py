@@ -0,0 +1,52 @@
+from flask_login import UserMixin
+from utils.cache import TieredCache
+
+# Everything authentication and the settings endpoint need, so steady-state
+# requests never touch the user table.
+CACHED_FIELDS = ('id', 'username', 'email', 'is_admin', 'two_factor_enabled', 'settings')
+
+user_cache = TieredCache('user', maxsize=10000, ttl=60, redis_ttl=900)
+
+class CachedUser(UserMixin):
+    """Stand-in for a User row built from cached fields.
+
+    Attributes outside CACHED_FIELDS (relationships, password hash, model
+    methods) transparently load the real row on first access.
+    """
+
+    def __init__(self, data):
+        self.__dict__['_data'] = data
+        self.__dict__['_user'] = None
+
+    def __getattr__(self, name):
+        data = self.__dict__['_data']
+        if name in data:
+            return data[name]
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+    def _load(self):
+        if self.__dict__['_user'] is None:
+            from models.user import User
+            self.__dict__['_user'] = User.query.get(self.__dict__['_data']['id'])
+        return self.__dict__['_user']
+
+def serialize_user(user):
+    return {field: getattr(user, field) for field in CACHED_FIELDS}
+
+def load_user(user_id):
+    """Flask-Login user loader backed by the user cache"""
+    data = user_cache.get(str(user_id))
+    if data is None:
+        from models.user import User
+        user = User.query.get(int(user_id))
+        if user is None:
+            return None
+        data = serialize_user(user)
+        user_cache.set(str(user_id), data)
+    return CachedUser(data)
+
+def invalidate_user(user_id):
+    user_cache.delete(str(user_id))
@@ -1,27 +1,77 @@
-import socketio
-from services.binance_service import BinanceService
+import logging
+import threading
+from collections import defaultdict
 
-sio = socketio.Server()
+from flask import request
+from flask_socketio import SocketIO, join_room, leave_room
 
-@sio.event
-def connect(sid, environ):
-    print('Client connected')
+from services.jobs import build_scheduler
+from services.market_publisher import room_registry, valid_room, ROOM_TTL
 
-@sio.event
-def disconnect(sid):
-    print('Client disconnected')
+logger = logging.getLogger(__name__)
 
-@sio.on('subscribe')
-def handle_subscribe(sid, data):
-    symbol = data['symbol']
-    binance_service = BinanceService()
-    binance_service.subscribe_to_symbol(symbol, sid)
+socketio = SocketIO()
 
-@sio.on('unsubscribe')
-def handle_unsubscribe(sid, data):
-    symbol = data['symbol']
-    binance_service = BinanceService()
-    binance_service.unsubscribe_from_symbol(symbol, sid)
+# sid -> rooms joined through this worker, re-registered before they expire
+_client_rooms = defaultdict(set)
+_rooms_lock = threading.Lock()
+
+def _room_name(data):
+    # Accepts 'ticker_btcusdt' / 'kline_btcusdt_1h' or the older {'symbol': 'BTCUSDT'}
+    if isinstance(data, dict):
+        data = f"ticker_{str(data.get('symbol', '')).lower()}"
+    return data if isinstance(data, str) and valid_room(data) else None
+
+@socketio.on('connect')
+def handle_connect():
+    logger.debug(f"Client connected: {request.sid}")
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    with _rooms_lock:
+        _client_rooms.pop(request.sid, None)
+
+@socketio.on('subscribe')
+def handle_subscribe(data):
+    room = _room_name(data)
+    if room is None:
+        return {'error': 'Invalid subscription'}
+    join_room(room)
+    with _rooms_lock:
+        _client_rooms[request.sid].add(room)
+    room_registry.touch([room])
+    return {'subscribed': room}
+
+@socketio.on('unsubscribe')
+def handle_unsubscribe(data):
+    room = _room_name(data)
+    if room is None:
+        return {'error': 'Invalid subscription'}
+    leave_room(room)
+    with _rooms_lock:
+        _client_rooms[request.sid].discard(room)
+    return {'unsubscribed': room}
+
+def _refresh_rooms():
+    while True:
+        socketio.sleep(ROOM_TTL / 2)
+        with _rooms_lock:
+            rooms = set().union(*_client_rooms.values()) if _client_rooms else set()
+        room_registry.touch(rooms)
 
 def init_websocket(app):
-    sio.init_app(app)
+    """Attach Socket.IO; with a message queue, emits from any process reach every worker's clients"""
+    socketio.init_app(
+        app,
+        message_queue=app.config.get('SOCKETIO_MESSAGE_QUEUE'),
+        channel=app.config.get('SOCKETIO_CHANNEL', 'flask-socketio'),
+        async_mode=app.config.get('SOCKETIO_ASYNC_MODE'),
+    )
+    socketio.start_background_task(_refresh_rooms)
+
+    if app.config.get('REALTIME_PRODUCER') == 'inline' and not app.config.get('SOCKETIO_MESSAGE_QUEUE'):
+        # No queue means a single web process and no worker.py to share the jobs with
+        scheduler = build_scheduler(socketio.emit, socketio.sleep)
+        scheduler.start()
+        app.extensions['realtime_scheduler'] = scheduler
+    return socketio
@@ -16,6 +16,9 @@ const CryptoApp = {
     // Chart instances
     charts: {},
     
+    // Delta price feed state: last seen version and symbol -> price row
+    priceFeed: { version: null, prices: new Map() },
+    
     // Initialize the application
     init() {
         // Apply theme based on saved preference
@@ -207,13 +210,29 @@ const CryptoApp = {
         if (loadingIndicator) loadingIndicator.style.display = 'block';
         if (errorMessage) errorMessage.style.display = 'none';
         
-        fetch('/api/prices')
+        // After the first full load only ask for symbols that changed
+        const feed = CryptoApp.priceFeed;
+        const url = feed.version === null ? '/api/prices' : `/api/prices?since=${feed.version}&listing=${feed.listing}`;
+        
+        fetch(url)
             .then(response => {
                 if (!response.ok) throw new Error('Network response was not ok');
+                if (feed.version === null) {
+                    feed.version = Number(response.headers.get('X-Price-Version'));
+                    feed.listing = response.headers.get('X-Price-Listing');
+                }
                 return response.json();
             })
             .then(data => {
-                renderCryptoList(data);
+                if (Array.isArray(data)) {
+                    feed.prices = new Map(data.map(crypto => [crypto.symbol, crypto]));
+                } else {
+                    if (data.full) feed.prices.clear();
+                    data.prices.forEach(crypto => feed.prices.set(crypto.symbol, crypto));
+                    feed.version = data.version;
+                    feed.listing = data.listing;
+                }
+                renderCryptoList(Array.from(feed.prices.values()));
                 if (loadingIndicator) loadingIndicator.style.display = 'none';
             })
             .catch(error => {
@@ -379,19 +398,18 @@ const CryptoApp = {
         if (loadingElement) loadingElement.style.display = 'block';
         if (errorElement) errorElement.style.display = 'none';
         
-        fetch(`/api/klines/${this.activeSymbol}?interval=${this.activeInterval}`)
-            .then(response => {
-                if (!response.ok) throw new Error('Network response was not ok');
-                return response.json();
-            })
-            .then(data => {
-                // Format data for chart
-                const chartData = data.map(candle => ({
-                    x: new Date(candle.time),
-                    o: candle.open,
-                    h: candle.high,
-                    l: candle.low,
-                    c: candle.close
+        // Never ask for more candles than the canvas has pixels to draw them
+        const points = Math.max(100, Math.round(document.getElementById('priceChart').clientWidth));
+        
+        this.fetchColumns(`/api/klines/${this.activeSymbol}?interval=${this.activeInterval}&points=${points}`)
+            .then(({ columns }) => {
+                // Format data for chart straight from the typed arrays
+                const chartData = Array.from(columns.t, (time, i) => ({
+                    x: new Date(time),
+                    o: columns.o[i],
+                    h: columns.h[i],
+                    l: columns.l[i],
+                    c: columns.c[i]
                 }));
                 
                 // Update chart
@@ -617,7 +635,7 @@ const CryptoApp = {
     },
     // Load portfolio data
 function loadPortfolio() {
-    fetch('/api/portfolio')
+    fetch('/api/portfolio?items=true')
         .then(response => {
             if (!response.ok) throw new Error('Network response was not ok');
             return response.json();
@@ -1264,13 +1282,9 @@ function renderPortfolio(data) {
     loadMarketDepth() {
         if (!document.getElementById('depthChart')) return;
         
-        fetch(`/api/depth/${this.activeSymbol}`)
-            .then(response => {
-                if (!response.ok) throw new Error('Network response was not ok');
-                return response.json();
-            })
-            .then(data => {
-                this.renderMarketDepth(data);
+        this.fetchColumns(`/api/depth/${this.activeSymbol}`)
+            .then(({ columns }) => {
+                this.renderMarketDepth(columns);
             })
             .catch(error => {
                 console.error('Error loading market depth:', error);
@@ -1286,16 +1300,9 @@ function renderPortfolio(data) {
             this.charts.depth.destroy();
         }
         
-        // Prepare data
-        const bids = data.bids.map(bid => ({
-            x: parseFloat(bid[0]),
-            y: parseFloat(bid[1])
-        }));
-        
-        const asks = data.asks.map(ask => ({
-            x: parseFloat(ask[0]),
-            y: parseFloat(ask[1])
-        }));
+        // Prepare data from the bid/ask price and quantity columns
+        const bids = Array.from(data.bid_price, (price, i) => ({ x: price, y: data.bid_qty[i] }));
+        const asks = Array.from(data.ask_price, (price, i) => ({ x: price, y: data.ask_qty[i] }));
         
         // Create chart
         this.charts.depth = new Chart(ctx, {
@@ -1460,6 +1467,37 @@ function renderPortfolio(data) {
         });
     },
     
+    // Fetch a kline/depth endpoint in the compact binary column format
+    fetchColumns(url) {
+        return fetch(url, { headers: { 'Accept': 'application/vnd.cryptoapp.columns' } })
+            .then(response => {
+                if (!response.ok) throw new Error('Network response was not ok');
+                const contentType = response.headers.get('Content-Type') || '';
+                if (contentType.startsWith('application/vnd.cryptoapp.columns')) {
+                    return response.arrayBuffer().then(buffer => this.decodeColumns(buffer));
+                }
+                // Columnar JSON fallback
+                return response.json();
+            });
+    },
+    
+    // Decode the binary column layout from utils/wire.py into Float64Array views
+    decodeColumns(buffer) {
+        const headerLength = new DataView(buffer).getUint32(0, true);
+        const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 4, headerLength)));
+        
+        let offset = 4 + headerLength;
+        offset += (8 - (offset % 8)) % 8;
+        
+        const columns = {};
+        header.columns.forEach(([name, length]) => {
+            columns[name] = new Float64Array(buffer, offset, length);
+            offset += length * 8;
+        });
+        
+        return { columns, meta: header.meta };
+    },
+    
     // Utility function for debouncing
     debounce(func, wait) {
         let timeout;
@@ -89,14 +89,15 @@ document.addEventListener('DOMContentLoaded', function() {
     }
     
     function load24hTicker() {
-        fetch(`/api/ticker/${symbol}`)
+        fetch(`/api/tickers?symbols=${symbol}&fields=24hr`)
             .then(response => {
                 if (!response.ok) {
                     throw new Error(`HTTP error! status: ${response.status}`);
                 }
                 return response.json();
             })
-            .then(data => {
+            .then(tickers => {
+                const data = tickers[symbol] && tickers[symbol]['24hr'];
                 if (!data || !data.symbol) {
                     console.error('No ticker data received');
                     return;
@@ -398,17 +399,17 @@ document.addEventListener('DOMContentLoaded', function() {
     
     function calculateIndicatorsFromPrices(prices) {
         // Calculate RSI
-        fetch(`/api/technical/rsi/${symbol}?period=14`)
+        fetch(`/api/technical/rsi/${symbol}?period=14&interval=${currentInterval}`)
             .then(response => response.json())
             .then(data => {
-                if (data && data.rsi !== null) {
+                if (data && data.rsi != null) {
                     updateRSI(data.rsi);
                 }
             })
             .catch(error => console.error('Error fetching RSI:', error));
         
         // Calculate Moving Averages
-        fetch(`/api/technical/ma/${symbol}`)
+        fetch(`/api/technical/ma/${symbol}?interval=${currentInterval}`)
             .then(response => response.json())
             .then(data => {
                 if (data) {
@@ -0,0 +1,30 @@
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+@pytest.fixture(scope='session')
+def redis_url():
+    """URL of a Redis-protocol server every test process can share"""
+    fakeredis = pytest.importorskip('fakeredis')
+    port = free_port()
+    server = fakeredis.TcpFakeServer(('127.0.0.1', port), server_type='redis')
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'redis://127.0.0.1:{port}/0'
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def subprocess_env(redis_url):
+    """Environment for helper processes: the repo importable and REDIS_URL pointing at the shared server"""
+    return {**os.environ, 'PYTHONPATH': ROOT, 'REDIS_URL': redis_url}
@@ -0,0 +1,29 @@
+"""One contender for the election test: python tests/leader_contender.py NAME
+
+Holds NAME's lease through a SingletonScheduler and, while leading, appends
+"<pid> <token>" to the NAME:log list through the fencing token.
+"""
+import os
+import signal
+import sys
+import time
+
+from utils.leader import SingletonScheduler
+
+TTL_MS = 1500
+POLL_SECONDS = 0.2
+
+def main(name):
+    def job(lease):
+        while lease.is_leader:
+            lease.fenced_call('RPUSH', f'{name}:log', f'{os.getpid()} {lease.token}')
+            time.sleep(0.05)
+
+    scheduler = SingletonScheduler(poll=POLL_SECONDS)
+    scheduler.hold(name, job, ttl_ms=TTL_MS)
+    # Exit through atexit so the lease is released, as worker.py does
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    scheduler.run_forever()
+
+if __name__ == '__main__':
+    main(sys.argv[1])
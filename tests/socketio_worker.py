@@ -0,0 +1,19 @@
+"""One Socket.IO web worker for the backplane test: python tests/socketio_worker.py PORT"""
+import os
+import sys
+
+from flask import Flask
+
+from services.websocket_service import init_websocket
+
+app = Flask(__name__)
+app.config.update(
+    SOCKETIO_MESSAGE_QUEUE=os.environ['REDIS_URL'],
+    SOCKETIO_CHANNEL='test-backplane',
+    SOCKETIO_ASYNC_MODE='threading',
+    REALTIME_PRODUCER='external',
+)
+socketio = init_websocket(app)
+
+if __name__ == '__main__':
+    socketio.run(app, host='127.0.0.1', port=int(sys.argv[1]), allow_unsafe_werkzeug=True)
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import pytest
+
+from conftest import ROOT  # noqa: F401
+
+pytest.importorskip('flask_sqlalchemy')
+pytest.importorskip('flask_login')
+
+from flask import Flask  # noqa: E402
+from flask_login import LoginManager  # noqa: E402
+
+import routes.api as api  # noqa: E402
+from config import Config  # noqa: E402
+from database import db, init_db  # noqa: E402
+from models import User, Portfolio, PortfolioItem, Position, Alert, Watchlist, WatchlistSymbol  # noqa: E402
+
+ROWS = [
+    {'symbol': 'BTCUSDT', 'price': 50000.0, 'price_change_24h': 2.0},
+    {'symbol': 'ETHUSDT', 'price': 3000.0, 'price_change_24h': -1.0},
+]
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """The API blueprint on a file-backed SQLite database, so concurrent reads share it"""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update(SECRET_KEY='test', SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "app.db"}',
+                      SQLALCHEMY_ENGINE_OPTIONS={}, SQLALCHEMY_BINDS={})
+    init_db(app)
+    login_manager = LoginManager(app)
+    login_manager.user_loader(lambda user_id: db.session.get(User, int(user_id)))
+    app.register_blueprint(api.api_bp, url_prefix='/api')
+
+    # Prices come from the market table, not upstream
+    monkeypatch.setattr(api.price_feed, 'snapshot', lambda: (42, ROWS))
+    monkeypatch.setattr(api.price_feed, 'quotes', lambda symbols: [])
+
+    with app.app_context():
+        db.create_all()
+        user = User(username='alice', email='alice@example.com', settings={'theme': 'dark'})
+        db.session.add(user)
+        db.session.flush()
+        portfolio = Portfolio(user_id=user.id, name='Main')
+        watchlist = Watchlist(user_id=user.id, name='Majors', created_at=datetime(2025, 1, 6))
+        db.session.add_all([portfolio, watchlist])
+        db.session.flush()
+        db.session.add_all([
+            PortfolioItem(portfolio_id=portfolio.id, symbol='BTCUSDT', quantity=0.5, avg_price=40000,
+                          purchase_price=40000, purchase_date=datetime(2025, 1, 6)),
+            Position(portfolio_id=portfolio.id, symbol='BTCUSDT', quantity=0.5, cost_basis=20000, lot_count=1),
+            Alert(user_id=user.id, symbol='ETHUSDT', price_threshold=3500, is_above=True),
+            WatchlistSymbol(watchlist_id=watchlist.id, symbol='BTCUSDT'),
+            WatchlistSymbol(watchlist_id=watchlist.id, symbol='ETHUSDT'),
+        ])
+        db.session.commit()
+        user_id = user.id
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    yield client
+    with app.app_context():
+        db.drop_all()
+
+def test_bootstrap_returns_every_section(client):
+    response = client.get('/api/dashboard/bootstrap')
+    assert response.status_code == 200, response.get_json()
+    data = response.get_json()
+
+    assert data['prices'] == {'version': 42, 'rows': ROWS}
+    portfolio = data['portfolio']
+    assert portfolio['name'] == 'Main'
+    assert portfolio['total_invested'] == 20000
+    assert portfolio['total_current_value'] == 25000
+    assert [item['symbol'] for item in portfolio['items']] == ['BTCUSDT']
+    assert data['alerts'] == [{'id': 1, 'symbol': 'ETHUSDT', 'alert_type': 'above', 'target_price': 3500,
+                               'is_active': True}]
+    assert data['watchlists'] == [{'id': 1, 'name': 'Majors', 'created_at': '2025-01-06T00:00:00',
+                                   'symbol_count': 2}]
+    assert [row['price'] for row in data['watchlist']['symbols']] == [50000.0, 3000.0]
+    assert data['settings']['theme'] == 'dark'
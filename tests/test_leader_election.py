@@ -0,0 +1,96 @@
+import signal
+import subprocess
+import sys
+import time
+import uuid
+
+import pytest
+
+from conftest import ROOT
+
+redis = pytest.importorskip('redis')
+
+from utils.leader import LeaderLease  # noqa: E402
+
+TTL_SECONDS = 1.5
+
+def entries(client, name):
+    """(pid, token) of every fenced write, in the order Redis accepted them"""
+    return [tuple(int(part) for part in raw.split()) for raw in client.lrange(f'{name}:log', 0, -1)]
+
+def wait_for(condition, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        result = condition()
+        if result:
+            return result
+        time.sleep(0.02)
+    return None
+
+@pytest.fixture
+def election(redis_url, subprocess_env):
+    """Three contender processes for a fresh lease name"""
+    name = f'election-{uuid.uuid4().hex[:8]}'
+    procs = {}
+    for _ in range(3):
+        proc = subprocess.Popen([sys.executable, f'{ROOT}/tests/leader_contender.py', name], env=subprocess_env)
+        procs[proc.pid] = proc
+    client = redis.Redis.from_url(redis_url)
+    yield name, procs, client
+    for proc in procs.values():
+        proc.kill()
+        proc.wait(timeout=10)
+
+def leader_after(client, name, count):
+    """The writer once the log grows past ``count`` entries"""
+    found = wait_for(lambda: entries(client, name)[count:], timeout=10)
+    assert found, 'no leader wrote'
+    return found[-1]
+
+def test_single_leader_failover_and_handover(election, redis_url):
+    name, procs, client = election
+
+    first_pid, first_token = leader_after(client, name, 0)
+    time.sleep(1)
+    assert {pid for pid, _ in entries(client, name)} == {first_pid}
+
+    # Crash: no release, so a follower takes over once the lease expires
+    procs[first_pid].kill()
+    crashed_at, seen = time.time(), len(entries(client, name))
+    second_pid, second_token = wait_for(
+        lambda: next(((p, t) for p, t in entries(client, name)[seen:] if p != first_pid), None), timeout=10)
+    assert second_pid != first_pid and second_token > first_token
+    assert time.time() - crashed_at < TTL_SECONDS + 1.5
+
+    # Graceful stop releases the lease, so the handover does not wait for the TTL
+    procs[second_pid].send_signal(signal.SIGTERM)
+    stopped_at, seen = time.time(), len(entries(client, name))
+    third_pid, third_token = wait_for(
+        lambda: next(((p, t) for p, t in entries(client, name)[seen:] if p != second_pid), None), timeout=10)
+    assert third_pid not in (first_pid, second_pid) and third_token > second_token
+    assert time.time() - stopped_at < TTL_SECONDS
+
+    # Fencing: tokens never go back, so no deposed leader wrote after its successor
+    tokens = [token for _, token in entries(client, name)]
+    assert tokens == sorted(tokens)
+    assert [pid for pid, _ in entries(client, name)][-1] == third_pid
+
+def test_stale_leader_writes_are_rejected(redis_url):
+    client = redis.Redis.from_url(redis_url)
+    name = f'fencing-{uuid.uuid4().hex[:8]}'
+    old = LeaderLease(name, ttl_ms=200, client=client)
+    assert old.try_acquire()
+    assert old.fenced_set(f'{name}:value', 'old')
+
+    time.sleep(0.3)  # old stops renewing; its lease expires
+    new = LeaderLease(name, client=client)
+    assert new.try_acquire() and new.token > old.token
+    assert new.fenced_set(f'{name}:value', 'new')
+
+    # The old holder still believes it leads until it next talks to Redis
+    old._valid_until = float('inf')
+    assert not old.fenced_set(f'{name}:value', 'stale')
+    assert not old.fenced_call('RPUSH', f'{name}:log', 'stale')
+    assert new.fenced_call('RPUSH', f'{name}:log', 'fresh')
+    assert client.hget(f'{name}:value', 'value') == b'new'
+    assert client.lrange(f'{name}:log', 0, -1) == [b'fresh']
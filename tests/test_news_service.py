@@ -0,0 +1,150 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from conftest import ROOT
+
+import services.news_service as news  # noqa: E402
+from services.news_service import CoinMatcher, NewsService, content_hash, parse_feed, DEFAULT_NAMES  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, 'tests', 'fixtures')
+RSS = os.path.join(FIXTURES, 'news_rss.xml')
+ATOM = os.path.join(FIXTURES, 'news_atom.xml')
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def timestamp(*args):
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+def article(id, published, title='Untitled', summary=''):
+    return {'id': id, 'title': title, 'url': '', 'summary': summary, 'source': 'test', 'published': published}
+
+@pytest.fixture
+def service(monkeypatch):
+    """Service over the fixture feeds, without Redis or CoinMarketCap names"""
+    monkeypatch.setattr(news, 'get_redis', lambda: None)
+    monkeypatch.setattr(news.market_overview, 'coins', lambda: None)
+    return NewsService(feeds=[RSS, f'file://{ATOM}'])
+
+def test_parse_rss():
+    articles = parse_feed(read(RSS), 'wire')
+    assert [a['title'] for a in articles] == [
+        'Bitcoin tops $100k as ETF inflows grow',
+        'Shiba Inu and Dogecoin lead memecoin rebound',
+        'Ethereum developers set date for next upgrade',
+    ]
+    first = articles[0]
+    assert first['url'] == 'https://wire.example/markets/bitcoin-100k'
+    assert first['summary'] == 'BTC rallied as spot ETF inflows reached a record & the SEC stayed quiet.'
+    assert first['source'] == 'wire'
+    assert first['published'] == timestamp(2025, 1, 6, 9)
+    # Escaped markup is unescaped, then stripped
+    assert articles[2]['summary'] == 'The ETH upgrade lands in March, developers said.'
+
+def test_parse_atom():
+    articles = parse_feed(read(ATOM), 'atom')
+    assert [a['title'] for a in articles] == [
+        'Bitcoin tops $100k as ETF inflows grow',
+        'Solana & Cardano validators vote on fee changes',
+    ]
+    assert articles[0]['url'] == 'https://atom.example/2025/01/06/bitcoin-tops-100k?utm_source=feed'
+    assert articles[0]['published'] == timestamp(2025, 1, 6, 9, 5)
+    # <updated> stands in for <published>, <content> for <summary>
+    assert articles[1]['published'] == timestamp(2025, 1, 6, 11)
+    assert articles[1]['summary'] == 'SOL and ADA holders weigh in.'
+
+def test_content_hash_ignores_markup_case_and_url():
+    rss = parse_feed(read(RSS), 'wire')[0]
+    atom = parse_feed(read(ATOM), 'atom')[0]
+    assert rss['url'] != atom['url']
+    assert rss['id'] == atom['id']
+    assert content_hash('Bitcoin  TOPS $100k!', '<b>x</b>') == content_hash('bitcoin tops 100k', 'b x b')
+    assert content_hash('Bitcoin tops $100k', '') != content_hash('Bitcoin tops $200k', '')
+
+def test_coin_matcher_coins():
+    matcher = CoinMatcher(DEFAULT_NAMES)
+    assert matcher.coins('BTC and Ethereum rally') == {'BTC', 'ETH'}
+    assert matcher.coins('Shiba Inu climbs') == {'SHIB'}
+    # Lower-case tickers are words, and acronyms that shadow tickers are ignored
+    assert matcher.coins('a sol-powered bot') == set()
+    assert matcher.coins('The SEC and the ETF') == set()
+
+def test_coin_matcher_one_word_names_need_capitals():
+    matcher = CoinMatcher({'RENDER': 'Render', 'FLOW': 'Flow', 'SHIB': 'Shiba Inu'})
+    assert matcher.coins('Studios render scenes as capital continues to flow') == set()
+    assert matcher.coins('Render and Flow rally') == {'RENDER', 'FLOW'}
+    # Names of several words are specific enough in any case
+    assert matcher.coins('shiba inu holders') == {'SHIB'}
+
+def test_coin_matcher_resolve():
+    matcher = CoinMatcher(DEFAULT_NAMES)
+    assert matcher.resolve('btc') == 'BTC'
+    assert matcher.resolve('Bitcoin') == 'BTC'
+    assert matcher.resolve('BTCUSDT') == 'BTC'
+    assert matcher.resolve('shiba-inu') == 'SHIB'
+    assert matcher.resolve('ethbtc') == 'ETH'
+    assert matcher.resolve('FOO') is None
+
+def test_refresh_dedupes_syndicated_stories(service):
+    assert service.refresh() == 4
+    assert service.refresh() == 0
+    titles = [a['title'] for a in service.get_crypto_news(limit=10)]
+    assert titles == [
+        'Solana & Cardano validators vote on fee changes',
+        'Shiba Inu and Dogecoin lead memecoin rebound',
+        'Bitcoin tops $100k as ETF inflows grow',
+        'Ethereum developers set date for next upgrade',
+    ]
+    assert [a['title'] for a in service.get_coin_specific_news('BTCUSDT')] == ['Bitcoin tops $100k as ETF inflows grow']
+    assert [a['title'] for a in service.get_coin_specific_news('cardano')] == ['Solana & Cardano validators vote on fee changes']
+    assert service.get_coin_specific_news('FOO') == []
+
+def test_names_come_from_market_overview(service, monkeypatch):
+    monkeypatch.setattr(news.market_overview, 'coins', lambda: [{'symbol': 'DOGE', 'name': 'Dogecoin'},
+                                                                {'symbol': 'SHIB', 'name': 'Shiba Inu'},
+                                                                {'symbol': 'MEME', 'name': 'Memecoin'}])
+    service.refresh()
+    assert [a['title'] for a in service.get_coin_specific_news('memecoin')] == []
+    service.ingest([article('m1', 1000, title='Memecoin season returns')])
+    assert [a['id'] for a in service.get_coin_specific_news('MEME')] == ['m1']
+
+def test_ingest_evicts_oldest(service):
+    service.max_articles = 3
+    service.ingest([article(f'a{i}', 1000 + i, title=f'BTC story {i}') for i in (3, 0, 4, 1, 2)])
+    assert [a['id'] for a in service.get_crypto_news(limit=10)] == ['a4', 'a3', 'a2']
+    # Evicted stories leave the coin index too
+    assert [a['id'] for a in service.get_coin_specific_news('BTC')] == ['a4', 'a3', 'a2']
+    assert service.ingest([article('a2', 1002)]) == []
+    service.ingest([article('a5', 1005, title='Dogecoin story')])
+    assert [a['id'] for a in service.get_coin_specific_news('BTC')] == ['a4', 'a3']
+    assert 'BTC' in service._index and len(service._articles) == 3
+
+def test_limit_is_validated(service):
+    with pytest.raises(ValueError):
+        service.get_crypto_news(limit=0)
+    with pytest.raises(ValueError):
+        service.get_coin_specific_news('BTC', limit=news.MAX_LIMIT + 1)
+
+def test_sync_replays_published_articles(monkeypatch):
+    fakeredis = pytest.importorskip('fakeredis')
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(news, 'get_redis', lambda: client)
+    monkeypatch.setattr(news.market_overview, 'coins', lambda: None)
+    monkeypatch.setattr(NewsService, '_ensure_started', lambda self: None)
+
+    fetcher = NewsService(feeds=[RSS])
+    reader = NewsService(feeds=[])
+    assert fetcher.refresh() == 3
+    reader.sync()
+    assert [a['id'] for a in reader.get_crypto_news()] == [a['id'] for a in fetcher.get_crypto_news()]
+
+    # Later syncs replay only entries appended since the last one
+    fetcher.feeds = [ATOM]
+    assert fetcher.refresh() == 1
+    reader.sync()
+    assert len(reader.get_crypto_news(limit=10)) == 4
+    assert [a['title'] for a in reader.get_coin_specific_news('SOL')] == ['Solana & Cardano validators vote on fee changes']
+    assert client.xlen(news.STREAM_KEY) == 4
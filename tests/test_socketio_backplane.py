@@ -0,0 +1,85 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+from conftest import ROOT, free_port
+
+socketio = pytest.importorskip('socketio')
+
+CHANNEL = 'test-backplane'
+
+def wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+def connect(port, transport):
+    client = socketio.Client()
+    deadline = time.time() + 15
+    while True:
+        try:
+            client.connect(f'http://127.0.0.1:{port}', transports=[transport], wait_timeout=5)
+            return client
+        except socketio.exceptions.ConnectionError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.2)
+
+@pytest.fixture
+def workers(subprocess_env):
+    """Two web worker processes sharing the Redis message queue"""
+    ports = [free_port(), free_port()]
+    procs = [
+        subprocess.Popen([sys.executable, f'{ROOT}/tests/socketio_worker.py', str(port)],
+                         env=subprocess_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for port in ports
+    ]
+    yield ports
+    for proc in procs:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+@pytest.fixture
+def emitter(redis_url):
+    """The market-data producer's side: publishes to the queue without serving clients"""
+    from flask_socketio import SocketIO
+    return SocketIO(message_queue=redis_url, channel=CHANNEL)
+
+def test_emits_reach_clients_on_every_worker(workers, emitter):
+    received = {port: [] for port in workers}
+    clients = []
+    # One client per worker, one of them on the long-polling fallback
+    for port, transport in zip(workers, ('websocket', 'polling')):
+        client = connect(port, transport)
+        client.on('price_update', lambda data, port=port: received[port].append(('price_update', data['symbol'])))
+        client.on('ticker_btcusdt', lambda data, port=port: received[port].append(('ticker', data['c'])))
+        assert client.call('subscribe', 'ticker_btcusdt') == {'subscribed': 'ticker_btcusdt'}
+        clients.append(client)
+
+    try:
+        emitter.emit('price_update', {'symbol': 'BTCUSDT', 'price': 1.0})
+        emitter.emit('ticker_btcusdt', {'s': 'BTCUSDT', 'c': '123.4'}, to='ticker_btcusdt')
+        emitter.emit('ticker_ethusdt', {'s': 'ETHUSDT', 'c': '1'}, to='ticker_ethusdt')
+
+        assert wait_for(lambda: all(len(events) == 2 for events in received.values()))
+        for events in received.values():
+            assert sorted(events) == [('price_update', 'BTCUSDT'), ('ticker', '123.4')]
+    finally:
+        for client in clients:
+            client.disconnect()
+
+def test_joined_rooms_are_registered_for_the_producer(workers, redis_url, monkeypatch):
+    monkeypatch.setenv('REDIS_URL', redis_url)
+    from services.market_publisher import RoomRegistry
+
+    client = connect(workers[0], 'websocket')
+    try:
+        client.call('subscribe', 'kline_ethusdt_1h')
+        assert 'kline_ethusdt_1h' in RoomRegistry().active()
+    finally:
+        client.disconnect()
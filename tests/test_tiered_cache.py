@@ -0,0 +1,42 @@
+import time
+
+import pytest
+
+from conftest import ROOT  # noqa: F401
+
+pytest.importorskip('redis')
+
+import utils.redis_client as redis_client  # noqa: E402
+from utils.cache import TieredCache  # noqa: E402
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+@pytest.fixture
+def shared_redis(redis_url, monkeypatch):
+    monkeypatch.setenv('REDIS_URL', redis_url)
+    monkeypatch.setattr(redis_client, '_clients', {})
+    return redis_url
+
+def test_delete_reaches_other_workers_after_idle_period(shared_redis):
+    """Two caches stand in for two workers; the idle wait outlasts the client's 2s socket timeout"""
+    writer, reader = TieredCache('tiered-test'), TieredCache('tiered-test')
+    writer.set('user:1', {'name': 'old'})
+    assert wait_for(lambda: reader.get('user:1') == {'name': 'old'} and reader.local.get('user:1') is not None)
+
+    time.sleep(3)
+    writer.delete('user:1')
+    assert wait_for(lambda: reader.local.get('user:1') is None, timeout=2)
+    assert reader.get('user:1') is None
+
+def test_local_tier_bypassed_until_subscribed(shared_redis, monkeypatch):
+    monkeypatch.setattr(TieredCache, '_start_listener', lambda self, client: None)
+    cache = TieredCache('tiered-unsubscribed')
+    cache.set('k', 1)
+    assert cache.local.get('k') is None
+    assert cache.get('k') == 1
@@ -0,0 +1,200 @@
+# utils/cache.py
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+LISTEN_SECONDS = 1  # pub/sub poll interval; below the shared client's socket timeout
+RESUBSCRIBE_SECONDS = 5  # wait between attempts while Redis is unreachable
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries expire after a TTL.
+
+    With ``maxweight`` set, ``weigh(value)`` sizes each entry and the least
+    recently used entries are also evicted while the total exceeds it.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60, maxweight=None, weigh=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxweight = maxweight
+        self.weigh = weigh
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value, weight = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.weight -= weight
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        weight = self.weigh(value) if self.maxweight is not None else 0
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.weight -= old[2]
+            self._data[key] = (expires_at, value, weight)
+            self.weight += weight
+            while len(self._data) > self.maxsize or (self.maxweight is not None and self.weight > self.maxweight):
+                _, (_, _, evicted) = self._data.popitem(last=False)
+                self.weight -= evicted
+
+    def get_or_set(self, key, factory, ttl=None):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self.weight -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.weight = 0
+
+    def stats(self):
+        stats = {'size': len(self._data), 'hits': self.hits, 'misses': self.misses}
+        if self.maxweight is not None:
+            stats['weight'] = self.weight
+        return stats
+
+    def __len__(self):
+        return len(self._data)
+
+class TieredCache:
+    """In-process TTLCache in front of a shared Redis tier.
+
+    Keys are strings and values must be JSON-serialisable. Deletes are broadcast over Redis pub/sub so
+    every worker drops its local copy, not just the one that performed the write. While the
+    invalidation subscription is down the local tier is bypassed, since a delete could go unseen.
+    """
+
+    def __init__(self, namespace, maxsize=1024, ttl=60, redis_ttl=None):
+        self.namespace = namespace
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.redis_ttl = redis_ttl or ttl
+        self.shared_hits = 0
+        self.misses = 0
+        self._listener = None
+        self._subscribed = False
+
+    def _key(self, key):
+        return f'{self.namespace}:{key}'
+
+    def _redis(self):
+        client = get_redis()
+        if client is not None and self._listener is None:
+            self._start_listener(client)
+        return client
+
+    def _local_ok(self, client):
+        return client is None or self._subscribed
+
+    def get(self, key, default=None):
+        client = self._redis()
+        if self._local_ok(client):
+            value = self.local.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+
+        if client is not None:
+            try:
+                raw = client.get(self._key(key))
+                if raw is not None:
+                    value = json.loads(raw)
+                    if self._local_ok(client):
+                        self.local.set(key, value)
+                    self.shared_hits += 1
+                    return value
+            except Exception as e:
+                logger.warning(f"Redis read failed for {self._key(key)}: {e}")
+        self.misses += 1
+        return default
+
+    def set(self, key, value, ttl=None):
+        client = self._redis()
+        if self._local_ok(client):
+            self.local.set(key, value, ttl)
+        if client is not None:
+            try:
+                client.set(self._key(key), json.dumps(value), ex=int(ttl or self.redis_ttl))
+            except Exception as e:
+                logger.warning(f"Redis write failed for {self._key(key)}: {e}")
+
+    def get_or_set(self, key, factory, ttl=None):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key):
+        self.local.delete(key)
+        client = self._redis()
+        if client is not None:
+            try:
+                client.delete(self._key(key))
+                client.publish(f'{self.namespace}:invalidate', str(key))
+            except Exception as e:
+                logger.warning(f"Redis delete failed for {self._key(key)}: {e}")
+
+    def stats(self):
+        return {'local_hits': self.local.hits, 'shared_hits': self.shared_hits, 'misses': self.misses,
+                'size': len(self.local)}
+
+    def _start_listener(self, client):
+        self._listener = threading.Thread(target=self._listen, args=(client,), daemon=True)
+        self._listener.start()
+
+    def _listen(self, client):
+        while True:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(f'{self.namespace}:invalidate')
+                self._subscribed = True
+                # Polled rather than listen(): an idle channel must not trip the client's socket timeout
+                while True:
+                    message = pubsub.get_message(timeout=LISTEN_SECONDS)
+                    if message is not None:
+                        self.local.delete(self._decode_key(message['data']))
+            except Exception as e:
+                was_subscribed, self._subscribed = self._subscribed, False
+                # Deletes published from here until resubscribed are lost; forget everything instead
+                self.local.clear()
+                logger.warning(f"Cache invalidation listener for {self.namespace} failed: {e}")
+                if not was_subscribed:
+                    time.sleep(RESUBSCRIBE_SECONDS)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+    @staticmethod
+    def _decode_key(raw):
+        return raw.decode() if isinstance(raw, bytes) else raw
@@ -0,0 +1,189 @@
+import functools
+import logging
+import threading
+import time
+from collections import deque
+
+from flask import g, has_request_context
+
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+WINDOW = 20  # most recent calls considered
+MIN_CALLS = 5  # never trip on fewer calls than this
+FAILURE_RATE = 0.5  # share of failed or slow calls that opens the circuit
+SLOW_CALL_SECONDS = 2.0
+OPEN_SECONDS = 30  # fail fast this long before probing again
+HALF_OPEN_PROBES = 1
+STALE_ENTRIES = 2048
+STALE_MAX_BYTES = 8 * 1024 * 1024  # serialized size per decorated call; live objects run several times larger
+STALE_MAX_ENTRY_BYTES = 1024 * 1024  # larger results are not kept at all
+SIZE_SAMPLE = 8  # list elements weighed to estimate a list's size
+STALE_MAX_AGE = 3600  # oldest last-known-good value worth serving
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+_breakers = {}
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"{name} circuit is open; retrying in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """Per-upstream breaker over a sliding window of call outcomes.
+
+    Errors and calls slower than ``slow_call_seconds`` both count as
+    failures. When their share of the window reaches ``failure_rate`` the
+    circuit opens and calls fail immediately for ``open_seconds``; then up
+    to ``half_open_probes`` trial calls go through. A successful probe
+    closes the circuit, a failed one opens it again.
+    """
+
+    def __init__(self, name, window=WINDOW, min_calls=MIN_CALLS, failure_rate=FAILURE_RATE,
+                 slow_call_seconds=SLOW_CALL_SECONDS, open_seconds=OPEN_SECONDS, half_open_probes=HALF_OPEN_PROBES):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self.opened_at = 0
+        self.last_error = None
+        self._outcomes = deque(maxlen=window)  # True for a failed or slow call
+        self._probes = 0
+        self._lock = threading.Lock()
+        _breakers[name] = self
+
+    def _before_call(self):
+        with self._lock:
+            if self.state == OPEN:
+                retry_in = self.opened_at + self.open_seconds - time.monotonic()
+                if retry_in > 0:
+                    raise CircuitOpenError(self.name, retry_in)
+                self.state = HALF_OPEN
+                self._probes = 0
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    raise CircuitOpenError(self.name, 0)
+                self._probes += 1
+
+    def _after_call(self, failed, error=None):
+        with self._lock:
+            if error is not None:
+                self.last_error = str(error)
+            if self.state == HALF_OPEN:
+                self._probes -= 1
+                if failed:
+                    self._open()
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                    logger.info(f"{self.name} circuit closed")
+                return
+
+            self._outcomes.append(failed)
+            failures = sum(self._outcomes)
+            if self.state == CLOSED and len(self._outcomes) >= self.min_calls \
+                    and failures >= self.failure_rate * len(self._outcomes):
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        logger.warning(f"{self.name} circuit opened for {self.open_seconds}s: {self.last_error}")
+
+    def call(self, func, *args, **kwargs):
+        self._before_call()
+        started = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._after_call(True, e)
+            raise
+        elapsed = time.monotonic() - started
+        slow = elapsed > self.slow_call_seconds
+        self._after_call(slow, f"slow call ({elapsed:.1f}s)" if slow else None)
+        return result
+
+    def stats(self):
+        with self._lock:
+            retry_in = self.opened_at + self.open_seconds - time.monotonic()
+            return {
+                'state': self.state,
+                'recent_calls': len(self._outcomes),
+                'recent_failures': sum(self._outcomes),
+                'retry_in': round(max(0.0, retry_in), 1) if self.state == OPEN else None,
+                'last_error': self.last_error
+            }
+
+def all_breakers():
+    return {name: breaker.stats() for name, breaker in _breakers.items()}
+
+def _estimated_size(value):
+    """Approximate serialized size of a decoded JSON value; long lists are weighed by a sample"""
+    if isinstance(value, list):
+        if not value:
+            return 2
+        sample = value[::-(-len(value) // SIZE_SAMPLE)]
+        return len(value) * (sum(_estimated_size(item) for item in sample) // len(sample) + 1) + 1
+    if isinstance(value, dict):
+        return sum(len(str(k)) + 4 + _estimated_size(v) for k, v in value.items()) + 1
+    if isinstance(value, str):
+        return len(value) + 2
+    return 8
+
+def _mark_stale(source, age):
+    if has_request_context():
+        stale = g.setdefault('stale_sources', {})
+        stale[source] = max(age, stale.get(source, 0))
+
+def last_known_good(source, key=None, cacheable=lambda value: value is not None):
+    """Serve the last good result of a call, with its age, when the call fails or its circuit is open.
+
+    ``key(*args, **kwargs)`` identifies equivalent calls (default: all
+    arguments); a key of None passes the call through without keeping its
+    result. Stale responses are flagged through ``X-Data-Stale``.
+    """
+    def decorator(func):
+        good = TTLCache(maxsize=STALE_ENTRIES, ttl=STALE_MAX_AGE, maxweight=STALE_MAX_BYTES, weigh=lambda entry: entry[2])
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs) if key else repr((args, sorted(kwargs.items())))
+            if cache_key is None:
+                return func(*args, **kwargs)
+            try:
+                value = func(*args, **kwargs)
+            except Exception as e:
+                entry = good.get(cache_key)
+                if entry is None:
+                    raise
+                value, stored_at, _ = entry
+                age = time.time() - stored_at
+                logger.debug(f"Serving {age:.0f}s old {func.__qualname__} data: {e}")
+                _mark_stale(source, age)
+                return value
+            if cacheable(value):
+                size = _estimated_size(value)
+                if size <= STALE_MAX_ENTRY_BYTES:
+                    good.set(cache_key, (value, time.time(), size))
+                else:
+                    good.delete(cache_key)
+            return value
+        return wrapper
+    return decorator
+
+def _stale_headers(response):
+    stale = g.get('stale_sources')
+    if stale:
+        response.headers['X-Data-Stale'] = ', '.join(f'{source}; age={age:.0f}' for source, age in stale.items())
+    return response
+
+def init_circuits(app):
+    app.after_request(_stale_headers)
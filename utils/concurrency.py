@@ -0,0 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor
+
+def cooperative():
+    """True when eventlet has monkey-patched this process (see wsgi.py)"""
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return False
+    return patcher.is_monkey_patched('socket')
+
+def bounded_map(func, items, size):
+    """``[func(item) for item in items]`` with at most ``size`` calls in flight.
+
+    Uses a green thread pool under eventlet and OS threads otherwise, so
+    fan-out of blocking upstream calls is bounded in either run mode.
+    """
+    items = list(items)
+    if not items:
+        return []
+    if cooperative():
+        import eventlet
+        return list(eventlet.GreenPool(size).imap(func, items))
+    with ThreadPoolExecutor(min(size, len(items))) as pool:
+        return list(pool.map(func, items))
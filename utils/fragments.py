@@ -0,0 +1,171 @@
+import logging
+import threading
+import zlib
+from collections import defaultdict
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from utils.cache import TieredCache
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+FRAGMENT_ENTRIES = 5000
+FRAGMENT_TTL = 300  # in-process copies; without Redis also bounds staleness across processes
+FRAGMENT_REDIS_TTL = 3600
+VERSIONS_TTL = 7 * 86400  # must outlive every fragment keyed by the versions
+PENDING_KEY = 'fragment_writes'
+
+# Model groups per-user fragments can depend on
+GROUPS = ('portfolio', 'alerts', 'watchlist')
+
+fragment_cache = TieredCache('fragment', maxsize=FRAGMENT_ENTRIES, ttl=FRAGMENT_TTL, redis_ttl=FRAGMENT_REDIS_TTL)
+
+_UNSET = object()
+
+class Lazy:
+    """Stands in for template data that is only loaded if the template uses it, i.e. on a fragment miss"""
+
+    __slots__ = ('_load', '_value')
+
+    def __init__(self, load):
+        self._load = load
+        self._value = _UNSET
+
+    def _get(self):
+        if self._value is _UNSET:
+            self._value = self._load()
+        return self._value
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __getitem__(self, key):
+        return self._get()[key]
+
+    def __iter__(self):
+        return iter(self._get())
+
+    def __len__(self):
+        return len(self._get())
+
+    def __bool__(self):
+        return bool(self._get())
+
+class ModelVersions:
+    """Per-user version of each model group, part of every per-user fragment key.
+
+    A version moves when a write to one of the user's rows commits, so later
+    renders miss and the old fragments age out; nothing has to be deleted.
+    Counters are shared through Redis when configured (one HMGET per page)
+    and kept per process otherwise.
+    """
+
+    def __init__(self):
+        self._local = defaultdict(int)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(user_id):
+        return f'fragment:versions:{user_id}'
+
+    def get(self, user_id):
+        """``{group: version}`` for ``user_id``"""
+        client = get_redis()
+        if client is not None:
+            try:
+                values = client.hmget(self._key(user_id), GROUPS)
+                return {group: f'r{int(value or 0)}' for group, value in zip(GROUPS, values)}
+            except Exception as e:
+                logger.warning(f"Reading fragment versions for user {user_id} failed: {e}")
+        with self._lock:
+            return {group: f'l{self._local[(user_id, group)]}' for group in GROUPS}
+
+    def bump(self, writes):
+        """Move the version of every ``(user_id, group)`` in ``writes``"""
+        with self._lock:
+            for write in writes:
+                self._local[write] += 1
+        client = get_redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                for user_id, group in writes:
+                    pipe.hincrby(self._key(user_id), group, 1)
+                    pipe.expire(self._key(user_id), VERSIONS_TTL)
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"Bumping fragment versions failed: {e}")
+
+model_versions = ModelVersions()
+
+def track_writes(model, group, owner=None):
+    """Bump ``group`` for the owning user whenever a write to ``model`` commits.
+
+    ``model`` has a ``user_id`` column, or ``owner`` is the model holding it
+    and ``model`` has a foreign key to it. Covers every ORM write path;
+    bulk ``Query.update``/``delete`` bypass mapper events and are not used.
+    """
+    if owner is None:
+        def user_of(connection, target):
+            return target.user_id
+    else:
+        column = next(c for c in model.__table__.columns
+                      if any(fk.column.table is owner.__table__ for fk in c.foreign_keys))
+
+        def user_of(connection, target):
+            parent_id = getattr(target, column.key)
+            return connection.execute(select(owner.user_id).where(owner.id == parent_id)).scalar()
+
+    def record(mapper, connection, target):
+        session = object_session(target)
+        user_id = user_of(connection, target)
+        if session is not None and user_id is not None:
+            session.info.setdefault(PENDING_KEY, set()).add((user_id, group))
+
+    for name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(model, name, record)
+
+@event.listens_for(Session, 'after_commit')
+def _bump_committed(session):
+    writes = session.info.pop(PENDING_KEY, None)
+    if writes:
+        model_versions.bump(writes)
+
+@event.listens_for(Session, 'after_rollback')
+def _drop_rolled_back(session):
+    session.info.pop(PENDING_KEY, None)
+
+class FragmentCacheExtension(Extension):
+    """``{% cache 'name', key, ... %}...{% endcache %}`` renders the body once per key.
+
+    Keys also carry a checksum of the template source, so a deploy that
+    changes the markup never serves fragments rendered by the old template.
+    """
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+
+        source = self.environment.loader.get_source(self.environment, parser.name)[0] \
+            if self.environment.loader is not None and parser.name else ''
+        prefix = nodes.Const(f'{parser.name}:{zlib.crc32(source.encode()):08x}')
+        call = self.call_method('_render', [prefix, nodes.List(parts)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    @staticmethod
+    def _render(prefix, parts, caller):
+        key = ':'.join([prefix, *(str(part) for part in parts)])
+        return Markup(fragment_cache.get_or_set(key, lambda: str(caller())))
+
+def init_fragments(app):
+    app.jinja_env.add_extension(FragmentCacheExtension)
@@ -0,0 +1,118 @@
+import codecs
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DELIMITERS = frozenset(',:]} \t\n\r')
+_decoder = json.JSONDecoder()
+
+class _Reader:
+    """Text buffer over a byte-chunk iterator holding only the unparsed tail"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.batching = True
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self._utf8.decode(b'', final=True)
+        else:
+            text = self._utf8.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, reading more input as needed"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError('Unexpected end of JSON input')
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f'Expected {char!r} in JSON input, found {found!r}')
+        self.pos += 1
+
+    def value(self):
+        """Decode one complete JSON value starting at the next non-whitespace character"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                # A number cut by a chunk boundary ("12" of "12.5") decodes early; wait for its delimiter
+                if self.eof or (end < len(self.buffer) and self.buffer[end] in _DELIMITERS):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def elements(self):
+        """Every complete array element left in the buffer, decoded in one C-level call.
+
+        The text up to the last '}' is a run of whole elements exactly when it
+        parses as an array body; a cut inside a string or a nested object fails
+        instead. On the first failure the reader falls back to one element at
+        a time for the rest of the stream. Returns None when nothing was decoded.
+        """
+        end = self.buffer.rfind('}', self.pos) + 1
+        if not self.batching or end == 0:
+            return None
+        try:
+            items = json.loads(f'[{self.buffer[self.pos:end]}]')
+        except ValueError:
+            self.batching = False
+            return None
+        self.pos = end
+        return items
+
+def iter_items(chunks, key=None):
+    """Yield the elements of a JSON array as they arrive in ``chunks`` of bytes.
+
+    The array is the whole document, or with ``key`` the array under that
+    top-level key of an object. Only one element is decoded at a time, so
+    peak memory is bounded by the largest element rather than the payload.
+    """
+    reader = _Reader(chunks)
+    if key is not None:
+        reader.expect('{')
+        while True:
+            if reader.peek() == '}':
+                return
+            name = reader.value()
+            reader.expect(':')
+            if name == key:
+                break
+            reader.value()  # sibling values before the array are small
+            if reader.peek() == ',':
+                reader.pos += 1
+
+    if reader.peek() != '[':
+        # Upstream errors arrive as {"code": ..., "msg": ...} instead of the array
+        raise ValueError(f'Expected a JSON array, got: {str(reader.value())[:200]}')
+    reader.pos += 1
+    if reader.peek() == ']':
+        return
+    while True:
+        yield from reader.elements() or [reader.value()]
+        separator = reader.peek()
+        reader.pos += 1
+        if separator == ']':
+            return
+        if separator != ',':
+            raise ValueError(f'Expected \',\' or \']\' in JSON array, found {separator!r}')
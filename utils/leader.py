@@ -0,0 +1,210 @@
+# utils/leader.py
+import atexit
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+LEASE_TTL_MS = 10_000
+POLL_SECONDS = 1.0
+
+# Extend the lease only if we still hold it
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Delete the lease only if we still hold it
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Reject writes carrying an older fencing token than the last one accepted
+FENCED_SET_SCRIPT = """
+local current = tonumber(redis.call('hget', KEYS[1], 'token') or '0')
+if tonumber(ARGV[1]) < current then
+    return 0
+end
+redis.call('hset', KEYS[1], 'token', ARGV[1], 'value', ARGV[2])
+return 1
+"""
+
+# Run a command only while no newer term has been issued (KEYS[1] is the term counter)
+FENCED_CALL_SCRIPT = """
+if tonumber(redis.call('get', KEYS[1]) or '0') ~= tonumber(ARGV[1]) then
+    return false
+end
+redis.call((table.unpack or unpack)(ARGV, 2))
+return 1
+"""
+
+def fenced_set(client, key, token, value):
+    """Store ``value`` in hash ``key`` unless a write with a newer ``token`` got there first"""
+    return bool(client.eval(FENCED_SET_SCRIPT, 1, key, token, value))
+
+class LeaderLease:
+    """Time-bounded leadership of ``name`` with a fencing token per term.
+
+    The holder writes a unique identity with SET NX PX and renews it before
+    the TTL runs out; a crashed holder stops renewing and another instance
+    takes over within one TTL. Every acquisition INCRs a counter, so writes
+    tagged with the token can be rejected once a newer leader exists.
+    Without Redis there is nobody to coordinate with and the lease is always held.
+    """
+
+    def __init__(self, name, ttl_ms=LEASE_TTL_MS, client=None):
+        self.name = name
+        self.ttl_ms = ttl_ms
+        self.key = f'leader:{name}'
+        self.token_key = f'leader:{name}:token'
+        self.identity = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.token = None
+        self._client = client
+        self._valid_until = 0
+
+    def _redis(self):
+        return self._client if self._client is not None else get_redis()
+
+    @property
+    def is_leader(self):
+        # Local clock only: leadership lapses on schedule even if Redis is unreachable
+        return self.token is not None and time.monotonic() < self._valid_until
+
+    def try_acquire(self):
+        """Acquire or renew the lease; returns whether this instance leads"""
+        client = self._redis()
+        if client is None:
+            self.token = self.token or 1
+            self._valid_until = float('inf')
+            return True
+
+        # Measured from before the round trip, minus a margin for clock drift
+        started = time.monotonic()
+        valid_until = started + self.ttl_ms * 0.9 / 1000
+        try:
+            if self.token is not None and client.eval(RENEW_SCRIPT, 1, self.key, self.identity, self.ttl_ms):
+                self._valid_until = valid_until
+                return True
+            if client.set(self.key, self.identity, nx=True, px=self.ttl_ms):
+                self.token = int(client.incr(self.token_key))
+                self._valid_until = valid_until
+                logger.info(f"Acquired leadership of {self.name} (token {self.token})")
+                return True
+        except Exception as e:
+            logger.warning(f"Error renewing leader lease {self.name}: {e}")
+            return self.is_leader
+
+        if self.token is not None:
+            logger.warning(f"Lost leadership of {self.name}")
+        self.token = None
+        return False
+
+    def release(self):
+        """Give the lease up now so a follower can take over without waiting for the TTL"""
+        client = self._redis()
+        if self.token is not None and client is not None:
+            try:
+                client.eval(RELEASE_SCRIPT, 1, self.key, self.identity)
+            except Exception as e:
+                logger.warning(f"Error releasing leader lease {self.name}: {e}")
+        self.token = None
+
+    def fenced_set(self, key, value):
+        """Store ``value`` in hash ``key`` unless a newer leader has already written it"""
+        client = self._redis()
+        if client is None:
+            return True
+        if self.token is None:
+            return False
+        return fenced_set(client, key, self.token, value)
+
+    def fenced_call(self, *command, client=None):
+        """Run a Redis command unless a newer term has started; ``client`` may be a pipeline.
+
+        For appends and other writes a stale leader must not make after its
+        successor took over, where ``fenced_set``'s last-writer check does not fit.
+        """
+        client = client if client is not None else self._redis()
+        if client is None:
+            return True
+        if self.token is None:
+            return False
+        return client.eval(FENCED_CALL_SCRIPT, 1, self.token_key, self.token, *command)
+
+class SingletonJob:
+    def __init__(self, name, func, interval=None, ttl_ms=LEASE_TTL_MS):
+        self.name = name
+        self.func = func
+        self.interval = interval  # None for long-running jobs
+        self.lease = LeaderLease(name, ttl_ms)
+        self.next_run = 0
+        self.thread = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+class SingletonScheduler:
+    """Runs each registered job on exactly one instance across the deployment.
+
+    Every job has its own lease, renewed by a single scheduler thread on each
+    tick, well inside its TTL. Periodic jobs run every ``interval`` seconds on
+    the current leader. Long-running jobs start when leadership is won and
+    must return once ``lease.is_leader`` turns false. Jobs receive the lease,
+    whose token fences their writes.
+    """
+
+    def __init__(self, poll=POLL_SECONDS):
+        self.poll = poll
+        self.jobs = []
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def every(self, name, interval, func, ttl_ms=LEASE_TTL_MS):
+        self.jobs.append(SingletonJob(name, func, interval, ttl_ms))
+
+    def hold(self, name, func, ttl_ms=LEASE_TTL_MS):
+        self.jobs.append(SingletonJob(name, func, None, ttl_ms))
+
+    def tick(self):
+        now = time.monotonic()
+        for job in self.jobs:
+            if not job.lease.try_acquire() or job.running:
+                continue
+            if job.interval is None or now >= job.next_run:
+                job.next_run = now + (job.interval or 0)
+                job.thread = threading.Thread(target=self._run_job, args=(job,), name=f'job-{job.name}', daemon=True)
+                job.thread.start()
+
+    def _run_job(self, job):
+        try:
+            job.func(job.lease)
+        except Exception as e:
+            logger.error(f"Error running singleton job {job.name}: {e}")
+
+    def run_forever(self):
+        atexit.register(self.stop)
+        while not self._stopped.is_set():
+            self.tick()
+            self._stopped.wait(self.poll)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, name='singleton-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        for job in self.jobs:
+            job.lease.release()
@@ -0,0 +1,32 @@
+# utils/redis_client.py
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+_clients = {}
+
+def get_redis_url():
+    """Redis URL from the app config, falling back to the environment"""
+    try:
+        from flask import current_app
+        url = current_app.config.get('REDIS_URL')
+        if url:
+            return url
+    except RuntimeError:
+        pass
+    return os.getenv('REDIS_URL') or os.getenv('CACHE_REDIS_URL')
+
+def get_redis(url=None):
+    """Shared Redis client for this process, or None when Redis is not configured"""
+    url = url or get_redis_url()
+    if not url:
+        return None
+    if url not in _clients:
+        try:
+            import redis
+            _clients[url] = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+        except ImportError:
+            logger.warning("redis package not installed; shared caching disabled")
+            _clients[url] = None
+    return _clients[url]
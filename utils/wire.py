@@ -0,0 +1,59 @@
+# utils/wire.py
+import json
+import struct
+
+import numpy as np
+from flask import Response, after_this_request, jsonify, request
+
+JSON = 'application/json'
+COLUMNAR_JSON = 'application/vnd.cryptoapp.columnar+json'
+COLUMNAR_BINARY = 'application/vnd.cryptoapp.columns'
+
+FORMAT_ALIASES = {'json': JSON, 'columnar': COLUMNAR_JSON, 'binary': COLUMNAR_BINARY}
+
+def negotiate_format():
+    """Pick the response encoding from ?format= or the Accept header (plain JSON by default)"""
+    # Every representation of the URL, plain JSON included, depends on Accept
+    after_this_request(_vary_on_accept)
+    alias = request.args.get('format')
+    if alias in FORMAT_ALIASES:
+        return FORMAT_ALIASES[alias]
+    return request.accept_mimetypes.best_match([JSON, COLUMNAR_JSON, COLUMNAR_BINARY]) or JSON
+
+def _vary_on_accept(response):
+    response.vary.add('Accept')
+    return response
+
+def encode_binary(columns, meta=None):
+    """Pack named numeric columns as little-endian float64 blocks.
+
+    Layout: uint32 header length, JSON header ``{"columns": [[name, length], ...],
+    "meta": {...}}``, zero padding to an 8-byte boundary, then each column's
+    values back to back so the browser can wrap them in Float64Array views.
+    """
+    header = json.dumps({
+        'columns': [[name, len(values)] for name, values in columns.items()],
+        'meta': meta or {}
+    }).encode()
+    padding = b'\0' * ((-(4 + len(header))) % 8)
+    blocks = [np.ascontiguousarray(values, dtype='<f8').tobytes() for values in columns.values()]
+    return b''.join([struct.pack('<I', len(header)), header, padding] + blocks)
+
+def columns_response(columns, mimetype, meta=None):
+    if mimetype == COLUMNAR_BINARY:
+        return _vary_on_accept(Response(encode_binary(columns, meta), mimetype=COLUMNAR_BINARY))
+    response = jsonify({
+        'columns': {name: np.asarray(values, dtype=np.float64).tolist() for name, values in columns.items()},
+        'meta': meta or {}
+    })
+    response.mimetype = COLUMNAR_JSON
+    return _vary_on_accept(response)
+
+def depth_columns(depth):
+    """Order book {'bids': [[price, qty], ...], 'asks': ...} as four numeric columns"""
+    bids = np.array(depth.get('bids') or [], dtype=np.float64).reshape(-1, 2)
+    asks = np.array(depth.get('asks') or [], dtype=np.float64).reshape(-1, 2)
+    return {
+        'bid_price': bids[:, 0], 'bid_qty': bids[:, 1],
+        'ask_price': asks[:, 0], 'ask_qty': asks[:, 1]
+    }
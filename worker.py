@@ -0,0 +1,36 @@
+"""Market-data producer and singleton background jobs.
+
+Holds the upstream market stream and publishes Socket.IO emits to the message
+queue, from which every web worker fans them out to its own connected clients,
+and warms the shared indicator cache. Any number of replicas may run: leader
+leases let exactly one run each job, and another takes over within a lease
+TTL if it dies.
+"""
+import logging
+import signal
+import sys
+
+from flask_socketio import SocketIO
+
+from config import Config
+from services.jobs import build_scheduler
+
+logger = logging.getLogger(__name__)
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    if not Config.SOCKETIO_MESSAGE_QUEUE:
+        raise SystemExit('Set REDIS_URL or SOCKETIO_MESSAGE_QUEUE so web workers can receive updates')
+
+    # Write-only emitter: no server, just publishes to the queue. Always threaded:
+    # this process is not monkey-patched even when the web tier runs eventlet.
+    emitter = SocketIO(message_queue=Config.SOCKETIO_MESSAGE_QUEUE, channel=Config.SOCKETIO_CHANNEL,
+                       async_mode='threading')
+    scheduler = build_scheduler(emitter.emit)
+    # Exit through atexit on SIGTERM so the lease is released for an immediate handover
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    logger.info("Waiting for leadership of singleton jobs")
+    scheduler.run_forever()
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,31 @@
+import logging
 import os
-from app import app  # Use the app instance directly
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Cooperative mode: the stdlib must be patched before anything imports socket,
+# ssl, threading or time, and before the first database connection is made.
+if os.getenv('SOCKETIO_ASYNC_MODE') == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+
+    try:
+        from psycogreen.eventlet import patch_psycopg
+        # psycopg2 is a C extension; without this every query blocks the whole hub
+        patch_psycopg()
+    except ImportError:
+        logger.warning("psycogreen is not installed; database queries will block the eventlet hub")
+
+from app import app, socketio  # noqa: E402  (must follow monkey-patching)
+from services.notification_service import start_notification_dispatcher  # noqa: E402
+
+# The serving process sends queued email; importing the app (CLI commands, scripts) does not
+start_notification_dispatcher(app)
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
-    
+    # Serves with eventlet's WSGI server in cooperative mode, werkzeug otherwise
+    socketio.run(app, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))